@@ -1,9 +1,25 @@
+import bz2
 import csv
+import gzip
+import heapq
+import json
+import lzma
+import mmap
 import os
+import re
+import secrets
+import socket
+import struct
 import sys
+import threading
 import time
-from datetime import datetime, timedelta
+import zlib
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
 from getpass import getpass
+from itertools import chain, islice, repeat
 
 # =========================================================
 #              🔥 CHILLFINANCE SMOOTH ENGINE 🔥
@@ -243,6 +259,140 @@ def valid_password(pw):
         return False, "Password minimal 6 karakter."
     return True, ""
 
+# =========================================================
+#  WAKTU & TIMESTAMP
+# =========================================================
+
+DETIK_PER_HARI = 86400
+
+def waktu_sekarang():
+    """
+    Mengambil waktu saat ini sebagai epoch timestamp (detik, UTC).
+    
+    Semua transaksi, tanggal registrasi, dan penarikan terakhir disimpan
+    dalam bentuk integer ini, sehingga filter rentang dan pengurutan cukup
+    memakai perbandingan angka biasa.
+    
+    Returns:
+        int: Jumlah detik sejak 1970-01-01 00:00:00 UTC.
+    """
+    return int(time.time())
+
+def ke_datetime(ts):
+    """
+    Mengubah epoch timestamp menjadi datetime yang sadar zona waktu lokal.
+    
+    Args:
+        ts (int): Epoch timestamp dalam detik.
+        
+    Returns:
+        datetime: Datetime aware dengan zona waktu lokal sistem.
+    """
+    return datetime.fromtimestamp(ts, timezone.utc).astimezone()
+
+def format_waktu(ts, fmt="%Y-%m-%d %H:%M:%S"):
+    """
+    Memformat epoch timestamp untuk ditampilkan ke user (zona waktu lokal).
+    
+    Args:
+        ts (int): Epoch timestamp dalam detik.
+        fmt (str): Format strftime. Default "%Y-%m-%d %H:%M:%S".
+        
+    Returns:
+        str: Tanggal/waktu yang sudah diformat.
+    """
+    return ke_datetime(ts).strftime(fmt)
+
+def _tengah_malam(tahun, bulan, hari):
+    """
+    Mengembalikan epoch timestamp pukul 00:00 waktu lokal pada tanggal tertentu.
+    """
+    return int(datetime(tahun, bulan, hari).timestamp())
+
+def _hari_terakhir(tahun, bulan):
+    """
+    Mengembalikan jumlah hari dalam bulan tertentu (28-31).
+    """
+    if bulan == 12:
+        return 31
+    return (datetime(tahun, bulan + 1, 1) - datetime(tahun, bulan, 1)).days
+
+def awal_bulan(ts):
+    """
+    Mengembalikan epoch pukul 00:00 lokal pada tanggal 1 bulan dari ts.
+    
+    Args:
+        ts (int): Epoch timestamp dalam detik.
+        
+    Returns:
+        int: Epoch awal bulan (waktu lokal).
+    """
+    d = ke_datetime(ts)
+    return _tengah_malam(d.year, d.month, 1)
+
+def hari_berikutnya(ts):
+    """
+    Mengembalikan epoch pukul 00:00 lokal pada hari setelah ts.
+    
+    Dipakai untuk mengubah tanggal akhir yang diinput user menjadi batas
+    eksklusif (akhir hari tersebut).
+    """
+    d = ke_datetime(ts).date()
+    d = d.fromordinal(d.toordinal() + 1)
+    return _tengah_malam(d.year, d.month, d.day)
+
+def parse_tanggal(teks):
+    """
+    Mengubah input tanggal "YYYY-MM-DD" menjadi epoch pukul 00:00 lokal.
+    
+    Args:
+        teks (str): Tanggal yang diinput user.
+        
+    Returns:
+        int: Epoch timestamp, atau None jika format tidak valid.
+    """
+    try:
+        d = datetime.strptime(teks.strip(), "%Y-%m-%d")
+    except ValueError:
+        return None
+    return _tengah_malam(d.year, d.month, d.day)
+
+def rentang_riwayat(riwayat, mulai=None, akhir=None):
+    """
+    Mengambil transaksi dalam rentang waktu [mulai, akhir) dari riwayat.
+    
+    Riwayat selalu terurut berdasarkan timestamp (elemen pertama tiap baris),
+    sehingga batas rentang dicari dengan binary search, bukan scan penuh.
+    
+    Args:
+        riwayat (list): List transaksi [timestamp, tipe, jumlah, catatan].
+        mulai (int): Epoch awal (inklusif). None berarti dari awal.
+        akhir (int): Epoch akhir (eksklusif). None berarti sampai akhir.
+        
+    Returns:
+        list: Potongan riwayat yang berada dalam rentang.
+    """
+    lo = 0 if mulai is None else bisect_left(riwayat, [mulai])
+    hi = len(riwayat) if akhir is None else bisect_left(riwayat, [akhir])
+    return riwayat[lo:hi]
+
+def sisip_riwayat(riwayat, row):
+    """
+    Menambahkan transaksi ke riwayat dengan tetap menjaga urutan waktu.
+    
+    Transaksi baru hampir selalu paling akhir (cukup append). Transaksi
+    bertanggal mundur (misal auto-nabung yang tertunda) disisipkan dengan
+    binary search setelah semua transaksi bertimestamp sama.
+    
+    Args:
+        riwayat (list): List transaksi [timestamp, tipe, jumlah, catatan].
+        row (list): Transaksi baru dengan format yang sama.
+    """
+    if not riwayat or riwayat[-1][0] <= row[0]:
+        riwayat.append(row)
+    else:
+        riwayat.insert(bisect_left(riwayat, [row[0] + 1]), row)
+
 # =========================================================
 #  FORMAT RUPIAH
 # =========================================================
@@ -308,6 +458,8 @@ else:
     import termios
     import tty
 
+MAX_NOMINAL = 1_000_000_000_000
+
 def input_nominal(prompt):
     """
     Menerima input angka dari user dengan validasi dan formatting Rupiah real-time.
@@ -325,7 +477,6 @@ def input_nominal(prompt):
     Returns:
         int: Angka yang sudah divalidasi dan diterima user.
     """
-    MAX_NOMINAL = 1_000_000_000_000
     print(prompt, end='', flush=True)
 
     angka_str = ""
@@ -389,7 +540,9 @@ def input_nominal(prompt):
     fd = sys.stdin.fileno()
     old = termios.tcgetattr(fd)
     try:
-        tty.setraw(fd)
+        # TCSADRAIN, bukan default TCSAFLUSH: digit yang sudah diketik sebelum
+        # mode raw aktif (ketik cepat / replay sesi) tidak ikut dibuang.
+        tty.setraw(fd, termios.TCSADRAIN)
         while True:
             ch = sys.stdin.read(1)
 
@@ -447,6 +600,38 @@ def input_nominal(prompt):
 # =========================================================
 users = {}
 
+def buat_user(username, pw):
+    """
+    Membuat record data user baru dengan semua field bawaan.
+    
+    Args:
+        username (str): Username sesuai input (case asli).
+        pw (str): Password user.
+        
+    Returns:
+        dict: Record user siap disimpan ke dictionary 'users'.
+    """
+    return {
+        "username": username,
+        "password": pw,
+        "saldo_utama": 0,
+        "targets": {},
+        "target_index": {},
+        "target_aktif": {},
+        "target_selesai": {},
+        "riwayat": [],
+        "riwayat_biner": None,
+        "versi_file": {},
+        "sumber_biner": {},
+        "ringkasan_biner": {},
+        "jadwal": {},
+        "jadwal_seq": 0,
+        "checkpoint": [],
+        "anggaran": {},
+        "last_withdraw": None,
+        "created_at": waktu_sekarang()
+    }
+
 # =========================================================
 #  AUTENTIKASI (REGISTER & LOGIN)
 # =========================================================
@@ -493,15 +678,7 @@ def register():
             continue
         break
 
-    users[uname_lower] = {
-        "username": username,
-        "password": pw,
-        "saldo_utama": 0,
-        "targets": {},
-        "riwayat": [],
-        "last_withdraw": None,
-        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M")
-    }
+    users[uname_lower] = buat_user(username, pw)
 
     print(green("✅ Registrasi berhasil!"))
     input("Tekan Enter untuk login...")
@@ -537,6 +714,511 @@ def login():
     return uname
 
 
+# =========================================================
+#  STATUS & PROGRESS TARGET
+# =========================================================
+
+# Cache persentase progress per (user, nama_target). Entri dihapus setiap
+# kali saldo target tersebut berubah, sehingga layar pemilihan sumber tidak
+# perlu menghitung ulang persentase target yang tidak berubah.
+_progress_cache = {}
+
+def progress_target(user, nama):
+    """
+    Menghitung persentase progress target (0-100) dengan cache.
+    
+    Aman untuk nominal target 0 (dianggap 0%).
+    
+    Args:
+        user (str): Username pengguna yang login (lowercase).
+        nama (str): Nama target sesuai penyimpanan di 'targets'.
+        
+    Returns:
+        int: Persentase progress, dibatasi maksimal 100.
+    """
+    key = (user, nama)
+    pct = _progress_cache.get(key)
+    if pct is None:
+        t = users[user]["targets"][nama]
+        pct = min(t["saldo"] * 100 // t["target"], 100) if t["target"] else 0
+        _progress_cache[key] = pct
+    return pct
+
+def invalidasi_progress(user, nama):
+    """
+    Menghapus cache progress & baris tampilan sebuah target (dipanggil saat
+    saldonya berubah).
+    
+    Args:
+        user (str): Username pengguna yang login (lowercase).
+        nama (str): Nama target sesuai penyimpanan di 'targets'.
+    """
+    _progress_cache.pop((user, nama), None)
+    _baris_target_cache.pop((user, nama), None)
+
+# Cache baris tampilan progress per (user, nama_target) berisi
+# ((saldo, target, status), teks). Dipakai bersama oleh lihat_saldo() dan
+# daftar target di set_target(); entri dibuang lewat invalidasi_progress()
+# dan tanda (saldo, target, status) mencegah teks basi ikut terpakai.
+_baris_target_cache = {}
+
+BAR_TARGET = 20
+
+def baris_target(user, nama):
+    """
+    Teks progress sebuah target (2 baris: ringkasan & progress bar), dari cache.
+    
+    Args:
+        user (str): Username pengguna yang login (lowercase).
+        nama (str): Nama target sesuai penyimpanan di 'targets'.
+        
+    Returns:
+        str: Contoh "Liburan → Rp 500,000 / Rp 1.000.000,00  (50%) Aktif\n    [####----]".
+    """
+    t = users[user]["targets"][nama]
+    tanda = (t["saldo"], t["target"], t["status"])
+    cache = _baris_target_cache.get((user, nama))
+    if cache is not None and cache[0] == tanda:
+        return cache[1]
+
+    pct = min(t["saldo"] * 100 // t["target"], 100) if t["target"] else 0
+    filled = BAR_TARGET * pct // 100
+    bar = "#" * filled + "-" * (BAR_TARGET - filled)
+    status = "🎉 Selesai" if pct == 100 else "Aktif"
+    teks = (f"{nama} → Rp {t['saldo']:,} / Rp {format_rupiah(t['target'])}  ({pct}%) {status}\n"
+            f"    [{green(bar)}]")
+    _baris_target_cache[(user, nama)] = (tanda, teks)
+    return teks
+
+def render_daftar_target(user, nomor=False):
+    """
+    Menyusun seluruh daftar target menjadi satu string agar bisa dicetak
+    dengan sekali write.
+    
+    Args:
+        user (str): Username pengguna yang login (lowercase).
+        nomor (bool): Awali tiap target dengan nomor urut.
+        
+    Returns:
+        str: Daftar target, atau "(Belum ada target)".
+    """
+    targets = users[user]["targets"]
+    if not targets:
+        return "(Belum ada target)"
+    if nomor:
+        return "\n".join(f"{i}. {baris_target(user, n)}" for i, n in enumerate(targets, 1))
+    return "\n".join(baris_target(user, n) for n in targets)
+
+def set_status_target(user, nama, status):
+    """
+    Mengubah status target sekaligus memindahkannya antar himpunan
+    'target_aktif' dan 'target_selesai'.
+    
+    Kedua himpunan disimpan sebagai dict {nama: None} agar urutan target
+    tetap sesuai urutan pembuatan saat ditampilkan.
+    
+    Args:
+        user (str): Username pengguna yang login (lowercase).
+        nama (str): Nama target sesuai penyimpanan di 'targets'.
+        status (str): 'aktif' atau 'selesai'.
+    """
+    u = users[user]
+    lama = u["targets"][nama]["status"]
+    u["targets"][nama]["status"] = status
+    if status == "selesai" and lama != "selesai":
+        terbitkan("target_selesai", user, target=nama, saldo=u["targets"][nama]["saldo"])
+    if status == "selesai":
+        u["target_aktif"].pop(nama, None)
+        u["target_selesai"][nama] = None
+    else:
+        u["target_selesai"].pop(nama, None)
+        u["target_aktif"][nama] = None
+
+def ubah_saldo_target(user, nama, delta):
+    """
+    Menambah/mengurangi saldo target dan menginvalidasi cache progress-nya.
+    
+    Args:
+        user (str): Username pengguna yang login (lowercase).
+        nama (str): Nama target sesuai penyimpanan di 'targets'.
+        delta (int): Perubahan saldo (positif = masuk, negatif = keluar).
+    """
+    users[user]["targets"][nama]["saldo"] += delta
+    invalidasi_progress(user, nama)
+
+def _ganti_kunci_urut(d, lama, baru):
+    """
+    Mengganti kunci dict di tempat tanpa mengubah urutan kunci lainnya.
+    """
+    if lama not in d:
+        return
+    items = list(d.items())
+    d.clear()
+    for k, v in items:
+        d[baru if k == lama else k] = v
+
+# =========================================================
+#  INDEKS NAMA TARGET (CASE-INSENSITIVE)
+# =========================================================
+
+def kunci_target(nama):
+    """
+    Menormalisasi nama target menjadi kunci indeks (case-insensitive).
+    
+    Args:
+        nama (str): Nama target sesuai input user.
+        
+    Returns:
+        str: Nama yang sudah dinormalisasi (trim + lowercase).
+    """
+    return nama.strip().lower()
+
+def cari_target(user, nama):
+    """
+    Mencari nama asli target secara case-insensitive dalam O(1).
+    
+    Args:
+        user (str): Username pengguna yang login (lowercase).
+        nama (str): Nama target dengan huruf besar/kecil bebas.
+        
+    Returns:
+        str: Nama target sesuai penyimpanan di 'targets', atau None jika tidak ada.
+    """
+    return users[user]["target_index"].get(kunci_target(nama))
+
+def tambah_target(user, nama, target_amt):
+    """
+    Membuat target baru dan mendaftarkannya ke indeks nama.
+    
+    Args:
+        user (str): Username pengguna yang login (lowercase).
+        nama (str): Nama target (unik, case-insensitive).
+        target_amt (int): Nominal target tabungan.
+        
+    Returns:
+        tuple: (bool, str) - (berhasil, pesan_error)
+    """
+    nama = nama.strip()
+    if not nama:
+        return False, "Nama target tidak boleh kosong."
+    if cari_target(user, nama) is not None:
+        return False, "Target dengan nama tersebut sudah ada."
+
+    users[user]["targets"][nama] = {
+        "target": target_amt,
+        "saldo": 0,
+        "status": "aktif",
+        "riwayat": [],
+        "last_withdraw": None,
+        "kebijakan": dict(KEBIJAKAN_DEFAULT)
+    }
+    users[user]["target_index"][kunci_target(nama)] = nama
+    users[user]["target_aktif"][nama] = None
+    _trigram_tambah(user, nama)
+    terbitkan("target_baru", user, target=nama, nominal=target_amt)
+    return True, ""
+
+def hapus_target(user, nama):
+    """
+    Menghapus target beserta entri indeks namanya.
+    
+    Args:
+        user (str): Username pengguna yang login (lowercase).
+        nama (str): Nama target (case-insensitive).
+        
+    Returns:
+        dict: Data target yang dihapus, atau None jika tidak ditemukan.
+    """
+    asli = cari_target(user, nama)
+    if asli is None:
+        return None
+    u = users[user]
+    del u["target_index"][kunci_target(asli)]
+    u["target_aktif"].pop(asli, None)
+    u["target_selesai"].pop(asli, None)
+    u["sumber_biner"].pop(kunci_sumber(asli), None)
+    _checkpoint_ganti_target(user, asli)
+    invalidasi_progress(user, asli)
+    _trigram_hapus(user, asli)
+    invalidasi_indeks_catatan(user)
+    invalidasi_kategori(user)
+    invalidasi_anggaran(user)
+    invalidasi_agregat(user)
+    for rule in u["jadwal"].values():
+        if rule["target"] == asli:
+            rule["aktif"] = False
+    terbitkan("target_hapus", user, target=asli)
+    return u["targets"].pop(asli)
+
+def ganti_nama_target(user, lama, baru):
+    """
+    Mengganti nama target tanpa mengubah urutan daftar target.
+    
+    Boleh hanya mengubah huruf besar/kecil (misal "liburan" → "Liburan").
+    
+    Args:
+        user (str): Username pengguna yang login (lowercase).
+        lama (str): Nama target saat ini (case-insensitive).
+        baru (str): Nama target yang baru.
+        
+    Returns:
+        tuple: (bool, str) - (berhasil, pesan_error)
+    """
+    asli = cari_target(user, lama)
+    if asli is None:
+        return False, "Target tidak ditemukan."
+    baru = baru.strip()
+    if not baru:
+        return False, "Nama target tidak boleh kosong."
+    pemilik = cari_target(user, baru)
+    if pemilik is not None and pemilik != asli:
+        return False, "Target dengan nama tersebut sudah ada."
+
+    u = users[user]
+    for d in (u["targets"], u["target_aktif"], u["target_selesai"]):
+        _ganti_kunci_urut(d, asli, baru)
+
+    index = u["target_index"]
+    del index[kunci_target(asli)]
+    index[kunci_target(baru)] = baru
+    invalidasi_progress(user, asli)
+    _trigram_hapus(user, asli)
+    _trigram_tambah(user, baru)
+    invalidasi_indeks_catatan(user)
+
+    if kunci_sumber(asli) in u["sumber_biner"]:
+        u["sumber_biner"][kunci_sumber(baru)] = u["sumber_biner"].pop(kunci_sumber(asli))
+    _checkpoint_ganti_target(user, asli, baru)
+
+    for rule in u["jadwal"].values():
+        if rule["target"] == asli:
+            rule["target"] = baru
+    terbitkan("target_ganti_nama", user, target=baru, lama=asli)
+    return True, ""
+
+def gabung_target(user, asal, tujuan):
+    """
+    Menggabungkan target 'asal' ke target 'tujuan', lalu menghapus 'asal'.
+    
+    Saldo dijumlahkan, riwayat digabung tetap terurut waktu, dan tanggal
+    penarikan terakhir diambil yang paling baru. Nominal target tetap
+    milik 'tujuan'.
+    
+    Args:
+        user (str): Username pengguna yang login (lowercase).
+        asal (str): Nama target yang akan dilebur (case-insensitive).
+        tujuan (str): Nama target penampung (case-insensitive).
+        
+    Returns:
+        tuple: (bool, str) - (berhasil, pesan_error)
+    """
+    nama_asal = cari_target(user, asal)
+    nama_tujuan = cari_target(user, tujuan)
+    if nama_asal is None or nama_tujuan is None:
+        return False, "Target tidak ditemukan."
+    if nama_asal == nama_tujuan:
+        return False, "Target asal dan tujuan tidak boleh sama."
+
+    # Jadwal dipindah sebelum hapus_target() supaya tidak ikut dinonaktifkan.
+    for rule in users[user]["jadwal"].values():
+        if rule["target"] == nama_asal:
+            rule["target"] = nama_tujuan
+
+    segmen_asal = users[user]["sumber_biner"].get(kunci_sumber(nama_asal), [])
+    _checkpoint_ganti_target(user, nama_asal, nama_tujuan)
+    src = hapus_target(user, nama_asal)
+    dst = users[user]["targets"][nama_tujuan]
+    if segmen_asal:
+        users[user]["sumber_biner"].setdefault(kunci_sumber(nama_tujuan), []).extend(segmen_asal)
+
+    ubah_saldo_target(user, nama_tujuan, src["saldo"])
+    dst["riwayat"] = list(heapq.merge(dst["riwayat"], src["riwayat"], key=lambda r: r[0]))
+    withdraws = [w for w in (dst["last_withdraw"], src["last_withdraw"]) if w is not None]
+    dst["last_withdraw"] = max(withdraws) if withdraws else None
+    set_status_target(user, nama_tujuan, "selesai" if dst["saldo"] >= dst["target"] else "aktif")
+    return True, ""
+
+def pilih_nomor(names, prompt="Nomor: "):
+    """
+    Menampilkan daftar bernomor dan meminta user memilih salah satu.
+    
+    Args:
+        names (list): Daftar nama yang bisa dipilih.
+        prompt (str): Teks prompt input nomor.
+        
+    Returns:
+        str: Nama yang dipilih, atau None jika input tidak valid.
+    """
+    for i, n in enumerate(names, 1):
+        print(f"{i}. {n}")
+
+    sel = input(prompt).strip()
+    if not sel.isdigit() or not (1 <= int(sel) <= len(names)):
+        return None
+    return names[int(sel) - 1]
+
+
+# =========================================================
+#  PEMILIH TARGET (FUZZY)
+# =========================================================
+
+# Indeks trigram nama target per user: {"tri": {trigram: set(nama)},
+# "nama": {nama: (kunci_lowercase, frozenset(trigram))}}. Dibangun saat
+# pertama dipakai lalu diperbarui langsung oleh tambah/hapus/ganti nama target.
+_indeks_trigram = {}
+
+BATAS_PILIHAN = 10       # jumlah kandidat yang ditampilkan per putaran
+SKOR_FUZZY_MIN = 0.5     # porsi trigram kueri yang harus ada di nama
+
+def trigram(teks, pad=True):
+    """
+    Memecah teks (lowercase) menjadi himpunan trigram.
+    
+    Args:
+        teks (str): Teks sumber.
+        pad (bool): Beri spasi di awal & akhir agar batas kata ikut terindeks.
+        
+    Returns:
+        frozenset: Himpunan potongan 3 karakter.
+    """
+    t = " ".join(kunci_target(teks).split())
+    if pad:
+        t = f"  {t} "
+    return frozenset(t[i:i + 3] for i in range(len(t) - 2))
+
+def indeks_trigram(user):
+    """
+    Mengambil indeks trigram nama target user, membangunnya jika belum ada.
+    
+    Args:
+        user (str): Username pengguna (lowercase).
+        
+    Returns:
+        dict: Indeks dengan kunci 'tri' dan 'nama'.
+    """
+    idx = _indeks_trigram.get(user)
+    if idx is None:
+        idx = {"tri": {}, "nama": {}}
+        _indeks_trigram[user] = idx
+        for nama in users[user]["targets"]:
+            _trigram_tambah(user, nama)
+    return idx
+
+def _trigram_tambah(user, nama):
+    idx = _indeks_trigram.get(user)
+    if idx is None:
+        return
+    tri = trigram(nama)
+    idx["nama"][nama] = (" ".join(kunci_target(nama).split()), tri)
+    for g in tri:
+        idx["tri"].setdefault(g, set()).add(nama)
+
+def _trigram_hapus(user, nama):
+    idx = _indeks_trigram.get(user)
+    if idx is None:
+        return
+    for g in idx["nama"].pop(nama, ("", ()))[1]:
+        pos = idx["tri"][g]
+        pos.discard(nama)
+        if not pos:
+            del idx["tri"][g]
+
+def saring_target(user, kueri, hanya=None, kandidat=None, batas=BATAS_PILIHAN):
+    """
+    Mencari nama target yang cocok dengan kueri.
+    
+    Nama yang memuat kueri utuh dicari lewat irisan posting list trigram
+    kueri (dikerjakan di C oleh set) dan diurutkan dari nama terpendek.
+    Jika tidak ada yang cocok utuh (misal salah ketik), dipakai pencocokan
+    fuzzy: nama dengan porsi trigram kueri >= SKOR_FUZZY_MIN, diurutkan
+    dari skor tertinggi. Hanya 'batas' nama teratas yang diurutkan (heapq).
+    
+    Args:
+        user (str): Username pengguna (lowercase).
+        kueri (str): Teks yang diketik user.
+        hanya (container): Batasi ke nama di sini (misal target_aktif), atau None.
+        kandidat (set): Nama yang cocok di putaran sebelumnya, atau None.
+        batas (int): Jumlah nama teratas yang dikembalikan terurut.
+        
+    Returns:
+        tuple: (list nama teratas terurut, set semua nama yang cocok)
+    """
+    idx = indeks_trigram(user)
+    q = " ".join(kunci_target(kueri).split())
+    data = idx["nama"]
+
+    def saring(nama):
+        if kandidat is not None:
+            nama = nama & kandidat if isinstance(nama, set) else [n for n in nama if n in kandidat]
+        if hanya is not None:
+            nama = [n for n in nama if n in hanya]
+        return nama
+
+    if not q:
+        cocok = saring(data.keys() if kandidat is None else kandidat)
+        return list(islice(cocok, batas)), set(cocok)
+
+    # Kueri 1-2 huruf belum punya trigram utuh: pakai trigram awal kata
+    # (untuk 1 huruf: awal nama).
+    if len(q) >= 3:
+        q_tri = trigram(q, pad=False)
+    else:
+        q_tri = frozenset([f" {q}" if len(q) == 2 else f"  {q}"])
+    posting = sorted((idx["tri"].get(g, set()) for g in q_tri), key=len)
+    utuh = saring(posting[0].intersection(*posting[1:]))
+    if len(q) >= 3:
+        # Semua trigram ada belum tentu berurutan: pastikan kueri utuh termuat.
+        utuh = [n for n in utuh if q in data[n][0]]
+    if utuh:
+        return heapq.nsmallest(batas, utuh, key=len), set(utuh)
+
+    # Nama yang lolos fuzzy memuat minimal 'minimal' trigram kueri, jadi
+    # pasti ada di salah satu (n_tri - minimal + 1) posting list terpendek;
+    # posting list trigram umum (misal "tab", " 20") tidak perlu dibaca.
+    n_tri = len(q_tri)
+    minimal = -(-SKOR_FUZZY_MIN * n_tri // 1)
+    pool = set().union(*posting[:n_tri - int(minimal) + 1])
+    skor = {n: len(q_tri & data[n][1]) for n in saring(pool)}
+    mirip = [n for n, c in skor.items() if c >= minimal]
+    return heapq.nsmallest(batas, mirip, key=lambda n: (-skor[n], len(n), n)), set(mirip)
+
+def pilih_target(user, prompt="Cari target (nama/nomor, kosong=batal): ", hanya=None, tampil=None):
+    """
+    Pemilih target interaktif: ketik potongan nama untuk menyaring kandidat,
+    ketik nomor untuk memilih. Mengetik lanjutan kueri sebelumnya (minimal
+    3 huruf) hanya menyaring ulang hasil yang sedang tampil.
+    
+    Args:
+        user (str): Username pengguna yang login (lowercase).
+        prompt (str): Teks prompt input.
+        hanya (container): Batasi pilihan ke nama di sini, atau None untuk semua.
+        tampil (callable): fn(nama) -> str untuk baris kandidat, default nama saja.
+        
+    Returns:
+        str: Nama target terpilih, atau None jika dibatalkan.
+    """
+    kueri, kandidat = "", None
+    while True:
+        teratas, cocok = saring_target(user, kueri, hanya, kandidat)
+        if not teratas:
+            print(yellow(f"Tidak ada target yang cocok dengan '{kueri}'."))
+        for i, n in enumerate(teratas, 1):
+            print(f"{i}. {tampil(n) if tampil else n}")
+        if len(cocok) > len(teratas):
+            print(f"   ... +{len(cocok) - len(teratas)} lainnya, ketik nama untuk menyaring")
+
+        sel = input(prompt).strip()
+        if not sel:
+            return None
+        if sel.isdigit() and 1 <= int(sel) <= len(teratas):
+            return teratas[int(sel) - 1]
+        # Kueri 1-2 huruf hanya cocok di awal kata, sedangkan 3+ huruf cocok
+        # di mana saja; hasil lama hanya boleh dipakai jika modenya sama.
+        lama, baru = " ".join(kunci_target(kueri).split()), " ".join(kunci_target(sel).split())
+        kandidat = cocok if len(lama) >= 3 and baru.startswith(lama) else None
+        kueri = sel
+
+
 # =========================================================
 #  MENU TARGET TABUNGAN
 # =========================================================
@@ -549,7 +1231,10 @@ def set_target(user):
     1. Tambah Target Baru - Input nama target, nominal target, dan kategori
     2. Lihat Daftar Target - Tampilkan semua target dengan progress bar
     3. Hapus Target - Pilih target untuk dihapus
-    4. Kembali - Kembali ke menu utama
+    4. Ganti Nama Target - Ubah nama target yang sudah ada
+    5. Gabung Target - Lebur satu target ke target lain
+    6. Kebijakan Penarikan - Atur jeda dan batas penarikan target
+    7. Kembali - Kembali ke menu utama
     
     Args:
         user (str): Username pengguna yang login (lowercase).
@@ -560,7 +1245,10 @@ def set_target(user):
         print(f"{green('➕')} 1. Tambah Target Baru")
         print(f"{cyan('📋')} 2. Lihat Daftar Target")
         print(f"{red('🗑️')} 3. Hapus Target")
-        print(f"{yellow('↩️')} 4. Kembali")
+        print(f"{cyan('✏️')} 4. Ganti Nama Target")
+        print(f"{magenta('🔗')} 5. Gabung Target")
+        print(f"{green('🛡️')} 6. Kebijakan Penarikan")
+        print(f"{yellow('↩️')} 7. Kembali")
 
         pilih = input(bold("Pilih: ")).strip()
 
@@ -575,22 +1263,18 @@ def set_target(user):
                 input("Enter...")
                 continue
 
-            key = nama.lower()
-            if any(k.lower() == key for k in users[user]["targets"]):
+            if cari_target(user, nama) is not None:
                 print(red("❌ Target dengan nama tersebut sudah ada."))
                 input("Enter...")
                 continue
 
             target_amt = input_nominal("Masukkan nominal target: Rp ")
 
-            users[user]["targets"][nama] = {
-                "target": target_amt,
-                "saldo": 0,
-                "status": "aktif",
-                "riwayat": [],
-                "last_withdraw": None
-            }
-            print(green(f"✅ Target '{nama}' berhasil dibuat."))
+            ok, msg = tambah_target(user, nama, target_amt)
+            if ok:
+                print(green(f"✅ Target '{nama}' berhasil dibuat."))
+            else:
+                print(red(f"❌ {msg}"))
             input("Enter...")
 
         # ================= LIHAT TARGET =================
@@ -604,21 +1288,7 @@ def set_target(user):
                 input("Enter...")
                 continue
 
-            for idx, (tname, tdata) in enumerate(targets.items(), 1):
-                t_target = tdata["target"]
-                t_saldo = tdata["saldo"]
-
-                pct = int((t_saldo / t_target) * 100) if t_target else 0
-                pct = min(pct, 100)
-
-                bar_len = 20
-                filled = int(bar_len * pct / 100)
-                bar = "#" * filled + "-" * (bar_len - filled)
-
-                status = "✅ Selesai" if pct == 100 else "Aktif"
-
-                print(f"{idx}. {tname} → Rp {t_saldo:,} / Rp {format_rupiah(t_target)}  ({pct}%) {status}")
-                print(f"    [{green(bar)}]")
+            print(render_daftar_target(user, nomor=True))
 
             input("Enter...")
 
@@ -633,30 +1303,132 @@ def set_target(user):
                 continue
 
             print(bold(red("🗑️ HAPUS TARGET")))
-            names = list(targets.keys())
-
-            for i, n in enumerate(names, 1):
-                print(f"{i}. {n}")
-
-            sel = input("Masukkan nomor target: ").strip()
-
-            if not sel.isdigit() or not (1 <= int(sel) <= len(names)):
+            nama_hapus = pilih_target(user)
+            if nama_hapus is None:
                 print("❌ Pilihan tidak valid.")
                 input("Enter...")
                 continue
 
-            nama_hapus = names[int(sel) - 1]
-
             konfir = input(f"Yakin hapus '{nama_hapus}'? (Y/n): ").lower()
             if konfir in ("y", ""):
-                targets.pop(nama_hapus)
+                hapus_target(user, nama_hapus)
                 print(green("✅ Target berhasil dihapus."))
             else:
                 print(yellow("Dibatalkan."))
 
             input("Enter...")
 
+        # ================= GANTI NAMA TARGET =================
         elif pilih == "4":
+            clear()
+            targets = users[user]["targets"]
+
+            if not targets:
+                print("Tidak ada target untuk diganti namanya.")
+                input("Enter...")
+                continue
+
+            print(bold(cyan("✏️ GANTI NAMA TARGET")))
+            nama_lama = pilih_nomor(list(targets.keys()), "Masukkan nomor target: ")
+            if nama_lama is None:
+                print("❌ Pilihan tidak valid.")
+                input("Enter...")
+                continue
+
+            nama_baru = input("Nama baru: ").strip()
+            ok, msg = ganti_nama_target(user, nama_lama, nama_baru)
+            if ok:
+                print(green(f"✅ '{nama_lama}' sekarang bernama '{nama_baru}'."))
+            else:
+                print(red(f"❌ {msg}"))
+            input("Enter...")
+
+        # ================= GABUNG TARGET =================
+        elif pilih == "5":
+            clear()
+            targets = users[user]["targets"]
+
+            if len(targets) < 2:
+                print("Butuh minimal 2 target untuk digabung.")
+                input("Enter...")
+                continue
+
+            print(bold(magenta("🔗 GABUNG TARGET")))
+            names = list(targets.keys())
+            print("Target yang akan dilebur:")
+            asal = pilih_nomor(names, "Nomor target asal: ")
+            if asal is None:
+                print("❌ Pilihan tidak valid.")
+                input("Enter...")
+                continue
+
+            print("Gabungkan ke target:")
+            tujuan = pilih_nomor([n for n in names if n != asal], "Nomor target tujuan: ")
+            if tujuan is None:
+                print("❌ Pilihan tidak valid.")
+                input("Enter...")
+                continue
+
+            konfir = input(f"Gabung '{asal}' ke '{tujuan}'? (Y/n): ").lower()
+            if konfir not in ("y", ""):
+                print(yellow("Dibatalkan."))
+                input("Enter...")
+                continue
+
+            ok, msg = gabung_target(user, asal, tujuan)
+            if ok:
+                print(green(f"✅ '{asal}' berhasil digabung ke '{tujuan}'."))
+            else:
+                print(red(f"❌ {msg}"))
+            input("Enter...")
+
+        # ================= KEBIJAKAN PENARIKAN =================
+        elif pilih == "6":
+            clear()
+            targets = users[user]["targets"]
+
+            if not targets:
+                print("Belum ada target.")
+                input("Enter...")
+                continue
+
+            print(bold(green("🛡️ KEBIJAKAN PENARIKAN")))
+            nama = pilih_nomor(list(targets.keys()), "Masukkan nomor target: ")
+            if nama is None:
+                print("❌ Pilihan tidak valid.")
+                input("Enter...")
+                continue
+
+            print(f"Saat ini: {deskripsi_kebijakan(targets[nama]['kebijakan'])}")
+            cooldown = input("Jeda antar penarikan (hari, 0 = tanpa jeda): ").strip()
+            if not cooldown.isdigit():
+                print(red("❌ Jeda harus berupa angka."))
+                input("Enter...")
+                continue
+
+            print("Jenis batas: 1. Persentase saldo  2. Nominal tetap")
+            jenis = input("Pilih (1/2): ").strip()
+            if jenis == "1":
+                nilai = input("Persentase maksimal (1-100): ").strip()
+                if not nilai.isdigit():
+                    print(red("❌ Persentase harus berupa angka."))
+                    input("Enter...")
+                    continue
+                ok, msg = atur_kebijakan(user, nama, int(cooldown), "persen", int(nilai))
+            elif jenis == "2":
+                nilai = input_nominal("Nominal maksimal: Rp ")
+                ok, msg = atur_kebijakan(user, nama, int(cooldown), "tetap", nilai)
+            else:
+                ok, msg = False, "Pilihan tidak valid."
+
+            if ok:
+                deskripsi = deskripsi_kebijakan(targets[nama]["kebijakan"])
+                print(green(f"✅ Kebijakan '{nama}': {deskripsi}"))
+            else:
+                print(red(f"❌ {msg}"))
+            input("Enter...")
+
+        elif pilih == "7":
             break
 
         else:
@@ -697,7 +1469,7 @@ def pilih_sumber_saldo(user, action):
 
         elif pilihan == "2":
             targets = users[user]["targets"]
-            aktif = [name for name, d in targets.items() if d["status"] == "aktif"]
+            aktif = list(users[user]["target_aktif"])
 
             if not aktif:
                 print(red("❌ Tidak ada target aktif."))
@@ -706,14 +1478,11 @@ def pilih_sumber_saldo(user, action):
                 return None, None
 
             print("Pilih target:")
-            for i, n in enumerate(aktif, 1):
-                t = targets[n]
-                pct = int((t["saldo"] / t["target"]) * 100)
-                print(f"{i}. {n} → Rp {t['saldo']:,} ({pct}%)")
-
-            sel = input("Nomor: ").strip()
-            if sel.isdigit() and 1 <= int(sel) <= len(aktif):
-                return "target", aktif[int(sel) - 1]
+            nama = pilih_target(user, hanya=users[user]["target_aktif"],
+                                tampil=lambda n: f"{n} → Rp {targets[n]['saldo']:,} "
+                                                 f"({progress_target(user, n)}%)")
+            if nama is not None:
+                return "target", nama
 
             print(red("❌ Pilihan tidak valid."))
             input("Enter...")
@@ -723,10 +1492,347 @@ def pilih_sumber_saldo(user, action):
             input("Enter...")
 
 
+# =========================================================
+#  JURNAL TRANSAKSI
+# =========================================================
+
+# Daftar fungsi fn(user, target_name, rows) yang dipanggil setiap ada
+# transaksi baru tercatat (nabung, keluar, batch, koreksi). Fitur lain yang
+# perlu memperbarui indeks/agregatnya cukup mendaftar di sini.
+_pendengar_transaksi = []
+
+# Catatan penanda transaksi koreksi dari perbaiki_ledger(). Koreksi tetap
+# bertipe 'nabung'/'keluar' agar perhitungan saldo tidak berubah, tetapi
+# bukan uang yang benar-benar masuk/keluar: kategori, anggaran, agregat,
+# pencarian catatan, dan pola setoran melewatinya.
+CATATAN_KOREKSI = "[koreksi ledger]"
+
+def catat_riwayat(user, target_name, rows):
+    """
+    Menulis satu atau beberapa transaksi ke riwayat sebuah sumber.
+    
+    Riwayat tetap terurut waktu: baris yang lebih baru cukup di-extend,
+    baris bertanggal mundur digabung dengan merge. Setelah itu semua
+    pendengar transaksi dipanggil sekali dengan seluruh baris.
+    
+    Args:
+        user (str): Username pengguna (lowercase).
+        target_name (str): Nama target, atau None untuk saldo utama.
+        rows (list): Baris [timestamp, tipe, jumlah, catatan] terurut waktu.
+    """
+    riwayat = _riwayat_memori(users[user], target_name)
+    if len(rows) == 1:
+        sisip_riwayat(riwayat, rows[0])
+    elif not riwayat or riwayat[-1][0] <= rows[0][0]:
+        riwayat.extend(rows)
+    else:
+        riwayat[:] = heapq.merge(riwayat, rows, key=lambda r: r[0])
+
+    for fn in _pendengar_transaksi:
+        fn(user, target_name, rows)
+
+# =========================================================
+#  CHANGE FEED (LANGGANAN EVENT)
+# =========================================================
+
+# Semua event (nabung, keluar, target baru / selesai / dihapus / ganti
+# nama) masuk ke log bernomor urut 'seq'. Log hanya menyimpan FEED_RETENSI
+# event terakhir; nomor seq dipakai pelanggan sebagai cursor untuk
+# melanjutkan dari posisi terakhir.
+#
+# Pelanggan dalam proses punya antrian terbatas (FEED_ANTRIAN). Jika
+# antrian penuh, pelanggan ditandai 'tertinggal' dan tidak lagi diisi
+# (penerbit tidak pernah menunggu); ambil_feed() lalu mengejar dari log
+# memakai cursor. Jika cursor sudah lebih tua dari isi log, pelanggan
+# menerima event {"jenis": "gap", "dari": a, "sampai": b}.
+#
+# Stream lokal (mulai_stream_feed) memakai cara yang sama lewat socket:
+# klien mengirim satu baris "TOKEN [cursor]" (tanpa cursor = mulai
+# sekarang), lalu menerima event milik pemilik token sebagai JSON Lines.
+# Token dibuat per user dari menu Fitur Lanjutan (token_feed), jadi proses
+# lain di mesin yang sama tidak bisa membaca event user mana pun tanpa token.
+
+FEED_RETENSI = 10_000
+FEED_ANTRIAN = 1_000
+
+_feed = deque(maxlen=FEED_RETENSI)
+_feed_seq = 0
+_feed_kondisi = threading.Condition()
+_pelanggan = {}
+_id_pelanggan = 0
+_token_feed = {}        # token -> username pemiliknya
+_server_feed = None     # socket server stream lokal jika --feed aktif
+FEED_HANDSHAKE_TIMEOUT = 10.0
+
+def terbitkan(jenis, user, **data):
+    """
+    Menerbitkan satu event ke log feed dan ke antrian semua pelanggan.
+    
+    Args:
+        jenis (str): Jenis event, misal 'nabung' atau 'target_baru'.
+        user (str): Username pemilik event (lowercase).
+        **data: Field tambahan event.
+        
+    Returns:
+        dict: Event yang diterbitkan (dengan 'seq' dan 'ts').
+    """
+    global _feed_seq
+    with _feed_kondisi:
+        _feed_seq += 1
+        ev = {"seq": _feed_seq, "ts": waktu_sekarang(), "jenis": jenis, "user": user}
+        ev.update(data)
+        _feed.append(ev)
+        _feed_kondisi.notify_all()
+
+    for sub in _pelanggan.values():
+        if sub["user"] is not None and sub["user"] != user:
+            continue
+        if sub["tertinggal"] or len(sub["antrian"]) >= sub["maks"]:
+            sub["tertinggal"] = True
+        else:
+            sub["antrian"].append(ev)
+    return ev
+
+def _feed_transaksi(user, target_name, rows):
+    """
+    Pendengar jurnal: menerbitkan event untuk setiap transaksi.
+    """
+    sumber = kunci_sumber(target_name)
+    for ts, tipe, jumlah, catatan in rows:
+        terbitkan(tipe, user, sumber=sumber, jumlah=jumlah, catatan=catatan, ts_transaksi=ts)
+
+_pendengar_transaksi.append(_feed_transaksi)
+
+def event_sejak(cursor, user=None, maks=FEED_ANTRIAN):
+    """
+    Mengambil event dari log setelah cursor.
+    
+    Args:
+        cursor (int): seq event terakhir yang sudah diterima.
+        user (str): Hanya event milik user ini. None = semua user.
+        maks (int): Jumlah event maksimum.
+        
+    Returns:
+        list: Event terurut seq, diawali event 'gap' jika sebagian event
+              setelah cursor sudah tidak ada di log.
+    """
+    with _feed_kondisi:
+        out = []
+        awal = _feed[0]["seq"] if _feed else _feed_seq + 1
+        if cursor + 1 < awal:
+            out.append({"seq": awal - 1, "jenis": "gap", "dari": cursor + 1, "sampai": awal - 1})
+            cursor = awal - 1
+        for ev in islice(_feed, cursor + 1 - awal, None):
+            if len(out) >= maks:
+                break
+            if user is None or ev["user"] == user:
+                out.append(ev)
+    return out
+
+def langganan(user=None, dari=None, maks_antrian=FEED_ANTRIAN):
+    """
+    Mendaftarkan pelanggan feed dalam proses.
+    
+    Args:
+        user (str): Hanya event milik user ini. None = semua user.
+        dari (int): Cursor awal (seq terakhir yang sudah diterima) untuk
+                    melanjutkan langganan lama. None = mulai dari sekarang.
+        maks_antrian (int): Kapasitas antrian pelanggan.
+        
+    Returns:
+        int: ID pelanggan untuk ambil_feed() / berhenti_langganan().
+    """
+    global _id_pelanggan
+    _id_pelanggan += 1
+    _pelanggan[_id_pelanggan] = {
+        "user": user,
+        "cursor": _feed_seq if dari is None else dari,
+        "antrian": deque(),
+        "maks": maks_antrian,
+        "tertinggal": dari is not None and dari < _feed_seq
+    }
+    return _id_pelanggan
+
+def ambil_feed(id_pelanggan, maks=100):
+    """
+    Mengambil event berikutnya untuk pelanggan dan memajukan cursornya.
+    
+    Args:
+        id_pelanggan (int): ID dari langganan().
+        maks (int): Jumlah event maksimum yang diambil.
+        
+    Returns:
+        list: Event (bisa kosong). Cursor terbaru ada di seq event terakhir.
+    """
+    sub = _pelanggan[id_pelanggan]
+    antrian = sub["antrian"]
+    out = [antrian.popleft() for _ in range(min(maks, len(antrian)))]
+    if not out and sub["tertinggal"]:
+        out = event_sejak(sub["cursor"], sub["user"], maks)
+        if not out or len(out) < maks:
+            sub["tertinggal"] = False
+    if out:
+        sub["cursor"] = out[-1]["seq"]
+    return out
+
+def berhenti_langganan(id_pelanggan):
+    """
+    Menghapus pelanggan feed.
+    
+    Args:
+        id_pelanggan (int): ID dari langganan().
+        
+    Returns:
+        int: Cursor terakhir, untuk melanjutkan lewat langganan(dari=...).
+    """
+    return _pelanggan.pop(id_pelanggan)["cursor"]
+
+def token_feed(user, baru=False):
+    """
+    Mengambil token stream feed milik user, membuatnya jika belum ada.
+    
+    Args:
+        user (str): Username pengguna (lowercase).
+        baru (bool): Ganti token lama (token lama langsung tidak berlaku).
+        
+    Returns:
+        str: Token acak (hex).
+    """
+    lama = next((t for t, u in _token_feed.items() if u == user), None)
+    if lama is not None and not baru:
+        return lama
+    _token_feed.pop(lama, None)
+    token = secrets.token_hex(16)
+    _token_feed[token] = user
+    return token
+
+def _layani_klien_feed(conn):
+    """
+    Thread per klien stream: cek token, kirim event pemilik token sejak
+    cursor klien lalu tunggu event baru. Klien yang lambat hanya
+    tertinggal di cursornya sendiri.
+    """
+    try:
+        with conn, conn.makefile("rwb") as f:
+            conn.settimeout(FEED_HANDSHAKE_TIMEOUT)
+            bagian = f.readline().decode("utf-8", "replace").split()
+            conn.settimeout(None)
+            user = next((u for t, u in _token_feed.items()
+                         if bagian and secrets.compare_digest(t, bagian[0])), None)
+            if user is None:
+                f.write(b'{"jenis": "error", "pesan": "token tidak valid"}\n')
+                return
+            cursor = int(bagian[1]) if len(bagian) > 1 and bagian[1].isdigit() else _feed_seq
+            while True:
+                with _feed_kondisi:
+                    _feed_kondisi.wait_for(lambda: _feed_seq > cursor)
+                    akhir = _feed_seq
+                evs = event_sejak(cursor, user)
+                for ev in evs:
+                    f.write(json.dumps(ev, ensure_ascii=False).encode("utf-8") + b"\n")
+                    cursor = ev["seq"]
+                if len(evs) < FEED_ANTRIAN:
+                    # Event user lain sampai 'akhir' sudah terlewati semua.
+                    cursor = max(cursor, akhir)
+                f.flush()
+    except (OSError, ValueError):
+        pass
+
+def mulai_stream_feed(alamat):
+    """
+    Membuka stream feed lokal di background thread.
+    
+    Unix socket dibuat dengan izin 0600 (hanya pemilik proses). Baik Unix
+    socket maupun TCP tetap mewajibkan token per user (token_feed).
+    
+    Args:
+        alamat (str): Path Unix socket, atau nomor port untuk TCP di
+                      127.0.0.1 (dipakai juga di sistem tanpa Unix socket).
+                      
+    Returns:
+        socket.socket: Socket server yang sedang mendengarkan.
+    """
+    global _server_feed
+    if alamat.isdigit() or not hasattr(socket, "AF_UNIX"):
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        server.bind(("127.0.0.1", int(alamat)))
+    else:
+        if os.path.exists(alamat):
+            os.remove(alamat)
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        umask = os.umask(0o177)
+        try:
+            server.bind(alamat)
+        finally:
+            os.umask(umask)
+        os.chmod(alamat, 0o600)
+    server.listen()
+    _server_feed = server
+
+    def terima():
+        while True:
+            try:
+                conn, _ = server.accept()
+            except OSError:
+                return
+            threading.Thread(target=_layani_klien_feed, args=(conn,), daemon=True).start()
+
+    threading.Thread(target=terima, daemon=True).start()
+    return server
+
 # =========================================================
 #  FITUR NABUNG
 # =========================================================
 
+def catat_nabung(user, target_name, jumlah, catatan="-", ts=None):
+    """
+    Mencatat uang masuk ke saldo utama atau saldo target (tanpa interaksi).
+    
+    Dipakai oleh menu nabung maupun auto-nabung terjadwal, sehingga semua
+    setoran tercatat di riwayat dengan cara yang sama. Setoran ke target
+    tidak pernah melebihi nominal target: kelebihannya masuk ke saldo
+    utama dengan transaksi tersendiri, jadi tidak ada uang yang hilang
+    dari catatan.
+    
+    Args:
+        user (str): Username pengguna (lowercase).
+        target_name (str): Nama target, atau None untuk saldo utama.
+        jumlah (int): Nominal yang ditabung.
+        catatan (str): Catatan transaksi. Default "-".
+        ts (int): Epoch timestamp transaksi. Default waktu sekarang.
+        
+    Returns:
+        bool: True jika setoran ini membuat target tercapai.
+    """
+    if ts is None:
+        ts = waktu_sekarang()
+
+    if target_name is None:
+        _checkpoint_transaksi(user, None, ts, jumlah)
+        users[user]["saldo_utama"] += jumlah
+        catat_riwayat(user, None, [[ts, "nabung", jumlah, catatan]])
+        return False
+
+    tdata = users[user]["targets"][target_name]
+    masuk = min(jumlah, max(tdata["target"] - tdata["saldo"], 0))
+    if masuk:
+        _checkpoint_transaksi(user, target_name, ts, masuk)
+        ubah_saldo_target(user, target_name, masuk)
+        catat_riwayat(user, target_name, [[ts, "nabung", masuk, catatan]])
+
+    lebih = jumlah - masuk
+    if lebih:
+        _checkpoint_transaksi(user, None, ts, lebih)
+        users[user]["saldo_utama"] += lebih
+        catat_riwayat(user, None,
+                      [[ts, "nabung", lebih, f"{catatan} (kelebihan target {target_name})"]])
+
+    tercapai = tdata["saldo"] >= tdata["target"]
+    if tercapai and tdata["status"] != "selesai":
+        set_status_target(user, target_name, "selesai")
+    return tercapai
+
 def nabung(user):
     """
     Menu untuk menambah tabungan (uang masuk).
@@ -737,6 +1843,7 @@ def nabung(user):
     3. Input catatan opsional
     4. Catat transaksi dalam riwayat
     5. Jika target tercapai, ubah status target menjadi 'selesai'
+       (kelebihan setoran dipindah ke saldo utama)
     
     Args:
         user (str): Username pengguna yang login (lowercase).
@@ -751,23 +1858,18 @@ def nabung(user):
     jumlah = input_nominal("Masukkan jumlah uang: Rp ")
     catatan = input("Catatan (opsional): ").strip() or "-"
 
-    now = datetime.now().strftime("%Y-%m-%d %H:%M")
-
     if sumber == "utama":
-        users[user]["saldo_utama"] += jumlah
-        users[user]["riwayat"].append([now, "nabung", jumlah, catatan])
+        catat_nabung(user, None, jumlah, catatan)
         print(green("✅ Nabung ke saldo utama berhasil!"))
         input("Enter...")
         return
 
     tdata = users[user]["targets"][target_name]
-    tdata["saldo"] += jumlah
-    tdata["riwayat"].append([now, "nabung", jumlah, catatan])
-
-    if tdata["saldo"] >= tdata["target"]:
-        tdata["saldo"] = tdata["target"]
-        tdata["status"] = "selesai"
+    lebih = max(jumlah - (tdata["target"] - tdata["saldo"]), 0)
+    if catat_nabung(user, target_name, jumlah, catatan):
         print(yellow(f"🎉 Target '{target_name}' telah tercapai!"))
+        if lebih:
+            print(cyan(f"Kelebihan Rp {format_rupiah(lebih)} masuk ke saldo utama."))
     else:
         print(green(f"✅ Nabung ke '{target_name}' berhasil."))
 
@@ -775,86 +1877,781 @@ def nabung(user):
 
 
 # =========================================================
-#  FITUR PENGELUARAN
+#  AUTO-NABUNG TERJADWAL
 # =========================================================
 
-def pengeluaran(user):
+INTERVAL_JADWAL = ("harian", "mingguan", "bulanan")
+NAMA_HARI = ("Senin", "Selasa", "Rabu", "Kamis", "Jumat", "Sabtu", "Minggu")
+
+# Min-heap global berisi (next_run, user, rule_id) untuk semua jadwal aktif.
+# Entri basi (jadwal dihapus / dinonaktifkan / next_run berubah) dibuang
+# secara lazy saat di-pop, jadi tidak perlu pencarian di dalam heap.
+_jadwal_heap = []
+
+def jadwal_pertama(interval, anchor, ts=None):
     """
-    Menu untuk mencatat pengeluaran (uang keluar).
+    Menghitung waktu jalan pertama sebuah jadwal: kejadian 00:00 lokal
+    berikutnya setelah 'ts', jadi jadwal baru tidak langsung jalan saat dibuat.
     
-    Fitur:
-    - Dari Saldo Utama: Jika saldo tidak cukup, tarik semua saldo yang tersedia
-    - Dari Saldo Target: 
-      * Hanya bisa 1x per tahun
-      * Maksimal yang bisa ditarik adalah 30% dari saldo target
-      * Catat tanggal penarikan terakhir untuk validasi 1 tahun ke depan
+    Args:
+        interval (str): 'harian', 'mingguan', atau 'bulanan'.
+        anchor (int): Hari dalam minggu (0=Senin) untuk mingguan,
+                      tanggal (1-31) untuk bulanan, diabaikan untuk harian.
+        ts (int): Epoch acuan. Default waktu sekarang.
+        
+    Returns:
+        int: Epoch timestamp jadwal pertama (selalu > ts).
+    """
+    if ts is None:
+        ts = waktu_sekarang()
+    d = ke_datetime(ts).date()
+    if interval == "mingguan":
+        d = d.fromordinal(d.toordinal() + (anchor - d.weekday()) % 7)
+    if interval == "bulanan":
+        tahun, bulan = d.year, d.month
+        if d.day > min(anchor, _hari_terakhir(tahun, bulan)):
+            tahun, bulan = (tahun + 1, 1) if bulan == 12 else (tahun, bulan + 1)
+        run = _tengah_malam(tahun, bulan, min(anchor, _hari_terakhir(tahun, bulan)))
+    else:
+        run = _tengah_malam(d.year, d.month, d.day)
+    if run <= ts:
+        run = jadwal_berikutnya({"next_run": run, "interval": interval, "anchor": anchor})
+    return run
+
+def jadwal_berikutnya(rule):
+    """
+    Menghitung waktu jalan berikutnya setelah rule['next_run'].
+    
+    Perhitungan memakai tanggal lokal (bukan +86400 detik) supaya tetap
+    jatuh pukul 00:00 walau ada pergantian DST. Jadwal bulanan memakai
+    tanggal anchor, misal tanggal 31 → 28/29 Feb → 31 Mar.
     
     Args:
-        user (str): Username pengguna yang login (lowercase).
+        rule (dict): Data jadwal.
+        
+    Returns:
+        int: Epoch timestamp jadwal berikutnya.
     """
-    clear()
-    print(bold(red("🧾 CATAT PENGELUARAN")))
+    d = ke_datetime(rule["next_run"]).date()
+    if rule["interval"] == "harian":
+        d = d.fromordinal(d.toordinal() + 1)
+    elif rule["interval"] == "mingguan":
+        d = d.fromordinal(d.toordinal() + 7)
+    else:
+        tahun, bulan = (d.year + 1, 1) if d.month == 12 else (d.year, d.month + 1)
+        return _tengah_malam(tahun, bulan, min(rule["anchor"], _hari_terakhir(tahun, bulan)))
+    return _tengah_malam(d.year, d.month, d.day)
 
-    sumber, target_name = pilih_sumber_saldo(user, "keluar")
-    if sumber is None:
-        return
+def tambah_jadwal(user, target_name, nominal, interval, anchor=0, catatan="Auto-nabung"):
+    """
+    Mendaftarkan jadwal auto-nabung baru untuk user.
+    
+    Args:
+        user (str): Username pengguna (lowercase).
+        target_name (str): Nama target tujuan, atau None untuk saldo utama.
+        nominal (int): Nominal setiap setoran.
+        interval (str): 'harian', 'mingguan', atau 'bulanan'.
+        anchor (int): Hari (0=Senin) untuk mingguan, tanggal untuk bulanan.
+        catatan (str): Catatan yang ditulis di setiap transaksi.
+        
+    Returns:
+        dict: Data jadwal yang baru dibuat.
+    """
+    u = users[user]
+    jadwal = u["jadwal"]
+    # Penghitung ID tidak pernah turun, jadi ID jadwal yang sudah dihapus tidak
+    # dipakai ulang (entri heap lamanya bisa masih tersisa).
+    rule_id = u["jadwal_seq"] = max(u.get("jadwal_seq", 0), max(jadwal, default=0)) + 1
+    rule = {
+        "id": rule_id,
+        "target": target_name,
+        "nominal": nominal,
+        "interval": interval,
+        "anchor": anchor,
+        "catatan": catatan,
+        "next_run": jadwal_pertama(interval, anchor),
+        "aktif": True
+    }
+    jadwal[rule_id] = rule
+    heapq.heappush(_jadwal_heap, (rule["next_run"], user, rule_id))
+    return rule
 
-    jumlah = input_nominal("Masukkan jumlah pengeluaran: Rp ")
-    catatan = input("Catatan (opsional): ").strip() or "-"
-    now = datetime.now()
+def hapus_jadwal(user, rule_id):
+    """
+    Menghapus jadwal auto-nabung. Entri heap-nya dibuang secara lazy.
+    
+    Args:
+        user (str): Username pengguna (lowercase).
+        rule_id (int): ID jadwal.
+        
+    Returns:
+        dict: Data jadwal yang dihapus, atau None jika tidak ada.
+    """
+    return users[user]["jadwal"].pop(rule_id, None)
 
-    # ------- SALDO UTAMA -------
-    if sumber == "utama":
-        saldo = users[user]["saldo_utama"]
+def muat_jadwal():
+    """
+    Membangun ulang heap jadwal dari seluruh data user (dipanggil saat startup).
+    """
+    _jadwal_heap.clear()
+    for uname, u in users.items():
+        for rule_id, rule in u["jadwal"].items():
+            if rule["aktif"]:
+                _jadwal_heap.append((rule["next_run"], uname, rule_id))
+    heapq.heapify(_jadwal_heap)
+
+def jalankan_jadwal(now=None):
+    """
+    Menjalankan semua auto-nabung yang sudah jatuh tempo, termasuk yang
+    terlewat (catch-up), dalam satu batch.
+    
+    Jadwal diproses satu kejadian per pop heap, sehingga seluruh setoran
+    dari semua user diterapkan berurutan sesuai waktu jadwalnya. Setiap
+    kejadian dicatat lewat catat_nabung() dengan timestamp jadwalnya.
+    Jadwal ke target yang sudah selesai/dihapus otomatis dinonaktifkan.
+    
+    Args:
+        now (int): Epoch acuan. Default waktu sekarang.
+        
+    Returns:
+        int: Jumlah setoran yang diterapkan.
+    """
+    if now is None:
+        now = waktu_sekarang()
+
+    applied = 0
+    while _jadwal_heap and _jadwal_heap[0][0] <= now:
+        run_at, uname, rule_id = heapq.heappop(_jadwal_heap)
+        rule = users.get(uname, {}).get("jadwal", {}).get(rule_id)
+        if rule is None or not rule["aktif"] or rule["next_run"] != run_at:
+            continue
 
-        if jumlah > saldo:
-            print(yellow("⚠️ Saldo tidak cukup, semua saldo akan digunakan."))
-            jumlah = saldo
+        target_name = rule["target"]
+        if target_name is not None and target_name not in users[uname]["target_aktif"]:
+            rule["aktif"] = False
+            continue
 
-        users[user]["saldo_utama"] -= jumlah
-        users[user]["riwayat"].append([now.strftime("%Y-%m-%d %H:%M"), "keluar", jumlah, catatan])
+        catat_nabung(uname, target_name, rule["nominal"], rule["catatan"], run_at)
+        applied += 1
 
-        print(green("✅ Pengeluaran berhasil dicatat."))
-        input("Enter...")
-        return
+        rule["next_run"] = jadwal_berikutnya(rule)
+        heapq.heappush(_jadwal_heap, (rule["next_run"], uname, rule_id))
 
-    # ------- SALDO TARGET -------
-    tdata = users[user]["targets"][target_name]
+    return applied
 
-    if tdata["saldo"] <= 0:
-        print(red("❌ Saldo target kosong."))
-        input("Enter...")
-        return
+def deskripsi_jadwal(rule):
+    """
+    Membuat teks ringkas sebuah jadwal untuk ditampilkan di menu.
+    
+    Args:
+        rule (dict): Data jadwal.
+        
+    Returns:
+        str: Deskripsi jadwal, misal "Rp 50.000,00 tiap Senin → Liburan".
+    """
+    if rule["interval"] == "harian":
+        kapan = "tiap hari"
+    elif rule["interval"] == "mingguan":
+        kapan = f"tiap {NAMA_HARI[rule['anchor']]}"
+    else:
+        kapan = f"tiap tanggal {rule['anchor']}"
+    tujuan = rule["target"] or "Saldo Utama"
+    status = "" if rule["aktif"] else " (nonaktif)"
+    return f"Rp {format_rupiah(rule['nominal'])} {kapan} → {tujuan}{status}"
 
-    last_wd = tdata["last_withdraw"]
-    if last_wd:
-        delta = (now - last_wd).days
-        if delta < 365:
-            print(red("❌ Sudah melakukan penarikan tahun ini."))
-            print(yellow(f"Coba lagi dalam {365-delta} hari."))
-            input("Enter...")
-            return
+def menu_auto_nabung(user):
+    """
+    Menu kelola auto-nabung terjadwal.
+    
+    Opsi:
+    1. Tambah Jadwal - Pilih sumber, nominal, dan interval (harian/mingguan/bulanan)
+    2. Lihat Jadwal - Tampilkan semua jadwal beserta jadwal berikutnya
+    3. Hapus Jadwal - Pilih jadwal untuk dihapus
+    4. Kembali - Kembali ke menu sebelumnya
+    
+    Args:
+        user (str): Username pengguna yang login (lowercase).
+    """
+    while True:
+        clear()
+        print(bold(magenta("🔁 AUTO-NABUNG TERJADWAL")))
+        print("1. Tambah Jadwal")
+        print("2. Lihat Jadwal")
+        print("3. Hapus Jadwal")
+        print("4. Kembali")
 
-    max_tarik = int(tdata["saldo"] * 0.3)
-    if max_tarik <= 0:
-        print(red("❌ Saldo tidak mencukupi untuk penarikan 30%."))
-        input("Enter...")
-        return
+        pilih = input(bold("Pilih: ")).strip()
 
-    print(yellow("⚠️ Penarikan target hanya 1x setahun"))
-    print(cyan(f"Total yang akan ditarik: Rp {format_rupiah(max_tarik)}"))
+        if pilih == "1":
+            sumber, target_name = pilih_sumber_saldo(user, "nabung")
+            if sumber is None:
+                continue
 
-    if input("Lanjutkan? (Y/n): ").lower() not in ("y", ""):
-        print("❌ Dibatalkan.")
-        input("Enter...")
-        return
+            nominal = input_nominal("Nominal tiap setoran: Rp ")
+            print("Interval: 1. Harian  2. Mingguan  3. Bulanan")
+            sel = input("Pilih (1/2/3): ").strip()
+            if sel not in ("1", "2", "3"):
+                print(red("❌ Pilihan tidak valid."))
+                input("Enter...")
+                continue
+            interval = INTERVAL_JADWAL[int(sel) - 1]
+
+            anchor = 0
+            if interval == "mingguan":
+                for i, h in enumerate(NAMA_HARI, 1):
+                    print(f"{i}. {h}")
+                sel = input("Hari: ").strip()
+                if not sel.isdigit() or not (1 <= int(sel) <= 7):
+                    print(red("❌ Pilihan tidak valid."))
+                    input("Enter...")
+                    continue
+                anchor = int(sel) - 1
+            elif interval == "bulanan":
+                sel = input("Tanggal (1-31): ").strip()
+                if not sel.isdigit() or not (1 <= int(sel) <= 31):
+                    print(red("❌ Tanggal tidak valid."))
+                    input("Enter...")
+                    continue
+                anchor = int(sel)
 
-    tdata["saldo"] -= max_tarik
-    tdata["last_withdraw"] = now
-    tdata["riwayat"].append([now.strftime("%Y-%m-%d %H:%M"), "keluar", max_tarik, catatan])
+            catatan = input("Catatan (opsional): ").strip() or "Auto-nabung"
+            rule = tambah_jadwal(user, target_name, nominal, interval, anchor, catatan)
+            print(green(f"✅ Jadwal dibuat: {deskripsi_jadwal(rule)}"))
+            print(cyan(f"Jalan pertama: {format_waktu(rule['next_run'], '%d %B %Y')}"))
+            jalankan_jadwal()
+            input("Enter...")
+
+        elif pilih == "2":
+            clear()
+            print(bold(cyan("📋 DAFTAR JADWAL")))
+            jadwal = users[user]["jadwal"]
+            if not jadwal:
+                print("(Belum ada jadwal)")
+            for rule in jadwal.values():
+                print(f"#{rule['id']} {deskripsi_jadwal(rule)}")
+                if rule["aktif"]:
+                    print(f"    berikutnya: {format_waktu(rule['next_run'], '%d %B %Y')}")
+            input("Enter...")
+
+        elif pilih == "3":
+            clear()
+            jadwal = users[user]["jadwal"]
+            if not jadwal:
+                print("Tidak ada jadwal untuk dihapus.")
+                input("Enter...")
+                continue
+
+            print(bold(red("🗑️ HAPUS JADWAL")))
+            for rule in jadwal.values():
+                print(f"#{rule['id']} {deskripsi_jadwal(rule)}")
+
+            sel = input("Masukkan nomor jadwal: #").strip()
+            if not sel.isdigit() or int(sel) not in jadwal:
+                print("❌ Pilihan tidak valid.")
+            else:
+                hapus_jadwal(user, int(sel))
+                print(green("✅ Jadwal berhasil dihapus."))
+            input("Enter...")
+
+        elif pilih == "4":
+            break
+
+        else:
+            print(red("❌ Pilihan tidak valid."))
+            input("Enter...")
+
+
+# =========================================================
+#  KEBIJAKAN PENARIKAN TARGET
+# =========================================================
+
+# Kebijakan bawaan: 1x per 365 hari, maksimal 30% dari saldo target.
+# 'batas' bisa 'persen' (nilai = 1-100) atau 'tetap' (nilai = nominal Rupiah).
+KEBIJAKAN_DEFAULT = {"cooldown_hari": 365, "batas": "persen", "nilai": 30}
+
+def valid_kebijakan(cooldown_hari, batas, nilai):
+    """
+    Memvalidasi pengaturan kebijakan penarikan target.
+    
+    Args:
+        cooldown_hari (int): Jeda minimal antar penarikan (hari, >= 0).
+        batas (str): 'persen' atau 'tetap'.
+        nilai (int): Persentase (1-100) atau nominal tetap (> 0).
+        
+    Returns:
+        tuple: (bool, str) - (is_valid, error_message)
+    """
+    if cooldown_hari < 0:
+        return False, "Jeda penarikan tidak boleh negatif."
+    if batas not in ("persen", "tetap"):
+        return False, "Jenis batas harus 'persen' atau 'tetap'."
+    if batas == "persen" and not (1 <= nilai <= 100):
+        return False, "Persentase harus 1–100."
+    if batas == "tetap" and nilai <= 0:
+        return False, "Nominal batas harus lebih dari 0."
+    return True, ""
+
+def atur_kebijakan(user, nama, cooldown_hari, batas, nilai):
+    """
+    Mengubah kebijakan penarikan sebuah target.
+    
+    Args:
+        user (str): Username pengguna (lowercase).
+        nama (str): Nama target (case-insensitive).
+        cooldown_hari (int): Jeda minimal antar penarikan (hari).
+        batas (str): 'persen' atau 'tetap'.
+        nilai (int): Persentase atau nominal tetap.
+        
+    Returns:
+        tuple: (bool, str) - (berhasil, pesan_error)
+    """
+    asli = cari_target(user, nama)
+    if asli is None:
+        return False, "Target tidak ditemukan."
+    valid, msg = valid_kebijakan(cooldown_hari, batas, nilai)
+    if not valid:
+        return False, msg
+    users[user]["targets"][asli]["kebijakan"] = {
+        "cooldown_hari": cooldown_hari,
+        "batas": batas,
+        "nilai": nilai
+    }
+    return True, ""
+
+def batas_penarikan(tdata, now=None):
+    """
+    Menghitung berapa yang boleh ditarik dari target dan kapan.
+    
+    Seluruh perhitungan memakai integer (tanpa float), sehingga tetap
+    tepat untuk saldo hingga 10^12 ke atas.
+    
+    Args:
+        tdata (dict): Data target.
+        now (int): Epoch acuan. Default waktu sekarang.
+        
+    Returns:
+        tuple: (maks, bisa_pada)
+               - maks: Nominal maksimal yang bisa ditarik saat ini (0 jika tidak bisa)
+               - bisa_pada: Epoch paling cepat penarikan diizinkan (<= now jika sudah boleh)
+    """
+    if now is None:
+        now = waktu_sekarang()
+
+    kb = tdata["kebijakan"]
+    last_wd = tdata["last_withdraw"]
+    bisa_pada = now if last_wd is None else last_wd + kb["cooldown_hari"] * DETIK_PER_HARI
+    if bisa_pada > now:
+        return 0, bisa_pada
+
+    if kb["batas"] == "persen":
+        maks = tdata["saldo"] * kb["nilai"] // 100
+    else:
+        maks = min(kb["nilai"], tdata["saldo"])
+    return maks, bisa_pada
+
+def cek_penarikan_semua(user, now=None):
+    """
+    Pre-check penarikan untuk seluruh target user dalam satu panggilan.
+    
+    Args:
+        user (str): Username pengguna (lowercase).
+        now (int): Epoch acuan. Default waktu sekarang.
+        
+    Returns:
+        dict: {nama_target: (maks, bisa_pada)} sesuai batas_penarikan().
+    """
+    if now is None:
+        now = waktu_sekarang()
+    return {nama: batas_penarikan(t, now) for nama, t in users[user]["targets"].items()}
+
+def deskripsi_kebijakan(kb):
+    """
+    Membuat teks ringkas kebijakan penarikan, misal "30% tiap 365 hari".
+    
+    Args:
+        kb (dict): Data kebijakan penarikan.
+        
+    Returns:
+        str: Deskripsi kebijakan.
+    """
+    if kb["batas"] == "persen":
+        batas = f"maks {kb['nilai']}% saldo"
+    else:
+        batas = f"maks Rp {format_rupiah(kb['nilai'])}"
+    if kb["cooldown_hari"] == 0:
+        return f"{batas}, tanpa jeda"
+    return f"{batas}, 1x tiap {kb['cooldown_hari']} hari"
+
+def lihat_batas_penarikan(user):
+    """
+    Menampilkan berapa yang bisa ditarik dari setiap target dan kapan.
+    
+    Args:
+        user (str): Username pengguna yang login (lowercase).
+    """
+    clear()
+    print(bold(cyan("🔎 CEK BATAS PENARIKAN TARGET")))
+    targets = users[user]["targets"]
+    if not targets:
+        print("(Belum ada target)")
+        input("Enter...")
+        return
+
+    now = waktu_sekarang()
+    for nama, (maks, bisa_pada) in cek_penarikan_semua(user, now).items():
+        print(f"{nama} ({deskripsi_kebijakan(targets[nama]['kebijakan'])})")
+        if bisa_pada > now:
+            print(yellow(f"    ⏳ Bisa tarik lagi {format_waktu(bisa_pada, '%d %B %Y')}"))
+        elif maks > 0:
+            print(green(f"    ✅ Bisa tarik sekarang hingga Rp {format_rupiah(maks)}"))
+        else:
+            print(red("    ❌ Saldo belum cukup untuk ditarik"))
+    input("Enter...")
+
+def catat_pengeluaran(user, target_name, jumlah, catatan="-", ts=None):
+    """
+    Mencatat uang keluar dari saldo utama atau saldo target (tanpa interaksi).
+    
+    - Saldo utama: jika saldo kurang, yang dipakai hanya sisa saldo.
+    - Saldo target: dibatasi kebijakan penarikan target, lalu tanggal
+      penarikan terakhir diperbarui.
+    
+    Args:
+        user (str): Username pengguna (lowercase).
+        target_name (str): Nama target, atau None untuk saldo utama.
+        jumlah (int): Nominal yang diminta.
+        catatan (str): Catatan transaksi. Default "-".
+        ts (int): Epoch timestamp transaksi. Default waktu sekarang.
+        
+    Returns:
+        int: Nominal yang benar-benar dikeluarkan (0 jika tidak diizinkan).
+    """
+    if ts is None:
+        ts = waktu_sekarang()
+
+    if target_name is None:
+        jumlah = min(jumlah, users[user]["saldo_utama"])
+        _checkpoint_transaksi(user, None, ts, -jumlah)
+        users[user]["saldo_utama"] -= jumlah
+        catat_riwayat(user, None, [[ts, "keluar", jumlah, catatan]])
+        return jumlah
+
+    tdata = users[user]["targets"][target_name]
+    maks, _ = batas_penarikan(tdata, ts)
+    jumlah = min(jumlah, maks)
+    if jumlah <= 0:
+        return 0
+
+    _checkpoint_transaksi(user, target_name, ts, -jumlah)
+    ubah_saldo_target(user, target_name, -jumlah)
+    tdata["last_withdraw"] = ts
+    catat_riwayat(user, target_name, [[ts, "keluar", jumlah, catatan]])
+    return jumlah
+
+# =========================================================
+#  CATAT BANYAK TRANSAKSI (BATCH)
+# =========================================================
+
+def parse_baris_batch(user, teks):
+    """
+    Mengurai satu baris input batch: "jumlah | catatan | YYYY-MM-DD | target".
+    
+    Hanya jumlah yang wajib. Tanggal kosong berarti sekarang, target
+    kosong berarti saldo utama (nama target case-insensitive).
+    
+    Args:
+        user (str): Username pengguna (lowercase).
+        teks (str): Baris yang diinput user.
+        
+    Returns:
+        tuple: ((ts, jumlah, catatan, target_name), "") jika valid,
+               atau (None, pesan_error) jika tidak.
+    """
+    bagian = [b.strip() for b in teks.split("|")]
+    if len(bagian) > 4:
+        return None, "Terlalu banyak kolom."
+    bagian += [""] * (4 - len(bagian))
+    jumlah_str, catatan, tanggal, target = bagian
+
+    if not any(ch.isdigit() for ch in jumlah_str):
+        return None, "Nominal tidak boleh kosong."
+    jumlah = parse_nominal_input(jumlah_str)
+    if jumlah <= 0:
+        return None, "Nominal harus lebih dari 0."
+    if jumlah > MAX_NOMINAL:
+        return None, f"Batas maksimum Rp {format_rupiah(MAX_NOMINAL)}"
+
+    now = waktu_sekarang()
+    ts = now
+    if tanggal:
+        ts = parse_tanggal(tanggal)
+        if ts is None:
+            return None, "Format tanggal harus YYYY-MM-DD."
+        if ts > now:
+            return None, "Tanggal tidak boleh di masa depan."
+
+    target_name = None
+    if target and target.lower() != "utama":
+        target_name = cari_target(user, target)
+        if target_name is None:
+            return None, f"Target '{target}' tidak ditemukan."
+
+    return (ts, jumlah, catatan or "-", target_name), ""
+
+def catat_batch(user, tipe, entri):
+    """
+    Menerapkan banyak transaksi sekaligus secara atomik.
+    
+    Semua baris divalidasi dulu terhadap saldo bayangan (urut waktu):
+    hanya target aktif yang bisa dipakai, pengeluaran tidak boleh membuat
+    saldo sumbernya negatif di titik waktu mana pun sejak tanggal transaksi
+    (berlaku juga untuk baris bertanggal mundur), penarikan target harus
+    sesuai kebijakan penarikan, dan setoran target yang melebihi nominal
+    target dipindah ke saldo utama seperti catat_nabung(). Jika ada satu
+    saja yang gagal, tidak ada yang diterapkan. Jika semua valid, saldo
+    (lewat ubah_saldo_target), checkpoint, status target, dan riwayat
+    diperbarui sekali per batch (riwayat sekali per sumber).
+    
+    Args:
+        user (str): Username pengguna (lowercase).
+        tipe (str): 'nabung' atau 'keluar'.
+        entri (list): List (ts, jumlah, catatan, target_name) dari parse_baris_batch().
+        
+    Returns:
+        tuple: (list_error, jumlah_baris_tercatat). list_error berisi
+               (nomor_baris, pesan) dengan nomor mulai dari 1.
+    """
+    u = users[user]
+    targets = u["targets"]
+    saldo = {None: u["saldo_utama"]}
+    saldo.update((n, t["saldo"]) for n, t in targets.items())
+    last_wd = {}
+    rencana = []
+    errors = []
+
+    urut = sorted(range(len(entri)), key=lambda i: entri[i][0])
+    for i in urut:
+        ts, jumlah, catatan, target_name = entri[i]
+        if target_name is not None and target_name not in u["target_aktif"]:
+            # Sama seperti pilih_sumber_saldo(): hanya target aktif yang bisa dipakai.
+            errors.append((i + 1, f"Target '{target_name}' sudah selesai."))
+            continue
+        if tipe == "nabung":
+            if target_name is None:
+                rencana.append((None, [ts, "nabung", jumlah, catatan], jumlah))
+                saldo[None] += jumlah
+                continue
+            masuk = min(jumlah, max(targets[target_name]["target"] - saldo[target_name], 0))
+            lebih = jumlah - masuk
+            if masuk:
+                rencana.append((target_name, [ts, "nabung", masuk, catatan], masuk))
+                saldo[target_name] += masuk
+            if lebih:
+                row = [ts, "nabung", lebih, f"{catatan} (kelebihan target {target_name})"]
+                rencana.append((None, row, lebih))
+                saldo[None] += lebih
+            continue
+
+        # Baris batch sebelumnya (ts <= ts baris ini) menggeser saldo di
+        # semua titik sesudahnya sebesar selisih saldo bayangan vs saldo asli.
+        asli = u["saldo_utama"] if target_name is None else targets[target_name]["saldo"]
+        tersedia = saldo_minimum_sejak(user, target_name, ts) + saldo[target_name] - asli
+        if jumlah > tersedia:
+            sumber = "Saldo utama" if target_name is None else f"Saldo '{target_name}'"
+            errors.append((i + 1, f"{sumber} tidak cukup pada {format_waktu(ts, '%Y-%m-%d')} "
+                                  f"(tersedia Rp {format_rupiah(max(tersedia, 0))})."))
+            continue
+        if target_name is not None:
+            bayangan = {
+                "kebijakan": targets[target_name]["kebijakan"],
+                "saldo": saldo[target_name],
+                "last_withdraw": last_wd.get(target_name, targets[target_name]["last_withdraw"])
+            }
+            maks, bisa_pada = batas_penarikan(bayangan, ts)
+            if bisa_pada > ts:
+                errors.append((i + 1, f"'{target_name}' masih dalam masa jeda penarikan."))
+                continue
+            if jumlah > maks:
+                errors.append((i + 1, f"Melebihi batas penarikan '{target_name}' "
+                                      f"(maks Rp {format_rupiah(maks)})."))
+                continue
+            last_wd[target_name] = ts
+        rencana.append((target_name, [ts, "keluar", jumlah, catatan], -jumlah))
+        saldo[target_name] -= jumlah
+
+    if errors:
+        return sorted(errors), 0
+
+    # Rencana sudah urut waktu: terapkan per baris seperti catat_nabung()/
+    # catat_pengeluaran() supaya checkpoint dikoreksi dengan cara yang sama.
+    per_sumber = {}
+    for target_name, row, delta in rencana:
+        _checkpoint_transaksi(user, target_name, row[0], delta)
+        if target_name is None:
+            u["saldo_utama"] += delta
+        else:
+            ubah_saldo_target(user, target_name, delta)
+        per_sumber.setdefault(target_name, []).append(row)
+
+    for target_name, rows in per_sumber.items():
+        if target_name is not None and saldo[target_name] >= targets[target_name]["target"]:
+            set_status_target(user, target_name, "selesai")
+        catat_riwayat(user, target_name, rows)
+    for target_name, ts in last_wd.items():
+        targets[target_name]["last_withdraw"] = max(ts, targets[target_name]["last_withdraw"] or ts)
+
+    return [], len(rencana)
+
+def transaksi_batch(user):
+    """
+    Layar catat banyak transaksi sekaligus (nabung atau pengeluaran).
+    
+    Format tiap baris: jumlah | catatan | YYYY-MM-DD | target
+    (hanya jumlah yang wajib). Baris kosong mengakhiri input. Semua baris
+    divalidasi bersama lalu diterapkan sekaligus setelah dikonfirmasi.
+    
+    Args:
+        user (str): Username pengguna yang login (lowercase).
+    """
+    clear()
+    print(bold(cyan("🧾 CATAT BANYAK TRANSAKSI")))
+    print("1. Nabung")
+    print("2. Pengeluaran")
+    pil = input("Pilih (1/2): ").strip()
+    if pil not in ("1", "2"):
+        print(red("❌ Pilihan tidak valid."))
+        input("Enter...")
+        return
+    tipe = "nabung" if pil == "1" else "keluar"
+
+    print()
+    print("Format: jumlah | catatan | YYYY-MM-DD | target")
+    print("Contoh: 25000 | kopi | 2025-01-06 | Liburan")
+    print("Tanggal kosong = sekarang, target kosong = saldo utama.")
+    print("Baris kosong untuk selesai.")
+
+    entri = []
+    errors = []
+    while True:
+        teks = input(f"{len(entri) + len(errors) + 1:>3}> ").strip()
+        if not teks:
+            break
+        hasil, msg = parse_baris_batch(user, teks)
+        if hasil is None:
+            errors.append((len(entri) + len(errors) + 1, msg))
+        else:
+            entri.append(hasil)
+
+    if errors:
+        for no, msg in errors:
+            print(red(f"❌ Baris {no}: {msg}"))
+        print(yellow("Tidak ada yang dicatat. Perbaiki baris di atas lalu ulangi."))
+        input("Enter...")
+        return
+    if not entri:
+        return
+
+    total = sum(e[1] for e in entri)
+    print(cyan(f"{len(entri)} transaksi, total Rp {format_rupiah(total)}"))
+    if input("Catat semua? (Y/n): ").lower() not in ("y", ""):
+        print(yellow("Dibatalkan."))
+        input("Enter...")
+        return
+
+    sebelum = posisi_anggaran(user)
+    errors, n = catat_batch(user, tipe, entri)
+    if errors:
+        for no, msg in errors:
+            print(red(f"❌ Baris {no}: {msg}"))
+        print(yellow("Tidak ada yang dicatat."))
+    else:
+        print(green(f"✅ {n} transaksi berhasil dicatat."))
+        tampilkan_peringatan_anggaran(user, sebelum)
+    input("Enter...")
+
+# =========================================================
+#  FITUR PENGELUARAN
+# =========================================================
+
+def pengeluaran(user):
+    """
+    Menu untuk mencatat pengeluaran (uang keluar).
+    
+    Fitur:
+    - Dari Saldo Utama: Jika saldo tidak cukup, tarik semua saldo yang tersedia
+    - Dari Saldo Target: 
+      * Mengikuti kebijakan penarikan target (bawaan: 1x per tahun, maks 30%)
+      * Yang ditarik adalah nominal input, dibatasi maksimal kebijakan
+      * Catat tanggal penarikan terakhir untuk validasi jeda berikutnya
+    
+    Args:
+        user (str): Username pengguna yang login (lowercase).
+    """
+    clear()
+    print(bold(red("🧾 CATAT PENGELUARAN")))
+
+    sumber, target_name = pilih_sumber_saldo(user, "keluar")
+    if sumber is None:
+        return
+
+    jumlah = input_nominal("Masukkan jumlah pengeluaran: Rp ")
+    catatan = input("Catatan (opsional): ").strip() or "-"
+    now = waktu_sekarang()
+
+    # ------- SALDO UTAMA -------
+    if sumber == "utama":
+        saldo = users[user]["saldo_utama"]
+
+        if jumlah > saldo:
+            print(yellow("⚠️ Saldo tidak cukup, semua saldo akan digunakan."))
+
+        sebelum = posisi_anggaran(user, now)
+        catat_pengeluaran(user, None, jumlah, catatan, now)
+
+        print(green("✅ Pengeluaran berhasil dicatat."))
+        tampilkan_peringatan_anggaran(user, sebelum, now)
+        input("Enter...")
+        return
+
+    # ------- SALDO TARGET -------
+    tdata = users[user]["targets"][target_name]
+
+    if tdata["saldo"] <= 0:
+        print(red("❌ Saldo target kosong."))
+        input("Enter...")
+        return
+
+    kb = tdata["kebijakan"]
+    maks, bisa_pada = batas_penarikan(tdata, now)
+    if bisa_pada > now:
+        sisa_hari = -(-(bisa_pada - now) // DETIK_PER_HARI)
+        print(red("❌ Masih dalam masa jeda penarikan."))
+        print(yellow(f"Coba lagi dalam {sisa_hari} hari."))
+        input("Enter...")
+        return
+
+    if maks <= 0:
+        print(red("❌ Saldo tidak mencukupi untuk penarikan."))
+        input("Enter...")
+        return
+
+    tarik = min(jumlah, maks)
+    print(yellow(f"⚠️ Kebijakan target: {deskripsi_kebijakan(kb)}"))
+    print(cyan(f"Total yang akan ditarik: Rp {format_rupiah(tarik)}"))
+
+    if input("Lanjutkan? (Y/n): ").lower() not in ("y", ""):
+        print("❌ Dibatalkan.")
+        input("Enter...")
+        return
+
+    sebelum = posisi_anggaran(user, now)
+    catat_pengeluaran(user, target_name, tarik, catatan, now)
 
     print(green("✅ Penarikan berhasil!"))
-    print(cyan(f"Bisa tarik lagi: { (now + timedelta(days=365)).strftime('%d %B %Y') }"))
+    if kb["cooldown_hari"]:
+        bisa_pada = now + kb["cooldown_hari"] * DETIK_PER_HARI
+        print(cyan(f"Bisa tarik lagi: {format_waktu(bisa_pada, '%d %B %Y')}"))
+    tampilkan_peringatan_anggaran(user, sebelum, now)
     input("Enter...")
 
 
@@ -887,211 +2684,2905 @@ def lihat_saldo(user):
     print("-" * 40)
 
     print(bold(magenta("🎯 TARGET TABUNGAN")))
-    if not targets:
-        print("(Belum ada target)")
-    else:
-        for tname, tdata in targets.items():
-            t_target = tdata["target"]
-            t_saldo = tdata["saldo"]
+    print(render_daftar_target(user))
 
-            pct = int((t_saldo / t_target) * 100) if t_target else 0
-            pct = min(pct, 100)
+    input("Enter...")
 
-            bar_len = 20
-            filled = int(bar_len * pct / 100)
-            bar = "#" * filled + "-" * (bar_len - filled)
 
-            status = "🎉 Selesai" if pct == 100 else "Aktif"
+# =========================================================
+#  PRAKIRAAN TARGET (MONTE CARLO)
+# =========================================================
 
-            print(f"{tname} → Rp {t_saldo:,} / Rp {format_rupiah(t_target)}  ({pct}%) {status}")
-            print(f"    [{green(bar)}]")
+# Pola setoran sebuah target (jarak antar setoran & nominalnya) diambil
+# dari riwayatnya, lalu ribuan lintasan masa depan disimulasikan dengan
+# mengambil sampel acak dari pola tersebut (bootstrap). Penarikan tidak
+# ikut dimodelkan. Simulasi dipotong per PRAKIRAAN_PER_BAGIAN lintasan
+# (seed per potongan, jadi hasil tidak bergantung jumlah worker) dan
+# memakai NumPy jika terpasang. Simulasi kecil dijalankan di proses ini;
+# yang besar dibagi ke satu process pool yang dipakai ulang antar panggilan.
+# Hasil di-cache per target sampai riwayat/saldonya berubah.
 
-    input("Enter...")
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
+PRAKIRAAN_SIMULASI = 10_000
+PRAKIRAAN_MIN_SETORAN = 3
+PRAKIRAAN_LANGKAH = 64
+PRAKIRAAN_PER_BAGIAN = 2_000
+PRAKIRAAN_MIN_PARALEL = 4_000   # di bawah ini, biaya pool lebih mahal dari simulasinya
 
-# =========================================================
-#  LIHAT RIWAYAT TRANSAKSI
-# =========================================================
+_pool_prakiraan = None          # (workers, ProcessPoolExecutor), dibuat saat pertama dibutuhkan
 
-def lihat_riwayat(user):
+# (user, nama_target) → ((tanda_riwayat, deadline, sisa_hari, n), hasil)
+_prakiraan_cache = {}
+
+def pola_setoran(user, nama):
+    """
+    Mengambil pola setoran target dari riwayatnya (memori + file biner).
+    
+    Args:
+        user (str): Username pengguna (lowercase).
+        nama (str): Nama target sesuai penyimpanan di 'targets'.
+        
+    Returns:
+        tuple: (list_jarak_detik, list_nominal). Jarak antar setoran di
+               hari yang sama dibulatkan ke atas menjadi 1 jam.
+    """
+    waktu = []
+    nominal = []
+    for ts, tipe, jumlah, catatan in _iter_riwayat_record(users[user], nama):
+        if tipe == "nabung" and catatan != CATATAN_KOREKSI:
+            waktu.append(ts)
+            nominal.append(jumlah)
+    jarak = [max(b - a, 3600) for a, b in zip(waktu, waktu[1:])]
+    return jarak, nominal
+
+def _simulasi_prakiraan(args):
+    """
+    Menjalankan sebagian simulasi; dipanggil langsung atau di worker process.
+    
+    Args:
+        args (tuple): (jarak, nominal, kurang, horizon, n, seed).
+        
+    Returns:
+        int: Jumlah lintasan yang mencapai target sebelum horizon.
+    """
+    jarak, nominal, kurang, horizon, n, seed = args
+
+    if np is not None:
+        rng = np.random.default_rng(seed)
+        g = np.asarray(jarak, dtype=np.int64)
+        a = np.asarray(nominal, dtype=np.int64)
+        t = np.zeros(n, dtype=np.int64)
+        s = np.zeros(n, dtype=np.int64)
+        aktif = np.arange(n)
+        kena = 0
+        while aktif.size:
+            bentuk = (aktif.size, PRAKIRAAN_LANGKAH)
+            ct = t[aktif, None] + np.cumsum(g[rng.integers(0, g.size, bentuk)], axis=1)
+            cs = s[aktif, None] + np.cumsum(a[rng.integers(0, a.size, bentuk)], axis=1)
+            tercapai = ((cs >= kurang) & (ct <= horizon)).any(axis=1)
+            kena += int(tercapai.sum())
+            t[aktif] = ct[:, -1]
+            s[aktif] = cs[:, -1]
+            aktif = aktif[~tercapai & (ct[:, -1] <= horizon)]
+        return kena
+
+    import random
+    rng = random.Random(seed)
+    kena = 0
+    for _ in range(n):
+        t = s = 0
+        while True:
+            t += rng.choice(jarak)
+            if t > horizon:
+                break
+            s += rng.choice(nominal)
+            if s >= kurang:
+                kena += 1
+                break
+    return kena
+
+def _jalankan_prakiraan(jobs, workers):
+    """
+    Menjalankan potongan simulasi di process pool bersama.
+    
+    Pool dibuat sekali lalu dipakai ulang; dibuat ulang hanya jika jumlah
+    worker berubah. Jika pool rusak (worker mati), simulasi diulang di
+    proses ini dan pool dibuat lagi pada panggilan berikutnya.
+    
+    Args:
+        jobs (list): Argumen _simulasi_prakiraan per potongan.
+        workers (int): Jumlah worker process.
+        
+    Returns:
+        int: Total lintasan yang mencapai target.
+    """
+    global _pool_prakiraan
+    from concurrent.futures import ProcessPoolExecutor
+    from concurrent.futures.process import BrokenProcessPool
+
+    if _pool_prakiraan is None or _pool_prakiraan[0] != workers:
+        if _pool_prakiraan is not None:
+            _pool_prakiraan[1].shutdown(wait=False)
+        _pool_prakiraan = (workers, ProcessPoolExecutor(max_workers=workers))
+    try:
+        return sum(_pool_prakiraan[1].map(_simulasi_prakiraan, jobs))
+    except BrokenProcessPool:
+        _pool_prakiraan = None
+        return sum(map(_simulasi_prakiraan, jobs))
+
+def prakiraan_target(user, nama, deadline, n=PRAKIRAAN_SIMULASI, workers=None, seed=None):
+    """
+    Memperkirakan peluang target tercapai paling lambat pada deadline.
+    
+    Args:
+        user (str): Username pengguna (lowercase).
+        nama (str): Nama target sesuai penyimpanan di 'targets'.
+        deadline (int): Epoch batas waktu.
+        n (int): Jumlah lintasan simulasi.
+        workers (int): Jumlah worker process. None = jumlah CPU, 1 = tanpa pool.
+                       Di bawah PRAKIRAAN_MIN_PARALEL lintasan selalu tanpa pool.
+        seed (int): Seed acak (untuk hasil yang bisa diulang). None = acak.
+                    Seed yang sama memberi hasil sama berapa pun workers-nya.
+        
+    Returns:
+        dict: {"peluang": 0.0-1.0, "n": n, "setoran": jumlah_setoran,
+               "kurang": nominal_yang_belum_terkumpul}, atau None jika
+               setoran di riwayat kurang dari PRAKIRAAN_MIN_SETORAN.
+    """
+    tdata = users[user]["targets"][nama]
+    tanda = (hitung_riwayat(user, nama), tdata["saldo"], tdata["target"])
+    # Sisa waktu ikut jadi kunci (dibulatkan per hari), supaya peluang yang
+    # di-cache ikut berubah seiring deadline makin dekat.
+    horizon = deadline - waktu_sekarang()
+    kunci = (tanda, deadline, horizon // DETIK_PER_HARI, n)
+    cache = _prakiraan_cache.get((user, nama))
+    if cache is not None and cache[0] == kunci:
+        return cache[1]
+
+    kurang = max(tdata["target"] - tdata["saldo"], 0)
+    jarak, nominal = pola_setoran(user, nama)
+    if kurang == 0:
+        hasil = {"peluang": 1.0, "n": n, "setoran": len(nominal), "kurang": 0}
+    elif len(nominal) < PRAKIRAAN_MIN_SETORAN:
+        return None
+    else:
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if seed is None:
+            seed = int.from_bytes(os.urandom(4), "little")
+        jobs = [(jarak, nominal, kurang, horizon, min(PRAKIRAAN_PER_BAGIAN, n - i), seed + i)
+                for i in range(0, n, PRAKIRAAN_PER_BAGIAN)]
+        if horizon <= 0:
+            kena = 0
+        elif workers > 1 and n >= PRAKIRAAN_MIN_PARALEL:
+            kena = _jalankan_prakiraan(jobs, workers)
+        else:
+            kena = sum(map(_simulasi_prakiraan, jobs))
+        hasil = {"peluang": kena / n, "n": n, "setoran": len(nominal), "kurang": kurang}
+
+    _prakiraan_cache[(user, nama)] = (kunci, hasil)
+    return hasil
+
+def lihat_prakiraan(user):
+    """
+    Menu prakiraan: peluang target aktif tercapai sebelum tanggal tertentu.
+    
+    Args:
+        user (str): Username pengguna yang login (lowercase).
+    """
+    clear()
+    print(bold(magenta("🔮 PRAKIRAAN TARGET")))
+    names = list(users[user]["target_aktif"])
+    if not names:
+        print("Tidak ada target aktif.")
+        input("Enter...")
+        return
+
+    nama = pilih_nomor(names, "Pilih target: ")
+    if nama is None:
+        print(red("❌ Pilihan tidak valid."))
+        input("Enter...")
+        return
+
+    deadline = parse_tanggal(input("Tercapai paling lambat (YYYY-MM-DD): "))
+    if deadline is None:
+        print(red("❌ Format tanggal tidak valid."))
+        input("Enter...")
+        return
+    if deadline <= waktu_sekarang():
+        print(red("❌ Tanggal harus di masa depan."))
+        input("Enter...")
+        return
+
+    print(cyan(f"Menjalankan {PRAKIRAAN_SIMULASI:,} simulasi..."))
+    hasil = prakiraan_target(user, nama, hari_berikutnya(deadline))
+    if hasil is None:
+        print(yellow(f"⚠️ Butuh minimal {PRAKIRAAN_MIN_SETORAN} setoran di riwayat target "
+                     "untuk membaca pola."))
+        input("Enter...")
+        return
+
+    pct = hasil["peluang"] * 100
+    warna = green if pct >= 70 else yellow if pct >= 40 else red
+    print(f"Kurang            : Rp {format_rupiah(hasil['kurang'])}")
+    print(f"Pola dari         : {hasil['setoran']} setoran")
+    print(warna(f"Peluang tercapai sebelum {format_waktu(deadline, '%d %B %Y')}: {pct:.1f}%"))
+    input("Enter...")
+
+# =========================================================
+#  KUNCI FILE & VERSI FILE
+# =========================================================
+
+# File yang ditulis aplikasi (riwayat biner, backup, arsip) dilindungi
+# advisory lock: banyak pembaca boleh bersamaan (shared), penulis
+# eksklusif. File lock dikumpulkan di direktori DIR_KUNCI di samping file
+# datanya dan sengaja tidak dihapus (menghapus file lock yang sedang
+# ditunggu sesi lain membuat dua sesi memegang lock berbeda). Penulisan
+# selalu ke file sementara lalu os.replace, jadi pembaca tidak pernah
+# melihat file setengah jadi. Di Windows (msvcrt) hanya ada lock
+# eksklusif, sehingga pembaca ikut antre.
+#
+# File riwayat biner milik user juga memakai optimistic versioning: versi
+# file (mtime, ukuran, inode) yang terakhir ditulis sesi ini disimpan di
+# u["versi_file"], dan tulis_atomik() menolak menimpa file yang sudah
+# diganti sesi lain sejak itu.
+
+if os.name != "nt":
+    import fcntl
+
+KUNCI_TIMEOUT = 10.0
+DIR_KUNCI = ".chillfinance-kunci"
+
+class KonflikVersi(Exception):
+    """
+    File sudah diubah sesi lain sejak versinya terakhir dicatat.
+    """
+
+def path_kunci(path):
+    """
+    Path file lock untuk sebuah file data (di DIR_KUNCI, dibuat jika perlu).
+    
+    Args:
+        path (str): Path file data.
+        
+    Returns:
+        str: Path file lock.
+    """
+    folder = os.path.join(os.path.dirname(path), DIR_KUNCI)
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, os.path.basename(path) + ".lock")
+
+def versi_file(path):
+    """
+    Tanda versi file: (mtime_ns, ukuran, inode), atau () jika belum ada.
+    
+    os.replace mempertahankan mtime dan inode file sementara, jadi versi
+    file sementara sama dengan versi file tujuan setelah diganti.
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return ()
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+def _coba_kunci(f, eksklusif):
+    """
+    Mencoba mengunci file lock sekali tanpa menunggu.
+    
+    Returns:
+        bool: True jika lock didapat.
+    """
+    try:
+        if os.name == "nt":
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(f.fileno(), (fcntl.LOCK_EX if eksklusif else fcntl.LOCK_SH) | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+def _lepas_kunci(f):
+    """
+    Melepas lock yang didapat lewat _coba_kunci().
+    """
+    if os.name == "nt":
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+@contextmanager
+def kunci_file(path, eksklusif=False, timeout=KUNCI_TIMEOUT):
+    """
+    Context manager advisory lock untuk sebuah file data.
+    
+    Args:
+        path (str): Path file yang dilindungi.
+        eksklusif (bool): True untuk penulis, False untuk pembaca.
+        timeout (float): Batas waktu menunggu dalam detik.
+        
+    Raises:
+        TimeoutError: Jika file terus dikunci sesi lain sampai timeout.
+    """
+    f = open(path_kunci(path), "a+b")
+    try:
+        batas = time.monotonic() + timeout
+        while not _coba_kunci(f, eksklusif):
+            if time.monotonic() >= batas:
+                raise TimeoutError(f"File sedang dipakai sesi lain: {path}")
+            time.sleep(0.05)
+        try:
+            yield
+        finally:
+            _lepas_kunci(f)
+    finally:
+        f.close()
+
+@contextmanager
+def tulis_atomik(path, versi=None):
+    """
+    Context manager penulisan file: memberi path sementara untuk ditulis,
+    lalu menggantikan file tujuan secara atomik, semua di bawah lock
+    eksklusif. Jika terjadi error, file tujuan tidak berubah.
+    
+    Args:
+        path (str): Path file tujuan.
+        versi (dict): Catatan versi {path: versi_file()} milik pemanggil.
+                      Jika diisi, file tujuan harus masih di versi yang
+                      tercatat (atau belum ada jika belum tercatat), lalu
+                      catatannya diperbarui setelah file diganti.
+        
+    Yields:
+        str: Path file sementara yang harus ditulis.
+        
+    Raises:
+        KonflikVersi: Jika file tujuan sudah diganti sesi lain.
+    """
+    with kunci_file(path, eksklusif=True):
+        if versi is not None and versi_file(path) != versi.get(path, ()):
+            raise KonflikVersi(f"File sudah diubah sesi lain: {path}")
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            yield tmp
+            baru = versi_file(tmp)
+            os.replace(tmp, path)
+            if versi is not None:
+                versi[path] = baru
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+# =========================================================
+#  RIWAYAT BINER (MMAP)
+# =========================================================
+#
+# File riwayat biner (.cft) memakai record lebar tetap sehingga bisa
+# di-mmap dan dibaca per baris langsung dari buffer, tanpa memuat seluruh
+# riwayat ke list Python:
+#
+#   header : HEADER_BINER (magic, versi, n_segmen, n_record, off_segmen, off_heap)
+#   record : REC_BINER x n_record (ts, kode_tipe, jumlah, off_catatan, len_catatan)
+#   segmen : SEG_BINER x n_segmen (start, count, total_nabung, total_keluar, off_nama, len_nama)
+#   heap   : teks utf-8 nama segmen & catatan (catatan yang sama disimpan sekali)
+#
+# Record dikelompokkan per sumber ('utama' / 'target:nama') dan terurut
+# waktu di dalam segmennya. Total nabung/keluar tiap segmen sudah dihitung
+# saat ditulis, jadi analisis cukup membaca tabel segmen.
+#
+# Record user menyimpan path file di 'riwayat_biner' dan pemetaan sumber
+# saat ini → nama segmen di file pada 'sumber_biner' (satu sumber bisa
+# punya beberapa segmen setelah target digabung).
+
+MAGIC_BINER = b"CFT1"
+HEADER_BINER = struct.Struct("<4sHIQQQ")
+REC_BINER = struct.Struct("<qBqIH")
+SEG_BINER = struct.Struct("<QQqqII")
+TS_BINER = struct.Struct("<q")
+TIPE_TRANSAKSI = ("nabung", "keluar")
+
+# Handle mmap yang sedang terbuka: path → dict handle
+_biner_cache = {}
+
+def kunci_sumber(target_name):
+    """
+    Mengubah nama target menjadi kunci sumber ('utama' atau 'target:nama').
+    
+    Args:
+        target_name (str): Nama target, atau None untuk saldo utama.
+        
+    Returns:
+        str: Kunci sumber, sama dengan kolom Sumber di file ekspor.
+    """
+    return "utama" if target_name is None else f"target:{target_name}"
+
+def tulis_riwayat_biner(path, segmen, ringkasan=None, versi=None):
+    """
+    Menulis riwayat ke file biner lebar tetap (atomic, lihat tulis_atomik()).
+    
+    Args:
+        path (str): Path file .cft tujuan.
+        segmen (iterable): Pasangan (nama_segmen, rows), rows terurut waktu
+                           berisi [timestamp, tipe, jumlah, catatan].
+        ringkasan (dict): Jika diisi, menerima ringkasan bulanan tiap segmen:
+                          {nama_segmen: [[awal_bulan, indeks_record_pertama,
+                          total_nabung, total_keluar], ...]}.
+        versi (dict): Catatan versi file untuk tulis_atomik(), atau None.
+                           
+    Returns:
+        int: Jumlah record yang ditulis.
+        
+    Raises:
+        KonflikVersi: Jika file sudah diganti sesi lain (lihat tulis_atomik()).
+    """
+    kode_tipe = {t: i for i, t in enumerate(TIPE_TRANSAKSI)}
+    heap = bytearray()
+    heap_idx = {}
+
+    def teks(nilai):
+        off = heap_idx.get(nilai)
+        raw = nilai.encode("utf-8")
+        if off is None:
+            off = heap_idx[nilai] = len(heap)
+            heap.extend(raw)
+        return off, len(raw)
+
+    pack = REC_BINER.pack
+    tabel = []
+    n = 0
+    with tulis_atomik(path, versi) as tmp, open(tmp, "wb") as f:
+        f.write(bytes(HEADER_BINER.size))
+        for nama, rows in segmen:
+            start = n
+            nabung = keluar = 0
+            buf = bytearray()
+            bulanan = []
+            batas = None
+            for ts, tipe, jumlah, catatan in rows:
+                buf += pack(ts, kode_tipe[tipe], jumlah, *teks(catatan))
+                if batas is None or ts >= batas:
+                    bulan = awal_bulan(ts)
+                    batas = awal_bulan(bulan + 32 * DETIK_PER_HARI)
+                    bulanan.append([bulan, n, 0, 0])
+                if tipe == "nabung":
+                    nabung += jumlah
+                    bulanan[-1][2] += jumlah
+                elif tipe == "keluar":
+                    keluar += jumlah
+                    bulanan[-1][3] += jumlah
+                n += 1
+                if len(buf) >= 1 << 20:
+                    f.write(buf)
+                    buf.clear()
+            f.write(buf)
+            tabel.append((start, n - start, nabung, keluar) + teks(nama))
+            if ringkasan is not None:
+                ringkasan[nama] = bulanan
+
+        off_segmen = HEADER_BINER.size + n * REC_BINER.size
+        for entri in tabel:
+            f.write(SEG_BINER.pack(*entri))
+        off_heap = f.tell()
+        f.write(heap)
+        f.seek(0)
+        f.write(HEADER_BINER.pack(MAGIC_BINER, 1, len(tabel), n, off_segmen, off_heap))
+        f.close()
+        tutup_riwayat_biner(path)
+    return n
+
+def buka_riwayat_biner(path):
+    """
+    Membuka (atau mengambil dari cache) file riwayat biner sebagai mmap.
+    
+    Args:
+        path (str): Path file .cft.
+        
+    Returns:
+        dict: Handle berisi mmap, jumlah record, offset heap, dan tabel
+              segmen {nama: (start, count, total_nabung, total_keluar)}.
+              
+    Raises:
+        ValueError: Jika file bukan riwayat biner ChillFinance.
+    """
+    h = _biner_cache.get(path)
+    if h is not None:
+        return h
+
+    with kunci_file(path):
+        f = open(path, "rb")
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, _, n_segmen, n, off_segmen, off_heap = HEADER_BINER.unpack_from(mm, 0)
+    if magic != MAGIC_BINER:
+        mm.close()
+        f.close()
+        raise ValueError("Bukan file riwayat biner ChillFinance.")
+
+    segmen = {}
+    for i in range(n_segmen):
+        start, count, nabung, keluar, off, ln = SEG_BINER.unpack_from(
+            mm, off_segmen + i * SEG_BINER.size)
+        nama = str(mm[off_heap + off:off_heap + off + ln], "utf-8")
+        segmen[nama] = (start, count, nabung, keluar)
+
+    h = {"file": f, "mm": mm, "n": n, "heap": off_heap, "segmen": segmen}
+    _biner_cache[path] = h
+    return h
+
+def tutup_riwayat_biner(path):
+    """
+    Menutup mmap file riwayat biner jika sedang terbuka.
+    
+    Args:
+        path (str): Path file .cft.
+    """
+    h = _biner_cache.pop(path, None)
+    if h is not None:
+        h["mm"].close()
+        h["file"].close()
+
+def baris_biner(h, i):
+    """
+    Membaca satu record dari file biner (hanya baris ini yang didekode).
+    
+    Args:
+        h (dict): Handle dari buka_riwayat_biner().
+        i (int): Indeks record.
+        
+    Returns:
+        list: [timestamp, tipe, jumlah, catatan].
+    """
+    mm = h["mm"]
+    ts, kode, jumlah, off, ln = REC_BINER.unpack_from(mm, HEADER_BINER.size + i * REC_BINER.size)
+    p = h["heap"] + off
+    return [ts, TIPE_TRANSAKSI[kode], jumlah, str(mm[p:p + ln], "utf-8")]
+
+def cari_ts_biner(h, lo, hi, ts):
+    """
+    Binary search indeks record pertama di [lo, hi) dengan timestamp >= ts.
+    
+    Hanya kolom timestamp yang dibaca dari buffer.
+    
+    Returns:
+        int: Indeks record (hi jika semua lebih kecil).
+    """
+    mm = h["mm"]
+    unpack_from = TS_BINER.unpack_from
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if unpack_from(mm, HEADER_BINER.size + mid * REC_BINER.size)[0] < ts:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+def total_biner(h, lo, hi):
+    """
+    Menjumlahkan nabung dan keluar untuk record [lo, hi) langsung dari buffer.
+    
+    Returns:
+        tuple: (total_nabung, total_keluar)
+    """
+    kode_nabung = TIPE_TRANSAKSI.index("nabung")
+    kode_keluar = TIPE_TRANSAKSI.index("keluar")
+    nabung = keluar = 0
+    with memoryview(h["mm"]) as view:
+        awal = HEADER_BINER.size + lo * REC_BINER.size
+        chunk = view[awal:awal + (hi - lo) * REC_BINER.size]
+        for _, kode, jumlah, _, _ in REC_BINER.iter_unpack(chunk):
+            if kode == kode_nabung:
+                nabung += jumlah
+            elif kode == kode_keluar:
+                keluar += jumlah
+        chunk.release()
+    return nabung, keluar
+
+def _segmen_sumber(u, target_name):
+    """
+    Mengambil segmen biner milik sebuah sumber pada record user.
+    
+    Returns:
+        list: [(handle, start, count, total_nabung, total_keluar), ...]
+    """
+    path = u["riwayat_biner"]
+    if not path:
+        return []
+    h = buka_riwayat_biner(path)
+    nama_segmen = u["sumber_biner"].get(kunci_sumber(target_name), ())
+    return [(h,) + h["segmen"][nama] for nama in nama_segmen if nama in h["segmen"]]
+
+def _riwayat_memori(u, target_name):
+    """
+    Mengambil list riwayat di memori untuk saldo utama atau sebuah target.
+    """
+    return u["riwayat"] if target_name is None else u["targets"][target_name]["riwayat"]
+
+def _iter_riwayat_record(u, target_name):
+    """
+    Generator riwayat sebuah sumber: bagian biner dulu, lalu bagian di memori.
+    """
+    for h, start, count, _, _ in _segmen_sumber(u, target_name):
+        for i in range(start, start + count):
+            yield baris_biner(h, i)
+    yield from _riwayat_memori(u, target_name)
+
+def hitung_riwayat(user, target_name=None):
+    """
+    Menghitung jumlah transaksi sebuah sumber (biner + memori) dalam O(1).
+    
+    Args:
+        user (str): Username pengguna (lowercase).
+        target_name (str): Nama target, atau None untuk saldo utama.
+        
+    Returns:
+        int: Jumlah transaksi.
+    """
+    u = users[user]
+    n_biner = sum(seg[2] for seg in _segmen_sumber(u, target_name))
+    return n_biner + len(_riwayat_memori(u, target_name))
+
+def ambil_riwayat(user, target_name, start, stop):
+    """
+    Mengambil potongan riwayat [start, stop) berdasarkan posisi.
+    
+    Posisi dihitung dari bagian biner (lebih lama) lalu bagian memori,
+    dan hanya baris dalam potongan yang didekode dari mmap.
+    
+    Args:
+        user (str): Username pengguna (lowercase).
+        target_name (str): Nama target, atau None untuk saldo utama.
+        start (int): Posisi awal (inklusif).
+        stop (int): Posisi akhir (eksklusif).
+        
+    Returns:
+        list: Baris [timestamp, tipe, jumlah, catatan].
+    """
+    u = users[user]
+    out = []
+    pos = 0
+    for h, seg_start, count, _, _ in _segmen_sumber(u, target_name):
+        for i in range(max(start, pos), min(stop, pos + count)):
+            out.append(baris_biner(h, seg_start + i - pos))
+        pos += count
+    out.extend(_riwayat_memori(u, target_name)[max(start - pos, 0):max(stop - pos, 0)])
+    return out
+
+def total_riwayat(user):
+    """
+    Total nabung dan keluar seluruh sumber milik user.
+    
+    Bagian biner memakai total per segmen yang tersimpan di file, jadi
+    biayanya tidak bergantung pada panjang riwayat yang diarsipkan.
+    
+    Args:
+        user (str): Username pengguna (lowercase).
+        
+    Returns:
+        tuple: (total_nabung, total_keluar)
+    """
+    u = users[user]
+    nabung = keluar = 0
+    for target_name in [None] + list(u["targets"]):
+        for _, _, _, seg_nabung, seg_keluar in _segmen_sumber(u, target_name):
+            nabung += seg_nabung
+            keluar += seg_keluar
+        for _, tipe, jumlah, _ in _riwayat_memori(u, target_name):
+            if tipe == "nabung":
+                nabung += jumlah
+            elif tipe == "keluar":
+                keluar += jumlah
+    return nabung, keluar
+
+def _ringkasan_segmen(u, target_name):
+    """
+    Ringkasan bulanan tiap segmen biner sebuah sumber, urutannya sama dengan
+    _segmen_sumber(). None untuk segmen yang tidak punya ringkasan.
+    """
+    path = u["riwayat_biner"]
+    if not path:
+        return []
+    h = buka_riwayat_biner(path)
+    ringkasan = u["ringkasan_biner"]
+    return [ringkasan.get(nama) for nama in u["sumber_biner"].get(kunci_sumber(target_name), ())
+            if nama in h["segmen"]]
+
+def _total_biner_bulanan(h, lo, hi, bulanan, akhir_segmen):
+    """
+    Seperti total_biner(h, lo, hi), tetapi bulan yang seluruhnya berada di
+    [lo, hi) diambil dari ringkasan bulanan; hanya tepi rentang yang dibaca
+    per record.
+    """
+    if not bulanan:
+        return total_biner(h, lo, hi)
+    idxs = [b[1] for b in bulanan]
+    ends = idxs[1:] + [akhir_segmen]
+    i = bisect_left(idxs, lo)
+    j = i
+    nabung = keluar = 0
+    while j < len(bulanan) and ends[j] <= hi:
+        nabung += bulanan[j][2]
+        keluar += bulanan[j][3]
+        j += 1
+    if j == i:
+        return total_biner(h, lo, hi)
+    for a, b in ((lo, idxs[i]), (ends[j - 1], hi)):
+        n_, k_ = total_biner(h, a, b)
+        nabung += n_
+        keluar += k_
+    return nabung, keluar
+
+def total_rentang(user, target_name, mulai=None, akhir=None):
+    """
+    Total nabung dan keluar sebuah sumber dalam rentang waktu [mulai, akhir).
+    
+    Untuk bagian biner, bulan penuh di dalam rentang memakai ringkasan
+    bulanan hasil arsip/kompaksi sehingga tidak perlu membaca tiap record.
+    
+    Args:
+        user (str): Username pengguna (lowercase).
+        target_name (str): Nama target, atau None untuk saldo utama.
+        mulai (int): Epoch awal (inklusif). None = dari awal.
+        akhir (int): Epoch akhir (eksklusif). None = sampai akhir.
+        
+    Returns:
+        tuple: (total_nabung, total_keluar)
+    """
+    u = users[user]
+    nabung = keluar = 0
+    for (h, start, count, _, _), bulanan in zip(_segmen_sumber(u, target_name),
+                                               _ringkasan_segmen(u, target_name)):
+        lo = start if mulai is None else cari_ts_biner(h, start, start + count, mulai)
+        hi = start + count if akhir is None else cari_ts_biner(h, start, start + count, akhir)
+        n_, k_ = _total_biner_bulanan(h, lo, hi, bulanan, start + count)
+        nabung += n_
+        keluar += k_
+    for _, tipe, jumlah, _ in rentang_riwayat(_riwayat_memori(u, target_name), mulai, akhir):
+        if tipe == "nabung":
+            nabung += jumlah
+        elif tipe == "keluar":
+            keluar += jumlah
+    return nabung, keluar
+
+def arsipkan_riwayat(user, path=None, sebelum=None):
+    """
+    Memindahkan riwayat di memori ke file riwayat biner.
+    
+    Jika user sudah punya file biner, isinya digabung (tetap terurut waktu
+    per sumber) lalu file ditulis ulang beserta ringkasan bulanannya.
+    Segmen milik target yang sudah dihapus ikut dibuang. Saldo tidak berubah.
+    
+    Args:
+        user (str): Username pengguna (lowercase).
+        path (str): Path file .cft. Default file lama atau {username}_riwayat.cft.
+        sebelum (int): Hanya transaksi sebelum epoch ini yang dipindah, sisanya
+                       tetap di memori. None = semua.
+        
+    Returns:
+        tuple: (path, jumlah_record_di_file)
+        
+    Raises:
+        KonflikVersi: Jika file sudah diganti sesi lain sejak terakhir
+                      ditulis sesi ini (atau sudah ada padahal belum pernah).
+    """
+    u = users[user]
+    path = path or u["riwayat_biner"] or f"{u['username']}_riwayat.cft"
+    sumber = [None] + list(u["targets"])
+    # Handle mmap dibuka di sini (lock baca), sebelum tulis_riwayat_biner()
+    # memegang lock tulis file yang sama.
+    lama = {t: _segmen_sumber(u, t) for t in sumber}
+    potong = {}
+    for t in sumber:
+        mem = _riwayat_memori(u, t)
+        potong[t] = len(mem) if sebelum is None else bisect_left(mem, [sebelum])
+
+    def segmen():
+        for target_name in sumber:
+            bagian = [map(baris_biner, repeat(h, count), range(start, start + count))
+                      for h, start, count, _, _ in lama[target_name]]
+            bagian.append(islice(_riwayat_memori(u, target_name), potong[target_name]))
+            yield kunci_sumber(target_name), heapq.merge(*bagian, key=lambda r: r[0])
+
+    ringkasan = {}
+    n = tulis_riwayat_biner(path, segmen(), ringkasan, u.setdefault("versi_file", {}))
+
+    u["riwayat_biner"] = path
+    u["sumber_biner"] = {kunci_sumber(t): [kunci_sumber(t)] for t in sumber}
+    u["ringkasan_biner"] = ringkasan
+    for target_name in sumber:
+        del _riwayat_memori(u, target_name)[:potong[target_name]]
+    return path, n
+
+# Kompaksi bertingkat: transaksi yang lebih tua dari KOMPAKSI_UMUR_HARI
+# (dibulatkan ke awal bulan) dipindah ke file biner (tier dingin), yang
+# baru tetap di memori (tier panas). Dijalankan otomatis saat login jika
+# baris dingin di memori sudah mencapai KOMPAKSI_MIN_BARIS.
+KOMPAKSI_UMUR_HARI = 365
+KOMPAKSI_MIN_BARIS = 10_000
+
+def kompaksi_riwayat(user, umur_hari=KOMPAKSI_UMUR_HARI, min_baris=0, now=None):
+    """
+    Memindahkan transaksi lama dari memori ke file biner.
+    
+    Args:
+        user (str): Username pengguna (lowercase).
+        umur_hari (int): Transaksi lebih tua dari ini (hari) dipindah.
+        min_baris (int): Tidak melakukan apa-apa jika baris lama di memori
+                         lebih sedikit dari ini.
+        now (int): Epoch acuan. Default: waktu sekarang.
+        
+    Returns:
+        int: Jumlah transaksi yang dipindah ke file biner.
+    """
+    if now is None:
+        now = waktu_sekarang()
+    u = users[user]
+    batas = awal_bulan(now - umur_hari * DETIK_PER_HARI)
+    n_lama = sum(bisect_left(_riwayat_memori(u, t), [batas]) for t in [None] + list(u["targets"]))
+    if n_lama == 0 or n_lama < min_baris:
+        return 0
+    arsipkan_riwayat(user, sebelum=batas)
+    return n_lama
+
+# =========================================================
+#  CHECKPOINT SALDO & SALDO PADA TANGGAL
+# =========================================================
+#
+# users[user]["checkpoint"] berisi list [t_cp, saldo_utama, {target: saldo}]
+# terurut waktu, dibuat otomatis sekali per bulan (awal bulan lokal).
+# Nilainya adalah saldo tepat sebelum t_cp. Transaksi bertanggal mundur
+# ikut mengoreksi semua checkpoint sesudahnya, jadi checkpoint selalu
+# konsisten dengan saldo yang tercatat.
+
+def _checkpoint_bulan(user, ts):
+    """
+    Membuat checkpoint awal bulan dari saldo saat ini jika transaksi pada ts
+    adalah yang pertama di bulan yang lebih baru dari checkpoint terakhir.
+    
+    Dipanggil sebelum saldo diubah.
+    """
+    u = users[user]
+    cps = u["checkpoint"]
+    t_cp = awal_bulan(ts)
+    if not cps or t_cp > cps[-1][0]:
+        cps.append([t_cp, u["saldo_utama"], {n: t["saldo"] for n, t in u["targets"].items()}])
+
+def _koreksi_checkpoint(user, target_name, ts, delta):
+    """
+    Menambahkan perubahan saldo ke semua checkpoint setelah ts.
+    
+    Hanya berdampak untuk transaksi bertanggal mundur; untuk transaksi
+    biasa tidak ada checkpoint sesudah ts sehingga langsung selesai.
+    """
+    cps = users[user]["checkpoint"]
+    for i in range(len(cps) - 1, -1, -1):
+        cp = cps[i]
+        if cp[0] <= ts:
+            break
+        if target_name is None:
+            cp[1] += delta
+        else:
+            cp[2][target_name] = cp[2].get(target_name, 0) + delta
+
+def _checkpoint_transaksi(user, target_name, ts, delta):
+    """
+    Memperbarui checkpoint untuk satu perubahan saldo sebuah sumber pada ts.
+    
+    Dipakai oleh semua jalur pencatatan (nabung, keluar, batch) dan harus
+    dipanggil sebelum saldo sumbernya diubah.
+    
+    Args:
+        user (str): Username pengguna (lowercase).
+        target_name (str): Nama target, atau None untuk saldo utama.
+        ts (int): Epoch timestamp transaksi.
+        delta (int): Perubahan saldo (positif = masuk, negatif = keluar).
+    """
+    _checkpoint_bulan(user, ts)
+    _koreksi_checkpoint(user, target_name, ts, delta)
+
+def _checkpoint_ganti_target(user, lama, baru=None):
+    """
+    Menyesuaikan checkpoint saat target diganti nama, digabung, atau dihapus.
+    
+    Args:
+        user (str): Username pengguna (lowercase).
+        lama (str): Nama target lama.
+        baru (str): Nama target baru / tujuan gabung. None = target dihapus.
+    """
+    for cp in users[user]["checkpoint"]:
+        saldo = cp[2].pop(lama, None)
+        if saldo is not None and baru is not None:
+            cp[2][baru] = cp[2].get(baru, 0) + saldo
+
+def saldo_pada(user, ts):
+    """
+    Menghitung saldo utama dan saldo setiap target tepat sebelum waktu ts.
+    
+    Dimulai dari checkpoint terdekat (binary search), lalu hanya transaksi
+    antara checkpoint dan ts yang dijumlahkan lewat total_rentang(), baik
+    yang masih di memori maupun di file biner.
+    
+    Args:
+        user (str): Username pengguna (lowercase).
+        ts (int): Epoch timestamp acuan.
+        
+    Returns:
+        tuple: (saldo_utama, {nama_target: saldo}) untuk target yang ada saat ini.
+    """
+    u = users[user]
+    cps = u["checkpoint"]
+    i = bisect_left(cps, [ts + 1]) - 1
+    if i >= 0:
+        t_cp, utama, per_target = cps[i][0], cps[i][1], cps[i][2]
+    else:
+        t_cp, utama, per_target = None, 0, {}
+
+    nabung, keluar = total_rentang(user, None, t_cp, ts)
+    utama += nabung - keluar
+
+    hasil = {}
+    for nama in u["targets"]:
+        nabung, keluar = total_rentang(user, nama, t_cp, ts)
+        hasil[nama] = per_target.get(nama, 0) + nabung - keluar
+    return utama, hasil
+
+def saldo_minimum_sejak(user, target_name, ts):
+    """
+    Saldo terendah sebuah sumber dari ts (setelah transaksi pada ts) sampai
+    sekarang, yaitu nominal terbesar yang bisa dikeluarkan pada ts tanpa
+    membuat saldo historis negatif.
+    
+    Args:
+        user (str): Username pengguna (lowercase).
+        target_name (str): Nama target, atau None untuk saldo utama.
+        ts (int): Epoch timestamp acuan.
+        
+    Returns:
+        int: Saldo minimum (saldo saat ini jika tidak ada transaksi sesudah ts).
+    """
+    u = users[user]
+    cps = u["checkpoint"]
+    i = bisect_left(cps, [ts + 1]) - 1
+    if i >= 0:
+        t_cp = cps[i][0]
+        saldo = cps[i][1] if target_name is None else cps[i][2].get(target_name, 0)
+    else:
+        t_cp, saldo = None, 0
+
+    nabung, keluar = total_rentang(user, target_name, t_cp, ts + 1)
+    saldo += nabung - keluar
+    minimum = saldo
+    for _, tipe, jumlah, _ in _iter_sejak(u, target_name, ts + 1):
+        if tipe == "nabung":
+            saldo += jumlah
+        elif tipe == "keluar":
+            saldo -= jumlah
+            minimum = min(minimum, saldo)
+    return minimum
+
+def lihat_saldo_pada(user):
+    """
+    Menu untuk melihat saldo utama & saldo target pada tanggal tertentu.
+    
+    Saldo yang ditampilkan adalah posisi di akhir tanggal yang diinput.
+    
+    Args:
+        user (str): Username pengguna yang login (lowercase).
+    """
+    clear()
+    print(bold(cyan("🕰️ SALDO PADA TANGGAL")))
+    mulai = parse_tanggal(input("Tanggal (YYYY-MM-DD): "))
+    if mulai is None:
+        print(red("❌ Format tanggal tidak valid."))
+        input("Enter...")
+        return
+
+    utama, per_target = saldo_pada(user, hari_berikutnya(mulai))
+
+    print(f"Posisi akhir {format_waktu(mulai, '%d %B %Y')}")
+    print(f"🏦 Saldo Utama: Rp {format_rupiah(utama)}")
+    for nama, saldo in per_target.items():
+        print(f"🎯 {nama}: Rp {format_rupiah(saldo)}")
+    input("Enter...")
+
+# =========================================================
+#  INTEGRITAS LEDGER
+# =========================================================
+
+def _saldo_dari_riwayat(u, target_name):
+    """
+    Menghitung saldo sebuah sumber murni dari riwayatnya (nabung - keluar).
+    
+    Bagian biner memakai total segmen, bagian memori dijumlahkan sekali jalan.
+    """
+    saldo = 0
+    for _, _, _, seg_nabung, seg_keluar in _segmen_sumber(u, target_name):
+        saldo += seg_nabung - seg_keluar
+    for _, tipe, jumlah, _ in _riwayat_memori(u, target_name):
+        if tipe == "nabung":
+            saldo += jumlah
+        elif tipe == "keluar":
+            saldo -= jumlah
+    return saldo
+
+def _periksa_record(args):
+    """
+    Memeriksa satu record user (bisa dijalankan di worker process).
+    
+    Args:
+        args (tuple): (username_key, record_user).
+        
+    Returns:
+        tuple: (username_key, [(target_name, saldo_tercatat, saldo_riwayat), ...])
+    """
+    uname, u = args
+    selisih = []
+    dari_riwayat = _saldo_dari_riwayat(u, None)
+    if dari_riwayat != u["saldo_utama"]:
+        selisih.append((None, u["saldo_utama"], dari_riwayat))
+    for nama, t in u["targets"].items():
+        dari_riwayat = _saldo_dari_riwayat(u, nama)
+        if dari_riwayat != t["saldo"]:
+            selisih.append((nama, t["saldo"], dari_riwayat))
+    return uname, selisih
+
+def periksa_ledger(unames=None, workers=1):
+    """
+    Menghitung ulang semua saldo dari riwayat dan melaporkan yang tidak cocok.
+    
+    Args:
+        unames (list): Daftar username (lowercase). None = semua user.
+        workers (int): Jumlah worker process. 1 = serial (default, paling
+                       cepat untuk data di memori), None = jumlah CPU.
+                       
+    Returns:
+        dict: {username: [(target_name, saldo_tercatat, saldo_riwayat), ...]}
+              hanya untuk user yang punya selisih. target_name None = saldo utama.
+    """
+    if unames is None:
+        unames = list(users)
+    jobs = [(uname, users[uname]) for uname in unames]
+
+    if len(jobs) > 1 and workers != 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            hasil = list(pool.map(_periksa_record, jobs, chunksize=max(1, len(jobs) // 64)))
+    else:
+        hasil = [_periksa_record(job) for job in jobs]
+    return {uname: selisih for uname, selisih in hasil if selisih}
+
+def bangun_ulang_checkpoint(user):
+    """
+    Menyusun ulang checkpoint bulanan dari riwayat (setelah ledger diperbaiki).
+    
+    Args:
+        user (str): Username pengguna (lowercase).
+    """
+    u = users[user]
+    sumber = [None] + list(u["targets"])
+
+    def stream(nama):
+        for ts, tipe, jumlah, _ in _iter_riwayat_record(u, nama):
+            yield ts, nama, tipe, jumlah
+
+    streams = [stream(nama) for nama in sumber]
+
+    saldo = dict.fromkeys(sumber, 0)
+    cps = []
+    batas = None
+    for ts, nama, tipe, jumlah in heapq.merge(*streams, key=lambda x: x[0]):
+        if batas is None or ts >= batas:
+            t_cp = awal_bulan(ts)
+            cps.append([t_cp, saldo[None], {n: saldo[n] for n in sumber if n is not None}])
+            d = ke_datetime(t_cp)
+            tahun, bulan = (d.year + 1, 1) if d.month == 12 else (d.year, d.month + 1)
+            batas = _tengah_malam(tahun, bulan, 1)
+        if tipe == "nabung":
+            saldo[nama] += jumlah
+        elif tipe == "keluar":
+            saldo[nama] -= jumlah
+    u["checkpoint"] = cps
+
+def perbaiki_ledger(user, selisih, ts=None):
+    """
+    Menulis transaksi koreksi agar riwayat kembali cocok dengan saldo.
+    
+    Saldo yang tercatat dianggap benar; selisihnya dicatat sebagai
+    'nabung' (riwayat kurang) atau 'keluar' (riwayat lebih) dengan catatan
+    CATATAN_KOREKSI. Checkpoint lalu disusun ulang dari riwayat.
+    
+    Args:
+        user (str): Username pengguna (lowercase).
+        selisih (list): Hasil periksa_ledger() untuk user ini.
+        ts (int): Epoch timestamp koreksi. Default waktu sekarang.
+        
+    Returns:
+        int: Jumlah transaksi koreksi yang ditulis.
+    """
+    if ts is None:
+        ts = waktu_sekarang()
+    n = 0
+    for target_name, tercatat, dari_riwayat in selisih:
+        delta = tercatat - dari_riwayat
+        if not delta:
+            continue
+        tipe = "nabung" if delta > 0 else "keluar"
+        catat_riwayat(user, target_name, [[ts, tipe, abs(delta), CATATAN_KOREKSI]])
+        n += 1
+    bangun_ulang_checkpoint(user)
+    return n
+
+def cek_integritas(user):
+    """
+    Menu pemeriksaan integritas: bandingkan saldo dengan riwayat dan
+    tawarkan perbaikan otomatis jika ada selisih.
+    
+    Args:
+        user (str): Username pengguna yang login (lowercase).
+    """
+    clear()
+    print(bold(cyan("🩺 CEK INTEGRITAS DATA")))
+    selisih = periksa_ledger([user]).get(user, [])
+    if not selisih:
+        print(green("✅ Semua saldo cocok dengan riwayat transaksi."))
+        input("Enter...")
+        return
+
+    for target_name, tercatat, dari_riwayat in selisih:
+        nama = "Saldo Utama" if target_name is None else target_name
+        print(red(f"❌ {nama}: tercatat Rp {format_rupiah(tercatat)}, "
+                  f"menurut riwayat Rp {format_rupiah(dari_riwayat)}"))
+
+    if input("Tulis transaksi koreksi? (Y/n): ").lower() in ("y", ""):
+        n = perbaiki_ledger(user, selisih)
+        print(green(f"✅ {n} transaksi koreksi ditulis."))
+    input("Enter...")
+
+# =========================================================
+#  PENCARIAN CATATAN (INVERTED INDEX)
+# =========================================================
+
+# Indeks kata catatan per user, dibangun saat pencarian pertama lalu
+# diperbarui lewat jurnal transaksi:
+#   "dok"  : list (ts, tipe, jumlah, catatan, sumber), id = posisi di list
+#   "kata" : token → list id dokumen
+#   "urut" : semua token terurut, untuk pencarian prefix dengan bisect
+# Indeks dibuang saat target diganti nama / digabung / dihapus karena
+# sumber dokumennya ikut berubah.
+_indeks_catatan = {}
+
+_POLA_TOKEN = re.compile(r"\w+")
+
+def token_catatan(teks):
+    """
+    Memecah catatan menjadi token huruf kecil (tanpa duplikat, urutan tetap).
+    
+    Args:
+        teks (str): Catatan transaksi atau kata kunci pencarian.
+        
+    Returns:
+        list: Token unik, misal "Kopi + GoJek kopi" → ['kopi', 'gojek'].
+    """
+    return list(dict.fromkeys(_POLA_TOKEN.findall(teks.lower())))
+
+def _indeks_tambah(idx, docs, cache):
+    """
+    Menambahkan dokumen ke indeks. Token per catatan di-cache karena
+    catatan yang sama (misal "kopi") biasanya muncul berulang kali.
+    """
+    kata = idx["kata"]
+    urut = idx["urut"]
+    dok = idx["dok"]
+    for d in docs:
+        if d[3] == CATATAN_KOREKSI:
+            continue
+        i = len(dok)
+        dok.append(d)
+        tokens = cache.get(d[3])
+        if tokens is None:
+            tokens = cache[d[3]] = token_catatan(d[3])
+        for tok in tokens:
+            posting = kata.get(tok)
+            if posting is None:
+                kata[tok] = [i]
+                insort(urut, tok)
+            else:
+                posting.append(i)
+
+def indeks_catatan(user):
+    """
+    Mengambil indeks catatan user, membangunnya dari seluruh riwayat
+    (memori + file biner) jika belum ada.
+    
+    Args:
+        user (str): Username pengguna (lowercase).
+        
+    Returns:
+        dict: Indeks dengan kunci 'dok', 'kata', dan 'urut'.
+    """
+    idx = _indeks_catatan.get(user)
+    if idx is None:
+        idx = {"dok": [], "kata": {}, "urut": []}
+        _indeks_tambah(idx, _iter_transaksi_record(users[user]), {})
+        _indeks_catatan[user] = idx
+    return idx
+
+def invalidasi_indeks_catatan(user):
+    """
+    Membuang indeks catatan user agar dibangun ulang saat dibutuhkan.
+    
+    Args:
+        user (str): Username pengguna (lowercase).
+    """
+    _indeks_catatan.pop(user, None)
+
+def _indeks_catatan_baru(user, target_name, rows):
+    """
+    Pendengar jurnal: menambahkan transaksi baru ke indeks yang sudah ada.
+    """
+    idx = _indeks_catatan.get(user)
+    if idx is not None:
+        sumber = kunci_sumber(target_name)
+        _indeks_tambah(idx, ((ts, tipe, jumlah, catatan, sumber)
+                             for ts, tipe, jumlah, catatan in rows), {})
+
+_pendengar_transaksi.append(_indeks_catatan_baru)
+
+def _cari_prefix(idx, prefix):
+    """
+    Mengumpulkan id dokumen untuk semua token yang diawali prefix.
+    """
+    urut = idx["urut"]
+    kata = idx["kata"]
+    hasil = set()
+    i = bisect_left(urut, prefix)
+    while i < len(urut) and urut[i].startswith(prefix):
+        hasil.update(kata[urut[i]])
+        i += 1
+    return hasil
+
+def cari_catatan(user, kueri, tipe=None, sumber=None, mulai=None, akhir=None):
+    """
+    Mencari transaksi berdasarkan kata di catatan.
+    
+    Setiap kata kunci dicocokkan sebagai prefix ("gof" cocok dengan
+    "gofood"). Hasil berisi transaksi yang cocok dengan SEMUA kata kunci,
+    sedangkan total dihitung per kata kunci secara terpisah dengan filter
+    yang sama, sehingga "kopi gojek" juga menampilkan belanja kopi dan
+    gojek masing-masing.
+    
+    Args:
+        user (str): Username pengguna (lowercase).
+        kueri (str): Kata kunci, dipisah spasi.
+        tipe (str): 'nabung' / 'keluar', atau None untuk semua.
+        sumber (str): Kunci sumber ('utama' / 'target:nama'), atau None.
+        mulai (int): Epoch awal (inklusif), atau None.
+        akhir (int): Epoch akhir (eksklusif), atau None.
+        
+    Returns:
+        tuple: (hasil, total_per_kata). hasil adalah list
+               (ts, tipe, jumlah, catatan, sumber) terurut waktu;
+               total_per_kata adalah {kata: (n, total_nabung, total_keluar)}.
+    """
+    idx = indeks_catatan(user)
+    dok = idx["dok"]
+
+    def lolos(i):
+        ts, tp, _, _, sb = dok[i]
+        return ((tipe is None or tp == tipe) and (sumber is None or sb == sumber)
+                and (mulai is None or ts >= mulai) and (akhir is None or ts < akhir))
+
+    per_kata = {}
+    total_per_kata = {}
+    for kata in token_catatan(kueri):
+        ids = _cari_prefix(idx, kata)
+        if tipe is not None or sumber is not None or mulai is not None or akhir is not None:
+            ids = {i for i in ids if lolos(i)}
+        per_kata[kata] = ids
+        masuk = sum(dok[i][2] for i in ids if dok[i][1] == "nabung")
+        keluar = sum(dok[i][2] for i in ids if dok[i][1] == "keluar")
+        total_per_kata[kata] = (len(ids), masuk, keluar)
+
+    if not per_kata:
+        return [], {}
+    cocok = set.intersection(*sorted(per_kata.values(), key=len))
+    hasil = sorted((dok[i] for i in cocok), key=lambda d: d[0])
+    return hasil, total_per_kata
+
+def cari_riwayat(user):
+    """
+    Layar pencarian transaksi berdasarkan catatan dengan filter opsional
+    tipe, sumber saldo, dan rentang tanggal.
+    
+    Args:
+        user (str): Username pengguna yang login (lowercase).
+    """
+    clear()
+    print(bold(cyan("🔎 CARI CATATAN")))
+    kueri = input("Kata kunci: ").strip()
+    if not token_catatan(kueri):
+        print(red("❌ Kata kunci tidak boleh kosong."))
+        input("Enter...")
+        return
+
+    tipe = {"1": None, "2": "nabung", "3": "keluar", "": None}.get(
+        input("Tipe (1=semua, 2=nabung, 3=keluar) [1]: ").strip(), "?")
+    if tipe == "?":
+        print(red("❌ Pilihan tidak valid."))
+        input("Enter...")
+        return
+
+    sumber = None
+    teks = input("Sumber (Enter=semua, 'utama', atau nama target): ").strip()
+    if teks.lower() == "utama":
+        sumber = kunci_sumber(None)
+    elif teks:
+        nama = cari_target(user, teks)
+        if nama is None:
+            print(red("❌ Target tidak ditemukan."))
+            input("Enter...")
+            return
+        sumber = kunci_sumber(nama)
+
+    batas = []
+    for label in ("Dari tanggal", "Sampai tanggal"):
+        teks = input(f"{label} (YYYY-MM-DD, Enter=bebas): ").strip()
+        ts = parse_tanggal(teks) if teks else None
+        if teks and ts is None:
+            print(red("❌ Format tanggal tidak valid."))
+            input("Enter...")
+            return
+        batas.append(ts)
+    mulai, akhir = batas
+    if akhir is not None:
+        akhir = hari_berikutnya(akhir)
+
+    hasil, total_per_kata = cari_catatan(user, kueri, tipe, sumber, mulai, akhir)
+
+    n_hal = max((len(hasil) + RIWAYAT_PER_HALAMAN - 1) // RIWAYAT_PER_HALAMAN, 1)
+    hal = n_hal
+    while True:
+        clear()
+        print(bold(cyan(f"🔎 Hasil: {kueri}")))
+        for kata, (n, masuk, keluar) in total_per_kata.items():
+            print(f"  {kata:<15} {n:>6,}x  masuk Rp {format_rupiah(masuk)}  "
+                  f"keluar Rp {format_rupiah(keluar)}")
+        print("-" * 95)
+        print(f"{'Tanggal':<20} | {'Tipe':<8} | {'Jumlah':>13} | {'Sumber':<18} | {'Catatan':<25}")
+        print("-" * 95)
+        start = (hal - 1) * RIWAYAT_PER_HALAMAN
+        for t, tp, jml, cat, sb in hasil[start:start + RIWAYAT_PER_HALAMAN]:
+            print(f"{format_waktu(t):<20} | {tp:<8} | {jml:>13,} | {sb:<18} | {cat:<25}")
+        print("-" * 95)
+        if not hasil:
+            print("Tidak ada transaksi yang cocok dengan semua kata kunci.")
+        if n_hal == 1:
+            input("Enter...")
+            return
+
+        print(f"Halaman {hal}/{n_hal} ({len(hasil):,} transaksi)")
+        nav = input("[p] sebelumnya  [n] berikutnya  Enter = kembali: ").strip().lower()
+        if nav == "p" and hal > 1:
+            hal -= 1
+        elif nav == "n" and hal < n_hal:
+            hal += 1
+        elif nav == "":
+            return
+
+# =========================================================
+#  LIHAT RIWAYAT TRANSAKSI
+# =========================================================
+
+RIWAYAT_PER_HALAMAN = 20
+
+def tampilkan_riwayat(user, target_name=None):
+    """
+    Menampilkan riwayat sebuah sumber per halaman (dimulai dari yang terbaru).
+    
+    Hanya baris di halaman aktif yang diambil, termasuk dari file biner.
+    
+    Args:
+        user (str): Username pengguna yang login (lowercase).
+        target_name (str): Nama target, atau None untuk saldo utama.
+    """
+    total = hitung_riwayat(user, target_name)
+    if not total:
+        print("Belum ada transaksi.")
+        input("Enter...")
+        return
+
+    n_hal = (total + RIWAYAT_PER_HALAMAN - 1) // RIWAYAT_PER_HALAMAN
+    hal = n_hal
+    while True:
+        clear()
+        if target_name is not None:
+            print(f"--- Riwayat Target: {target_name} ---")
+        print("-" * 80)
+        print(f"{'Tanggal':<20} | {'Tipe':<10} | {'Jumlah':>15} | {'Catatan':<30}")
+        print("-" * 80)
+
+        start = (hal - 1) * RIWAYAT_PER_HALAMAN
+        halaman = ambil_riwayat(user, target_name, start, start + RIWAYAT_PER_HALAMAN)
+        for t, tipe, jml, cat in halaman:
+            print(f"{format_waktu(t):<20} | {tipe:<10} | {jml:>15,} | {cat:<30}")
+
+        print("-" * 80)
+        if n_hal == 1:
+            input("Enter...")
+            return
+
+        print(f"Halaman {hal}/{n_hal} ({total:,} transaksi)")
+        nav = input("[p] sebelumnya  [n] berikutnya  Enter = kembali: ").strip().lower()
+        if nav == "p" and hal > 1:
+            hal -= 1
+        elif nav == "n" and hal < n_hal:
+            hal += 1
+        elif nav == "":
+            return
+
+def lihat_riwayat(user):
+    """
+    Menu untuk melihat riwayat transaksi.
+    
+    Opsi:
+    1. Saldo Utama - Tampilkan semua transaksi nabung/keluar dari saldo utama
+    2. Riwayat Target - Pilih target, kemudian tampilkan transaksinya
+    3. Cari Catatan - Cari transaksi berdasarkan kata di catatan
+    4. Kembali - Kembali ke menu utama
+    
+    Menampilkan dalam format tabel: Tanggal | Tipe | Jumlah | Catatan,
+    per halaman untuk riwayat yang panjang.
+    
+    Args:
+        user (str): Username pengguna yang login (lowercase).
+    """
+    while True:
+        clear()
+        print(bold(cyan("📜 RIWAYAT TRANSAKSI")))
+        print("1. Saldo Utama")
+        print("2. Riwayat Target")
+        print("3. Cari Catatan")
+        print("4. Kembali")
+
+        pil = input("Pilih: ").strip()
+
+        # ====== Saldo Utama ======
+        if pil == "1":
+            clear()
+            tampilkan_riwayat(user)
+
+        # ====== Target ======
+        elif pil == "2":
+            clear()
+            targets = users[user]["targets"]
+
+            if not targets:
+                print("Belum ada target.")
+                input("Enter...")
+                continue
+
+            print("Pilih target:")
+            chosen = pilih_target(user)
+            if chosen is None:
+                print("❌ Pilihan tidak valid.")
+                input("Enter...")
+                continue
+
+            clear()
+            tampilkan_riwayat(user, chosen)
+
+        elif pil == "3":
+            cari_riwayat(user)
+
+        elif pil == "4":
+            break
+
+        else:
+            print(red("❌ Pilihan tidak valid."))
+            input("Enter...")
+
+
+# =========================================================
+#  KATEGORI PENGELUARAN
+# =========================================================
+
+# Aturan kategori berbasis kata kunci di catatan. Token catatan dicocokkan
+# persis lebih dulu, lalu sebagai awalan (misal "kopinya" → makan).
+# Kategori pertama yang cocok (urut token di catatan) yang dipakai.
+KATEGORI_KATA = {
+    "makan": ("makan", "kopi", "nasi", "bakso", "mie", "ayam", "sate", "gofood",
+              "grabfood", "shopeefood", "jajan", "snack", "minum", "boba", "sarapan",
+              "warteg", "resto", "cafe", "martabak", "roti", "seblak", "indomie"),
+    "transport": ("gojek", "grab", "ojek", "ojol", "bensin", "pertalite", "pertamax",
+                  "parkir", "tol", "krl", "mrt", "lrt", "transjakarta", "busway", "bus",
+                  "kereta", "angkot", "taksi", "maxim", "bengkel"),
+    "hiburan": ("nonton", "bioskop", "film", "netflix", "spotify", "game", "steam",
+                "konser", "karaoke", "youtube", "disney", "topup", "liburan", "mabar"),
+    "belanja": ("baju", "kaos", "sepatu", "celana", "shopee", "tokopedia", "lazada",
+                "belanja", "skincare", "checkout", "tiktokshop"),
+    "tagihan": ("pulsa", "kuota", "listrik", "pln", "wifi", "internet", "token", "kos",
+                "kost", "sewa", "bpjs", "cicilan", "pdam", "langganan"),
+}
+KATEGORI_LAIN = "lainnya"
+
+_KATA_KATEGORI = {kw: kat for kat, kws in KATEGORI_KATA.items() for kw in kws}
+_AWALAN_KATEGORI = tuple((kw, kat) for kat, kws in KATEGORI_KATA.items()
+                         for kw in kws if len(kw) >= 4)
+
+# Cache hasil klasifikasi: catatan → kategori. Catatan pengeluaran banyak
+# yang berulang persis ("kopi", "gojek ke kampus"), jadi cukup dihitung sekali.
+_kategori_cache = {}
+
+# Total pengeluaran per kategori per user: user → {kategori: total}.
+# Diperbarui saat transaksi tercatat, dihitung ulang penuh jika belum ada.
+_total_kategori = {}
+
+def kategori_catatan(catatan):
+    """
+    Menentukan kategori pengeluaran dari catatan (dengan cache).
+    
+    Args:
+        catatan (str): Catatan transaksi.
+        
+    Returns:
+        str: Nama kategori dari KATEGORI_KATA, atau KATEGORI_LAIN.
+    """
+    kat = _kategori_cache.get(catatan)
+    if kat is None:
+        tokens = token_catatan(catatan)
+        kat = next((_KATA_KATEGORI[t] for t in tokens if t in _KATA_KATEGORI), None)
+        if kat is None:
+            kat = next((k for t in tokens for kw, k in _AWALAN_KATEGORI if t.startswith(kw)),
+                       KATEGORI_LAIN)
+        _kategori_cache[catatan] = kat
+    return kat
+
+def kategorikan_ulang(user):
+    """
+    Menghitung ulang total pengeluaran per kategori dari seluruh riwayat
+    (memori + file biner) dan menyimpannya.
+    
+    Args:
+        user (str): Username pengguna (lowercase).
+        
+    Returns:
+        dict: {kategori: total_keluar}.
+    """
+    total = {}
+    for _, tipe, jumlah, catatan, _ in _iter_transaksi_record(users[user]):
+        if tipe == "keluar" and catatan != CATATAN_KOREKSI:
+            kat = kategori_catatan(catatan)
+            total[kat] = total.get(kat, 0) + jumlah
+    _total_kategori[user] = total
+    return total
+
+def total_kategori(user):
+    """
+    Mengambil total pengeluaran per kategori, dihitung ulang jika belum ada.
+    
+    Args:
+        user (str): Username pengguna (lowercase).
+        
+    Returns:
+        dict: {kategori: total_keluar}.
+    """
+    total = _total_kategori.get(user)
+    if total is None:
+        total = kategorikan_ulang(user)
+    return total
+
+def invalidasi_kategori(user):
+    """
+    Membuang total kategori user (misal saat target beserta riwayatnya dihapus).
+    
+    Args:
+        user (str): Username pengguna (lowercase).
+    """
+    _total_kategori.pop(user, None)
+
+def _kategori_baru(user, target_name, rows):
+    """
+    Pendengar jurnal: mengklasifikasi pengeluaran baru saat dicatat.
+    """
+    total = _total_kategori.get(user)
+    if total is None:
+        return
+    for _, tipe, jumlah, catatan in rows:
+        if tipe == "keluar" and catatan != CATATAN_KOREKSI:
+            kat = kategori_catatan(catatan)
+            total[kat] = total.get(kat, 0) + jumlah
+
+_pendengar_transaksi.append(_kategori_baru)
+
+# =========================================================
+#  ANGGARAN BULANAN
+# =========================================================
+
+# u["anggaran"] berisi batas pengeluaran per bulan: {kategori: nominal}.
+# Kunci ANGGARAN_TOTAL membatasi seluruh pengeluaran bulan itu.
+ANGGARAN_TOTAL = "total"
+AMBANG_ANGGARAN = (80, 100)
+
+# Pengeluaran bulan berjalan per user:
+#   user → {"bulan": epoch awal bulan, "total": n, "kategori": {kategori: n}}
+# Diperbarui oleh jurnal transaksi; dihitung ulang (hanya transaksi bulan
+# itu) saat bulan berganti atau setelah invalidasi.
+_bulan_berjalan = {}
+
+def _iter_sejak(u, target_name, mulai):
+    """
+    Generator riwayat sebuah sumber mulai dari epoch tertentu (biner + memori).
+    """
+    for h, start, count, _, _ in _segmen_sumber(u, target_name):
+        for i in range(cari_ts_biner(h, start, start + count, mulai), start + count):
+            yield baris_biner(h, i)
+    yield from rentang_riwayat(_riwayat_memori(u, target_name), mulai)
+
+def pengeluaran_bulan_ini(user, now=None):
+    """
+    Mengambil counter pengeluaran bulan berjalan.
+    
+    Args:
+        user (str): Username pengguna (lowercase).
+        now (int): Epoch acuan. Default: waktu sekarang.
+        
+    Returns:
+        dict: {"bulan": epoch awal bulan, "total": n, "kategori": {kategori: n}}
+    """
+    bulan = awal_bulan(waktu_sekarang() if now is None else now)
+    data = _bulan_berjalan.get(user)
+    if data is None or data["bulan"] != bulan:
+        data = {"bulan": bulan, "total": 0, "kategori": {}}
+        akhir = awal_bulan(bulan + 32 * DETIK_PER_HARI)
+        u = users[user]
+        for target_name in [None] + list(u["targets"]):
+            for ts, tipe, jumlah, catatan in _iter_sejak(u, target_name, bulan):
+                if ts >= akhir:
+                    break
+                if tipe == "keluar" and catatan != CATATAN_KOREKSI:
+                    kat = kategori_catatan(catatan)
+                    data["kategori"][kat] = data["kategori"].get(kat, 0) + jumlah
+                    data["total"] += jumlah
+        _bulan_berjalan[user] = data
+    return data
+
+def invalidasi_anggaran(user):
+    """
+    Membuang counter bulan berjalan user agar dihitung ulang saat dibutuhkan.
+    
+    Args:
+        user (str): Username pengguna (lowercase).
+    """
+    _bulan_berjalan.pop(user, None)
+
+def _anggaran_baru(user, target_name, rows):
+    """
+    Pendengar jurnal: menambah counter bulan berjalan untuk pengeluaran
+    yang jatuh di bulan tersebut.
+    """
+    data = _bulan_berjalan.get(user)
+    if data is None:
+        return
+    for ts, tipe, jumlah, catatan in rows:
+        if tipe == "keluar" and catatan != CATATAN_KOREKSI and awal_bulan(ts) == data["bulan"]:
+            kat = kategori_catatan(catatan)
+            data["kategori"][kat] = data["kategori"].get(kat, 0) + jumlah
+            data["total"] += jumlah
+
+_pendengar_transaksi.append(_anggaran_baru)
+
+def valid_anggaran(kunci, nominal):
+    """
+    Validasi kunci dan nominal anggaran bulanan.
+    
+    Args:
+        kunci (str): Nama kategori atau ANGGARAN_TOTAL.
+        nominal (int): Batas per bulan (0 = hapus anggaran).
+        
+    Returns:
+        tuple: (bool, str) - (valid, pesan_error)
+    """
+    if kunci != ANGGARAN_TOTAL and kunci != KATEGORI_LAIN and kunci not in KATEGORI_KATA:
+        return False, "Kategori tidak dikenal."
+    if nominal < 0:
+        return False, "Nominal tidak boleh negatif."
+    if nominal > MAX_NOMINAL:
+        return False, f"Batas maksimum Rp {format_rupiah(MAX_NOMINAL)}"
+    return True, ""
+
+def atur_anggaran(user, kunci, nominal):
+    """
+    Mengatur (atau menghapus jika nominal 0) anggaran bulanan.
+    
+    Args:
+        user (str): Username pengguna (lowercase).
+        kunci (str): Nama kategori atau ANGGARAN_TOTAL.
+        nominal (int): Batas per bulan.
+        
+    Returns:
+        tuple: (bool, str) - (berhasil, pesan_error)
+    """
+    ok, msg = valid_anggaran(kunci, nominal)
+    if not ok:
+        return False, msg
+    if nominal:
+        users[user]["anggaran"][kunci] = nominal
+    else:
+        users[user]["anggaran"].pop(kunci, None)
+    return True, ""
+
+def posisi_anggaran(user, now=None):
+    """
+    Pemakaian setiap anggaran bulan berjalan.
+    
+    Args:
+        user (str): Username pengguna (lowercase).
+        now (int): Epoch acuan. Default: waktu sekarang.
+        
+    Returns:
+        dict: {kunci: (terpakai, batas)} untuk semua anggaran yang diatur.
+    """
+    data = pengeluaran_bulan_ini(user, now)
+    return {
+        kunci: (data["total"] if kunci == ANGGARAN_TOTAL else data["kategori"].get(kunci, 0), batas)
+        for kunci, batas in users[user]["anggaran"].items()
+    }
+
+def level_anggaran(terpakai, batas):
+    """
+    Ambang tertinggi (dari AMBANG_ANGGARAN) yang sudah dilewati, atau 0.
+    """
+    return max((a for a in AMBANG_ANGGARAN if terpakai * 100 >= batas * a), default=0)
+
+def peringatan_anggaran(user, sebelum, now=None):
+    """
+    Membandingkan posisi anggaran sebelum & sesudah transaksi.
+    
+    Peringatan muncul saat ambang 80% atau 100% baru saja dilewati, dan
+    setiap kali pengeluaran bertambah pada anggaran yang sudah habis.
+    
+    Args:
+        user (str): Username pengguna (lowercase).
+        sebelum (dict): Hasil posisi_anggaran() sebelum transaksi.
+        now (int): Epoch acuan. Default: waktu sekarang.
+        
+    Returns:
+        list: (kunci, level, terpakai, batas) untuk setiap peringatan.
+    """
+    out = []
+    for kunci, (terpakai, batas) in posisi_anggaran(user, now).items():
+        lama = sebelum.get(kunci, (0, batas))[0]
+        level = level_anggaran(terpakai, batas)
+        if terpakai > lama and (level > level_anggaran(lama, batas) or level == 100):
+            out.append((kunci, level, terpakai, batas))
+    return out
+
+def tampilkan_peringatan_anggaran(user, sebelum, now=None):
+    """
+    Mencetak peringatan anggaran hasil peringatan_anggaran().
+    """
+    for kunci, level, terpakai, batas in peringatan_anggaran(user, sebelum, now):
+        label = "Total bulan ini" if kunci == ANGGARAN_TOTAL else f"Anggaran {kunci}"
+        pesan = f"{label}: Rp {format_rupiah(terpakai)} dari Rp {format_rupiah(batas)}"
+        if level == 100:
+            print(red(f"🚨 {pesan} (sudah habis!)"))
+        else:
+            print(yellow(f"⚠️ {pesan} (sudah {terpakai * 100 // batas}%)"))
+
+def menu_anggaran(user):
+    """
+    Ringkasan anggaran bulan berjalan sekaligus pengaturannya.
+    
+    Hanya membaca counter bulan berjalan, jadi tampil instan berapa pun
+    panjang riwayatnya.
+    
+    Args:
+        user (str): Username pengguna yang login (lowercase).
+    """
+    while True:
+        clear()
+        data = pengeluaran_bulan_ini(user)
+        print(bold(cyan(f"💼 ANGGARAN {format_waktu(data['bulan'], '%B %Y').upper()}")))
+        posisi = posisi_anggaran(user)
+        if not posisi:
+            print("Belum ada anggaran.")
+        for kunci, (terpakai, batas) in posisi.items():
+            pct = terpakai * 100 // batas
+            bar = "#" * min(pct // 10, 10) + "-" * (10 - min(pct // 10, 10))
+            warna = red if pct >= 100 else yellow if pct >= AMBANG_ANGGARAN[0] else green
+            print(warna(f"{kunci:<10} [{bar}] {pct:>3}%  "
+                        f"Rp {format_rupiah(terpakai)} / Rp {format_rupiah(batas)}"))
+
+        lain = {k: v for k, v in data["kategori"].items() if k not in posisi}
+        if lain:
+            print()
+            print("Tanpa anggaran:")
+            for kat, jml in sorted(lain.items(), key=lambda kv: -kv[1]):
+                print(f"  {kat:<10} Rp {format_rupiah(jml)}")
+
+        print()
+        print("1. Atur Anggaran")
+        print("2. Hapus Anggaran")
+        print("3. Kembali")
+        pil = input("Pilih: ").strip()
+
+        if pil == "1":
+            pilihan = [ANGGARAN_TOTAL] + list(KATEGORI_KATA) + [KATEGORI_LAIN]
+            kunci = pilih_nomor(pilihan, "Nomor anggaran: ")
+            if kunci is None:
+                print(red("❌ Pilihan tidak valid."))
+                input("Enter...")
+                continue
+            nominal = input_nominal(f"Batas {kunci} per bulan: Rp ")
+            ok, msg = atur_anggaran(user, kunci, nominal)
+            if ok:
+                print(green("✅ Anggaran disimpan."))
+            else:
+                print(red(f"❌ {msg}"))
+            input("Enter...")
+        elif pil == "2":
+            if not posisi:
+                print("Belum ada anggaran untuk dihapus.")
+                input("Enter...")
+                continue
+            kunci = pilih_nomor(list(posisi), "Nomor anggaran: ")
+            if kunci is None:
+                print(red("❌ Pilihan tidak valid."))
+                input("Enter...")
+                continue
+            atur_anggaran(user, kunci, 0)
+            print(green(f"✅ Anggaran {kunci} dihapus."))
+            input("Enter...")
+        elif pil == "3":
+            return
+        else:
+            print(red("❌ Pilihan tidak valid."))
+            input("Enter...")
+
+# =========================================================
+#  ANALISIS KEUANGAN
+# =========================================================
+
+def analisis_keuangan(user):
+    """
+    Menu untuk melihat analisis keuangan dan status dompet pengguna.
+    
+    Menghitung:
+    - Total Nabung (dari saldo utama + semua target)
+    - Total Pengeluaran (dari saldo utama + semua target)
+    - Rasio Pengeluaran (total_keluar / total_nabung * 100)
+    - Rincian pengeluaran per kategori (makan, transport, hiburan, dst)
+    
+    Status Dompet berdasarkan rasio pengeluaran:
+    - < 30%: Dompet Sehat 😎
+    - 30-60%: Keuangan Cukup Stabil 🙂
+    - > 60%: Boros Banget 😭
+    
+    Args:
+        user (str): Username pengguna yang login (lowercase).
+    """
+    clear()
+    print(bold(yellow("📊 ANALISIS KEUANGAN")))
+
+    total_nabung, total_keluar = total_riwayat(user)
+
+    if total_nabung == 0:
+        print("Belum ada data tabungan.")
+        input("Enter...")
+        return
+
+    rasio = (total_keluar / total_nabung) * 100
+    label, warna = STATUS_DOMPET[status_keuangan(total_nabung, total_keluar)]
+    status = warna(label)
+
+    print(f"Total Nabung      : Rp {format_rupiah(total_nabung)}")
+    print(f"Total Pengeluaran : Rp {format_rupiah(total_keluar)}")
+    print(f"Rasio Pengeluaran : {rasio:.2f}%")
+    print(f"Status            : {status}")
+
+    per_kategori = total_kategori(user)
+    if total_keluar and per_kategori:
+        print()
+        print(bold("Pengeluaran per Kategori"))
+        for kat, jml in sorted(per_kategori.items(), key=lambda kv: -kv[1]):
+            pct = jml * 100 / total_keluar
+            bar = "#" * int(pct // 5)
+            print(f"  {kat:<10} Rp {format_rupiah(jml):>20}  {pct:5.1f}%  {bar}")
+
+    input("Enter...")
+
+
+# =========================================================
+#  AGREGAT GLOBAL & PAPAN PERINGKAT
+# =========================================================
+
+# Status dompet berdasarkan rasio pengeluaran (lihat analisis_keuangan).
+STATUS_DOMPET = {
+    "sehat": ("Dompet Sehat 😎", green),
+    "stabil": ("Keuangan Cukup Stabil 🙂", yellow),
+    "boros": ("Boros Banget 😭", red),
+}
+
+# Agregat lintas user, diperbarui oleh jurnal transaksi sejak transaksi
+# pertama (tidak ada pembangunan ulang penuh):
+#   _agregat_user    : user → {"nabung", "keluar", "status", "bulan": {bulan: nabung}}
+#   _agregat_total   : total nabung & keluar seluruh user
+#   _jumlah_status   : status dompet → jumlah user
+#   _peringkat_bulan : bulan → {"nilai": {user: nabung}, "bucket": [[(-nabung, user)]],
+#                               "awal": [item pertama tiap bucket]}
+# Papan tiap bulan adalah list terurut yang dipecah per bucket berisi
+# paling banyak 2 x PERINGKAT_BUCKET item, jadi menyisipkan/menghapus
+# satu user hanya menggeser isi satu bucket (bukan seluruh peserta).
+# Peringkat satu user = jumlah isi bucket sebelumnya + bisect di bucketnya,
+# top-k cukup membaca bucket pertama. User yang targetnya dihapus /
+# digabung ditandai kotor dan dihitung ulang (hanya user itu) saat query.
+PERINGKAT_BUCKET = 512
+
+_agregat_user = {}
+_agregat_total = {"nabung": 0, "keluar": 0}
+_jumlah_status = dict.fromkeys(STATUS_DOMPET, 0)
+_peringkat_bulan = {}
+_agregat_kotor = set()
+
+def status_keuangan(total_nabung, total_keluar):
+    """
+    Mengelompokkan kondisi dompet dari rasio pengeluaran terhadap tabungan.
+    
+    Args:
+        total_nabung (int): Total uang masuk.
+        total_keluar (int): Total uang keluar.
+        
+    Returns:
+        str: Kunci STATUS_DOMPET ('sehat' < 30%, 'stabil' <= 60%, 'boros'),
+             atau None jika belum ada tabungan.
+    """
+    if not total_nabung:
+        return None
+    if total_keluar * 100 < total_nabung * 30:
+        return "sehat"
+    if total_keluar * 100 <= total_nabung * 60:
+        return "stabil"
+    return "boros"
+
+def _bucket_tambah(idx, item):
+    """
+    Menyisipkan item ke papan bucket terurut, memecah bucket yang penuh.
+    """
+    bucket, awal = idx["bucket"], idx["awal"]
+    if not bucket:
+        bucket.append([item])
+        awal.append(item)
+        return
+    i = max(bisect_right(awal, item) - 1, 0)
+    b = bucket[i]
+    insort(b, item)
+    awal[i] = b[0]
+    if len(b) > 2 * PERINGKAT_BUCKET:
+        bucket[i:i + 1] = [b[:PERINGKAT_BUCKET], b[PERINGKAT_BUCKET:]]
+        awal.insert(i + 1, bucket[i + 1][0])
+
+def _bucket_hapus(idx, item):
+    """
+    Menghapus item dari papan bucket terurut.
+    """
+    bucket, awal = idx["bucket"], idx["awal"]
+    i = bisect_right(awal, item) - 1
+    b = bucket[i]
+    del b[bisect_left(b, item)]
+    if b:
+        awal[i] = b[0]
+    else:
+        del bucket[i]
+        del awal[i]
+
+def _ubah_peringkat(bulan, user, delta):
+    """
+    Menambah nilai tabungan user pada papan peringkat sebuah bulan.
+    """
+    idx = _peringkat_bulan.setdefault(bulan, {"nilai": {}, "bucket": [], "awal": []})
+    nilai = idx["nilai"]
+    lama = nilai.get(user, 0)
+    if lama:
+        _bucket_hapus(idx, (-lama, user))
+    baru = lama + delta
+    if baru:
+        nilai[user] = baru
+        _bucket_tambah(idx, (-baru, user))
+    else:
+        nilai.pop(user, None)
+
+def _perbarui_status(user, a):
+    """
+    Memindahkan user antar kelompok status dompet jika statusnya berubah.
+    """
+    baru = status_keuangan(a["nabung"], a["keluar"])
+    if baru != a["status"]:
+        if a["status"] is not None:
+            _jumlah_status[a["status"]] -= 1
+        if baru is not None:
+            _jumlah_status[baru] += 1
+        a["status"] = baru
+
+def _tambah_agregat(user, rows):
+    """
+    Menambahkan baris transaksi (ts, tipe, jumlah, ...) ke agregat user.
+    """
+    a = _agregat_user.setdefault(user, {"nabung": 0, "keluar": 0, "status": None, "bulan": {}})
+    for row in rows:
+        ts, tipe, jumlah = row[0], row[1], row[2]
+        if row[3] == CATATAN_KOREKSI:
+            continue
+        if tipe == "nabung":
+            a["nabung"] += jumlah
+            _agregat_total["nabung"] += jumlah
+            bulan = awal_bulan(ts)
+            a["bulan"][bulan] = a["bulan"].get(bulan, 0) + jumlah
+            _ubah_peringkat(bulan, user, jumlah)
+        elif tipe == "keluar":
+            a["keluar"] += jumlah
+            _agregat_total["keluar"] += jumlah
+    _perbarui_status(user, a)
+
+def _hitung_ulang_agregat(user):
+    """
+    Mengganti kontribusi user pada agregat global dengan hasil scan
+    riwayat user tersebut (memori + file biner).
+    """
+    a = _agregat_user.pop(user, None)
+    if a is not None:
+        _agregat_total["nabung"] -= a["nabung"]
+        _agregat_total["keluar"] -= a["keluar"]
+        for bulan, n in a["bulan"].items():
+            _ubah_peringkat(bulan, user, -n)
+        if a["status"] is not None:
+            _jumlah_status[a["status"]] -= 1
+    _tambah_agregat(user, _iter_transaksi_record(users[user]))
+
+def siapkan_agregat():
+    """
+    Menghitung ulang user yang ditandai kotor. Agregat user lain sudah
+    terkini karena diperbarui setiap transaksi oleh _agregat_baru().
+    """
+    while _agregat_kotor:
+        _hitung_ulang_agregat(_agregat_kotor.pop())
+
+def invalidasi_agregat(user):
+    """
+    Menandai kontribusi user pada agregat global perlu dihitung ulang.
+    
+    Args:
+        user (str): Username pengguna (lowercase).
+    """
+    _agregat_kotor.add(user)
+
+def _agregat_baru(user, target_name, rows):
+    """
+    Pendengar jurnal: memperbarui agregat global untuk transaksi baru.
+    """
+    if user not in _agregat_kotor:
+        _tambah_agregat(user, rows)
+
+_pendengar_transaksi.append(_agregat_baru)
+
+def top_penabung(k=10, bulan=None):
+    """
+    Daftar user dengan total nabung terbesar pada sebuah bulan.
+    
+    Args:
+        k (int): Jumlah user yang diambil.
+        bulan (int): Epoch awal bulan. Default: bulan berjalan.
+        
+    Returns:
+        list: (user, total_nabung) terurut dari yang terbesar.
+    """
+    siapkan_agregat()
+    if bulan is None:
+        bulan = awal_bulan(waktu_sekarang())
+    idx = _peringkat_bulan.get(bulan)
+    if idx is None:
+        return []
+    return [(user, -neg) for neg, user in islice(chain.from_iterable(idx["bucket"]), k)]
+
+def peringkat_user(user, bulan=None):
+    """
+    Peringkat seorang user pada papan tabungan sebuah bulan.
+    
+    Args:
+        user (str): Username pengguna (lowercase).
+        bulan (int): Epoch awal bulan. Default: bulan berjalan.
+        
+    Returns:
+        tuple: (peringkat mulai 1, total_nabung, jumlah_peserta), atau
+               (None, 0, jumlah_peserta) jika user belum menabung bulan itu.
+    """
+    siapkan_agregat()
+    if bulan is None:
+        bulan = awal_bulan(waktu_sekarang())
+    idx = _peringkat_bulan.get(bulan)
+    if idx is None:
+        return None, 0, 0
+    n = idx["nilai"].get(user)
+    if n is None:
+        return None, 0, len(idx["nilai"])
+    item = (-n, user)
+    i = bisect_right(idx["awal"], item) - 1
+    sebelum = sum(len(b) for b in islice(idx["bucket"], i))
+    return sebelum + bisect_left(idx["bucket"][i], item) + 1, n, len(idx["nilai"])
+
+def agregat_global():
+    """
+    Ringkasan seluruh platform.
+    
+    Returns:
+        dict: {"nabung", "keluar", "n_user", "status": {status: jumlah_user}},
+              dengan status None = user yang belum punya tabungan.
+    """
+    siapkan_agregat()
+    status = dict(_jumlah_status)
+    status[None] = len(users) - sum(_jumlah_status.values())
+    return {"nabung": _agregat_total["nabung"], "keluar": _agregat_total["keluar"],
+            "n_user": len(users), "status": status}
+
+def papan_peringkat(user, k=10):
+    """
+    Menampilkan top penabung bulan ini dan posisi user.
+    
+    Baris milik user lain tampil tanpa username (hanya peringkat dan
+    nominal), jadi papan tidak membuka identitas akun lain.
+    
+    Args:
+        user (str): Username pengguna yang login (lowercase).
+        k (int): Jumlah baris top penabung.
+    """
+    clear()
+    print(bold(magenta(f"🏆 TOP PENABUNG {format_waktu(waktu_sekarang(), '%B %Y').upper()}")))
+    top = top_penabung(k)
+    if not top:
+        print("Belum ada yang menabung bulan ini.")
+    for i, (uname, n) in enumerate(top, 1):
+        if uname == user:
+            print(bold(f"{i:>2}. {'👉 Kamu':<20} Rp {format_rupiah(n)}"))
+        else:
+            print(f"{i:>2}. {'Penabung anonim':<20} Rp {format_rupiah(n)}")
+
+    print()
+    rank, total, peserta = peringkat_user(user)
+    if rank is None:
+        print(yellow(f"Kamu belum menabung bulan ini ({peserta} user sudah)."))
+    else:
+        print(cyan(f"Peringkat kamu : #{rank} dari {peserta}"))
+        print(cyan(f"Persentil      : top {-(-rank * 100 // peserta)}%"))
+        print(f"Tabungan kamu  : Rp {format_rupiah(total)}")
+
+    siapkan_agregat()
+    status = _agregat_user.get(user, {}).get("status")
+    if status is not None:
+        label, warna = STATUS_DOMPET[status]
+        print(f"Status dompet  : {warna(label)}")
+    input("Enter...")
+
+# =========================================================
+#  PIPELINE EKSPOR (CSV / JSONL / KOLOM BINER)
+# =========================================================
+
+def iter_transaksi(user):
+    """
+    Generator seluruh transaksi user: saldo utama lalu setiap target.
+    
+    Semua format ekspor membaca dari iterator ini, sehingga tidak ada list
+    perantara yang dibangun walau riwayatnya besar.
+    
+    Args:
+        user (str): Username pengguna (lowercase).
+        
+    Yields:
+        tuple: (timestamp, tipe, jumlah, catatan, sumber) dengan sumber
+               'utama' atau 'target:nama_target'.
+    """
+    return _iter_transaksi_record(users[user])
+
+def _iter_transaksi_record(u):
+    """
+    Versi iter_transaksi() yang menerima record user langsung, sehingga
+    bisa dipakai di proses worker yang tidak memiliki dictionary 'users'.
+    """
+    for target_name in [None] + list(u["targets"]):
+        sumber = kunci_sumber(target_name)
+        for ts, tipe, jumlah, catatan in _iter_riwayat_record(u, target_name):
+            yield ts, tipe, jumlah, catatan, sumber
+
+# ------------------------- CSV -------------------------
+
+def tulis_csv(path, rows):
+    """
+    Menulis transaksi ke CSV (Tanggal ISO 8601 dengan offset zona waktu).
+    
+    Args:
+        path (str): Path file tujuan.
+        rows (iterable): Tuple transaksi dari iter_transaksi().
+        
+    Returns:
+        int: Jumlah baris yang ditulis.
+    """
+    n = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Tanggal", "Tipe", "Jumlah", "Catatan", "Sumber"])
+        for ts, tipe, jumlah, catatan, sumber in rows:
+            writer.writerow([ke_datetime(ts).isoformat(), tipe, jumlah, catatan, sumber])
+            n += 1
+    return n
+
+def baca_csv(path):
+    """
+    Membaca kembali file CSV hasil tulis_csv().
+    
+    Args:
+        path (str): Path file CSV.
+        
+    Yields:
+        tuple: (timestamp, tipe, jumlah, catatan, sumber).
+    """
+    with kunci_file(path), open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for tanggal, tipe, jumlah, catatan, sumber in reader:
+            ts = int(datetime.fromisoformat(tanggal).timestamp())
+            yield ts, tipe, int(jumlah), catatan, sumber
+
+# ------------------------ JSONL ------------------------
+
+def tulis_jsonl(path, rows):
+    """
+    Menulis transaksi ke JSON Lines (satu objek per baris, ts = epoch int).
+    
+    Args:
+        path (str): Path file tujuan.
+        rows (iterable): Tuple transaksi dari iter_transaksi().
+        
+    Returns:
+        int: Jumlah baris yang ditulis.
+    """
+    n = 0
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    with open(path, "w", encoding="utf-8") as f:
+        for ts, tipe, jumlah, catatan, sumber in rows:
+            f.write(dumps({"ts": ts, "tipe": tipe, "jumlah": jumlah,
+                           "catatan": catatan, "sumber": sumber}))
+            f.write("\n")
+            n += 1
+    return n
+
+def baca_jsonl(path):
+    """
+    Membaca kembali file JSONL hasil tulis_jsonl().
+    
+    Args:
+        path (str): Path file JSONL.
+        
+    Yields:
+        tuple: (timestamp, tipe, jumlah, catatan, sumber).
+    """
+    loads = json.loads
+    with kunci_file(path), open(path, encoding="utf-8") as f:
+        for line in f:
+            d = loads(line)
+            yield d["ts"], d["tipe"], d["jumlah"], d["catatan"], d["sumber"]
+
+# -------------------- KOLOM BINER (.cfk) --------------------
+#
+# Format kolom ringkas ala Parquet, dibagi per row group agar bisa ditulis
+# secara streaming dengan memori terbatas:
+#
+#   file   : MAGIC_KOLOM, group*, varint(0)
+#   group  : varint(n_baris)
+#            kamus tipe, kamus sumber, kamus catatan
+#                (varint(k) lalu k x [varint(len) + utf-8])
+#            kolom ts      : n x zigzag-varint selisih dari baris sebelumnya
+#            kolom tipe    : n x varint indeks kamus
+#            kolom jumlah  : n x zigzag-varint
+#            kolom sumber  : n x varint indeks kamus
+#            kolom catatan : n x varint indeks kamus
+
+MAGIC_KOLOM = b"CFK1"
+BARIS_PER_GROUP = 65536
+
+def _tulis_varint(buf, n):
+    """
+    Menambahkan integer non-negatif ke buffer sebagai varint (LEB128).
+    """
+    while n >= 0x80:
+        buf.append((n & 0x7F) | 0x80)
+        n >>= 7
+    buf.append(n)
+
+def _zigzag(n):
+    """
+    Memetakan integer bertanda ke non-negatif (0,-1,1,-2 → 0,1,2,3).
+    """
+    return n << 1 if n >= 0 else ((-n) << 1) - 1
+
+def _unzigzag(n):
+    """
+    Kebalikan dari _zigzag().
+    """
+    return n >> 1 if not n & 1 else -((n + 1) >> 1)
+
+def _baca_varints(data, pos, count):
+    """
+    Membaca sejumlah varint berurutan dari buffer bytes.
+    
+    Returns:
+        tuple: (list_angka, posisi_setelahnya)
+    """
+    out = []
+    append = out.append
+    for _ in range(count):
+        b = data[pos]
+        pos += 1
+        if b < 0x80:
+            append(b)
+            continue
+        n = b & 0x7F
+        shift = 7
+        while True:
+            b = data[pos]
+            pos += 1
+            n |= (b & 0x7F) << shift
+            if b < 0x80:
+                break
+            shift += 7
+        append(n)
+    return out, pos
+
+def _tulis_kamus(buf, kamus):
+    """
+    Menulis kamus (dict nilai → indeks, urut sesuai indeks) ke buffer.
+    """
+    _tulis_varint(buf, len(kamus))
+    for teks in kamus:
+        raw = teks.encode("utf-8")
+        _tulis_varint(buf, len(raw))
+        buf += raw
+
+def _baca_kamus(data, pos):
+    """
+    Membaca kamus yang ditulis _tulis_kamus().
+    
+    Returns:
+        tuple: (list_nilai, posisi_setelahnya)
+    """
+    (k,), pos = _baca_varints(data, pos, 1)
+    nilai = []
+    for _ in range(k):
+        (panjang,), pos = _baca_varints(data, pos, 1)
+        nilai.append(bytes(data[pos:pos + panjang]).decode("utf-8"))
+        pos += panjang
+    return nilai, pos
+
+def _flush_group(f, n, kamus, kolom):
+    """
+    Menulis satu row group (kamus + kolom) ke file.
+    """
+    head = bytearray()
+    _tulis_varint(head, n)
+    for k in kamus:
+        _tulis_kamus(head, k)
+    f.write(head)
+    for col in kolom:
+        f.write(col)
+
+def tulis_kolom(path, rows):
+    """
+    Menulis transaksi ke format kolom biner ringkas (.cfk).
+    
+    Tipe, sumber, dan catatan di-dictionary-encode; timestamp disimpan
+    sebagai selisih (delta) dan semua angka sebagai varint.
+    
+    Args:
+        path (str): Path file tujuan.
+        rows (iterable): Tuple transaksi dari iter_transaksi().
+        
+    Returns:
+        int: Jumlah baris yang ditulis.
+    """
+    total = 0
+    with open(path, "wb") as f:
+        f.write(MAGIC_KOLOM)
+        n = 0
+        for ts, tipe, jumlah, catatan, sumber in rows:
+            if n == 0:
+                kamus = ({}, {}, {})
+                kolom = [bytearray() for _ in range(5)]
+                prev = 0
+            _tulis_varint(kolom[0], _zigzag(ts - prev))
+            prev = ts
+            _tulis_varint(kolom[1], kamus[0].setdefault(tipe, len(kamus[0])))
+            _tulis_varint(kolom[2], _zigzag(jumlah))
+            _tulis_varint(kolom[3], kamus[1].setdefault(sumber, len(kamus[1])))
+            _tulis_varint(kolom[4], kamus[2].setdefault(catatan, len(kamus[2])))
+            n += 1
+            if n == BARIS_PER_GROUP:
+                _flush_group(f, n, kamus, kolom)
+                total += n
+                n = 0
+        if n:
+            _flush_group(f, n, kamus, kolom)
+            total += n
+        f.write(b"\x00")
+    return total
+
+def baca_kolom(path):
+    """
+    Membaca kembali file kolom biner hasil tulis_kolom().
+    
+    File di-mmap lalu didekode satu row group per langkah, jadi memori
+    yang dipakai sebanding dengan BARIS_PER_GROUP, bukan ukuran file.
+    
+    Args:
+        path (str): Path file .cfk.
+        
+    Yields:
+        tuple: (timestamp, tipe, jumlah, catatan, sumber).
+        
+    Raises:
+        ValueError: Jika file bukan format kolom ChillFinance.
+    """
+    with kunci_file(path), open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size <= len(MAGIC_KOLOM):
+            raise ValueError("Bukan file kolom ChillFinance.")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if data[:len(MAGIC_KOLOM)] != MAGIC_KOLOM:
+                raise ValueError("Bukan file kolom ChillFinance.")
+            yield from _baca_group_kolom(data, len(MAGIC_KOLOM))
+
+def _baca_group_kolom(data, pos):
+    """
+    Mendekode row group .cfk mulai dari 'pos' sampai penanda akhir.
+    """
+    while True:
+        (n,), pos = _baca_varints(data, pos, 1)
+        if n == 0:
+            return
+        k_tipe, pos = _baca_kamus(data, pos)
+        k_sumber, pos = _baca_kamus(data, pos)
+        k_catatan, pos = _baca_kamus(data, pos)
+        d_ts, pos = _baca_varints(data, pos, n)
+        c_tipe, pos = _baca_varints(data, pos, n)
+        c_jumlah, pos = _baca_varints(data, pos, n)
+        c_sumber, pos = _baca_varints(data, pos, n)
+        c_catatan, pos = _baca_varints(data, pos, n)
+
+        ts = 0
+        for i in range(n):
+            ts += _unzigzag(d_ts[i])
+            yield (ts, k_tipe[c_tipe[i]], _unzigzag(c_jumlah[i]),
+                   k_catatan[c_catatan[i]], k_sumber[c_sumber[i]])
+
+# Registry format ekspor: kode → (label, ekstensi, penulis, pembaca).
+# Format baru cukup didaftarkan di sini agar muncul di menu backup.
+FORMAT_EKSPOR = {
+    "csv": ("CSV", ".csv", tulis_csv, baca_csv),
+    "jsonl": ("JSON Lines", ".jsonl", tulis_jsonl, baca_jsonl),
+    "kolom": ("Kolom biner ringkas", ".cfk", tulis_kolom, baca_kolom),
+}
+
+def ekspor_user(user, fmt="csv", filename=None):
+    """
+    Mengekspor seluruh transaksi user ke file dengan format tertentu.
+    
+    Args:
+        user (str): Username pengguna (lowercase).
+        fmt (str): Kode format di FORMAT_EKSPOR. Default 'csv'.
+        filename (str): Nama file tujuan. Default {username}_backup{ext}.
+        
+    Returns:
+        tuple: (filename, jumlah_baris)
+    """
+    _, ext, penulis, _ = FORMAT_EKSPOR[fmt]
+    if filename is None:
+        filename = f"{users[user]['username']}_backup{ext}"
+    with tulis_atomik(filename) as tmp:
+        n = penulis(tmp, iter_transaksi(user))
+    return filename, n
+
+def bench_ekspor(n_baris=200_000, seed=42):
+    """
+    Benchmark ukuran file serta throughput tulis/baca setiap format ekspor.
+    
+    Data sintetis dibuat dengan pola mirip pemakaian nyata (catatan dan
+    sumber berulang, timestamp naik).
+    
+    Args:
+        n_baris (int): Jumlah transaksi sintetis. Default 200.000.
+        seed (int): Seed random agar hasil bisa diulang.
+    """
+    import random
+    import tempfile
+
+    rnd = random.Random(seed)
+    catatan = ["-", "kopi", "gojek", "makan siang", "gaji", "jajan", "pulsa", "nonton"]
+    sumber = ["utama"] + [f"target:Target {i}" for i in range(20)]
+    ts = 1_700_000_000
+    rows = []
+    for _ in range(n_baris):
+        ts += rnd.randint(60, 86_400)
+        rows.append((ts, rnd.choice(("nabung", "keluar")), rnd.randint(1, 5_000_000) * 100,
+                     rnd.choice(catatan), rnd.choice(sumber)))
+
+    print(f"Benchmark ekspor: {n_baris:,} baris")
+    print(f"{'Format':<22} | {'Ukuran':>12} | {'Tulis (baris/s)':>16} | {'Baca (baris/s)':>16}")
+    print("-" * 76)
+    with tempfile.TemporaryDirectory() as tmp:
+        for kode, (label, ext, penulis, pembaca) in FORMAT_EKSPOR.items():
+            path = os.path.join(tmp, "bench" + ext)
+            t0 = time.perf_counter()
+            penulis(path, iter(rows))
+            t1 = time.perf_counter()
+            n = sum(1 for _ in pembaca(path))
+            t2 = time.perf_counter()
+            assert n == n_baris
+            print(f"{label:<22} | {os.path.getsize(path):>12,} | "
+                  f"{n_baris / (t1 - t0):>16,.0f} | {n_baris / (t2 - t1):>16,.0f}")
+
+# =========================================================
+#  ARSIP BACKUP TERKOMPRESI
+# =========================================================
+#
+# Arsip berisi JSON Lines terkompresi. Setiap user diserialisasi menjadi
+# satu blok terkompresi mandiri (gzip/bz2/xz mendukung multi-stream),
+# sehingga serialisasi + kompresi bisa dikerjakan paralel per user dan
+# hasilnya cukup disambung. Isi tiap blok:
+#
+#   {"jenis": "user", ...ringkasan + n_target, n_transaksi, total_saldo, crc}
+#   {"jenis": "target", ...}          x n_target
+#   {"jenis": "trx", ...}             x n_transaksi
+#
+# Di akhir arsip ada {"jenis": "akhir", "n_user": N}. Password tidak ikut
+# diarsipkan.
+
+# Codec kompresi: kode → (ekstensi, fungsi compress, fungsi open)
+CODEC_ARSIP = {
+    "gzip": (".gz", gzip.compress, gzip.open),
+    "bz2": (".bz2", bz2.compress, bz2.open),
+    "xz": (".xz", lzma.compress, lzma.open),
+}
+
+def _blok_arsip_user(args):
+    """
+    Menyerialisasi dan mengompres satu user menjadi blok arsip.
+    
+    Dijalankan di worker process, jadi hanya memakai argumen (tanpa global).
+    
+    Args:
+        args (tuple): (username_key, record_user, codec).
+        
+    Returns:
+        bytes: Blok terkompresi berisi semua baris milik user tersebut.
     """
-    Menu untuk melihat riwayat transaksi.
+    uname, u, codec = args
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+
+    trx_lines = []
+    crc = 0
+    for ts, tipe, jumlah, catatan, sumber in _iter_transaksi_record(u):
+        line = dumps({"jenis": "trx", "ts": ts, "tipe": tipe, "jumlah": jumlah,
+                      "catatan": catatan, "sumber": sumber})
+        crc = zlib.crc32(line.encode("utf-8"), crc)
+        trx_lines.append(line)
+
+    target_lines = [
+        dumps({"jenis": "target", "nama": tname, "target": t["target"], "saldo": t["saldo"],
+               "status": t["status"], "last_withdraw": t["last_withdraw"],
+               "kebijakan": t["kebijakan"]})
+        for tname, t in u["targets"].items()
+    ]
+    header = dumps({
+        "jenis": "user",
+        "key": uname,
+        "username": u["username"],
+        "saldo_utama": u["saldo_utama"],
+        "created_at": u["created_at"],
+        "n_target": len(target_lines),
+        "n_transaksi": len(trx_lines),
+        "total_saldo": u["saldo_utama"] + sum(t["saldo"] for t in u["targets"].values()),
+        "crc": crc
+    })
+    body = "\n".join([header] + target_lines + trx_lines) + "\n"
+    return CODEC_ARSIP[codec][1](body.encode("utf-8"))
+
+def arsip_backup(path, unames=None, codec="gzip", workers=None):
+    """
+    Membuat arsip backup terkompresi untuk sebagian atau semua user.
     
-    Opsi:
-    1. Saldo Utama - Tampilkan semua transaksi nabung/keluar dari saldo utama
-    2. Riwayat Target - Pilih target, kemudian tampilkan transaksinya
-    3. Kembali - Kembali ke menu utama
+    Jika user lebih dari satu dan workers != 1, serialisasi per user
+    dikerjakan di process pool; urutan user di arsip tetap sama.
     
-    Menampilkan dalam format tabel: Tanggal | Tipe | Jumlah | Catatan
+    Args:
+        path (str): Path file arsip tujuan.
+        unames (list): Daftar username (lowercase). None = semua user.
+        codec (str): Kode di CODEC_ARSIP. Default 'gzip'.
+        workers (int): Jumlah worker process. None = jumlah CPU.
+        
+    Returns:
+        int: Jumlah user yang diarsipkan.
+    """
+    if unames is None:
+        unames = list(users)
+    compress = CODEC_ARSIP[codec][1]
+    jobs = [(uname, users[uname], codec) for uname in unames]
+
+    with tulis_atomik(path) as tmp, open(tmp, "wb") as f:
+        if len(jobs) > 1 and workers != 1:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for blok in pool.map(_blok_arsip_user, jobs, chunksize=max(1, len(jobs) // 64)):
+                    f.write(blok)
+        else:
+            for job in jobs:
+                f.write(_blok_arsip_user(job))
+        akhir = json.dumps({"jenis": "akhir", "n_user": len(jobs)})
+        f.write(compress(akhir.encode("utf-8") + b"\n"))
+        f.close()
+    return len(jobs)
+
+def verifikasi_arsip(path, codec="gzip"):
+    """
+    Memeriksa arsip: jumlah record dan checksum saldo/transaksi tiap user.
     
     Args:
-        user (str): Username pengguna yang login (lowercase).
+        path (str): Path file arsip.
+        codec (str): Kode di CODEC_ARSIP. Default 'gzip'.
+        
+    Returns:
+        tuple: (n_user, list_masalah) - list_masalah kosong jika arsip valid.
     """
-    while True:
-        clear()
-        print(bold(cyan("📜 RIWAYAT TRANSAKSI")))
-        print("1. Saldo Utama")
-        print("2. Riwayat Target")
-        print("3. Kembali")
-
-        pil = input("Pilih: ").strip()
-
-        # ====== Saldo Utama ======
-        if pil == "1":
-            clear()
-            riw = users[user]["riwayat"]
-
-            if not riw:
-                print("Belum ada transaksi.")
-                input("Enter...")
-                continue
-
-            print("-" * 80)
-            print(f"{'Tanggal':<20} | {'Tipe':<10} | {'Jumlah':>15} | {'Catatan':<30}")
-            print("-" * 80)
-
-            for t, tipe, jml, cat in riw:
-                print(f"{t:<20} | {tipe:<10} | {jml:>15,} | {cat:<30}")
-
-            print("-" * 80)
-            input("Enter...")
-
-        # ====== Target ======
-        elif pil == "2":
-            clear()
-            targets = users[user]["targets"]
-
-            if not targets:
-                print("Belum ada target.")
-                input("Enter...")
-                continue
-
-            print("Pilih target:")
-            names = list(targets.keys())
-
-            for i, n in enumerate(names, 1):
-                print(f"{i}. {n}")
-
-            sel = input("Nomor: ").strip()
-            if not sel.isdigit() or not (1 <= int(sel) <= len(names)):
-                print("❌ Pilihan tidak valid.")
-                input("Enter...")
-                continue
-
-            chosen = names[int(sel) - 1]
-            ri = targets[chosen]["riwayat"]
-
-            clear()
-            if not ri:
-                print("Belum ada transaksi.")
-                input("Enter...")
-                continue
-
-            print(f"--- Riwayat Target: {chosen} ---")
-            print("-" * 80)
-            print(f"{'Tanggal':<20} | {'Tipe':<10} | {'Jumlah':>15} | {'Catatan':<30}")
-            print("-" * 80)
-
-            for t, tipe, jml, cat in ri:
-                print(f"{t:<20} | {tipe:<10} | {jml:>15,} | {cat:<30}")
-
-            print("-" * 80)
-            input("Enter...")
-
-        elif pil == "3":
-            break
+    masalah = []
+    n_user = 0
+    akhir = None
+    cur = None
+    kunci_header = ("key", "saldo_utama", "n_target", "n_transaksi", "total_saldo", "crc")
+
+    def tutup(cur):
+        if cur is None:
+            return
+        h = cur["header"]
+        if cur["n_target"] != h["n_target"]:
+            masalah.append(f"{h['key']}: jumlah target {cur['n_target']} ≠ {h['n_target']}")
+        if cur["n_transaksi"] != h["n_transaksi"]:
+            masalah.append(f"{h['key']}: jumlah transaksi "
+                           f"{cur['n_transaksi']} ≠ {h['n_transaksi']}")
+        if cur["total_saldo"] != h["total_saldo"]:
+            masalah.append(f"{h['key']}: checksum saldo {cur['total_saldo']} ≠ {h['total_saldo']}")
+        if cur["crc"] != h["crc"]:
+            masalah.append(f"{h['key']}: checksum transaksi tidak cocok")
 
-        else:
-            print(red("❌ Pilihan tidak valid."))
-            input("Enter...")
+    try:
+        with kunci_file(path), CODEC_ARSIP[codec][2](path, "rt", encoding="utf-8") as f:
+            for no, line in enumerate(f, 1):
+                try:
+                    rec = json.loads(line)
+                    jenis = rec["jenis"]
+                    if jenis in ("trx", "target") and cur is None:
+                        masalah.append(f"Baris {no}: record '{jenis}' sebelum header user.")
+                    elif jenis == "trx":
+                        cur["n_transaksi"] += 1
+                        cur["crc"] = zlib.crc32(line.rstrip("\n").encode("utf-8"), cur["crc"])
+                    elif jenis == "target":
+                        cur["total_saldo"] += rec["saldo"]
+                        cur["n_target"] += 1
+                    elif jenis == "user":
+                        if not all(k in rec for k in kunci_header):
+                            masalah.append(f"Baris {no}: header user tidak lengkap.")
+                            continue
+                        tutup(cur)
+                        n_user += 1
+                        cur = {"header": rec, "n_target": 0, "n_transaksi": 0,
+                               "total_saldo": rec["saldo_utama"], "crc": 0}
+                    elif jenis == "akhir":
+                        akhir = rec
+                except (ValueError, KeyError, TypeError):
+                    masalah.append(f"Baris {no}: bukan record arsip yang valid.")
+    except (OSError, EOFError, ValueError, lzma.LZMAError) as e:
+        # Stream terkompresi terpotong/rusak: isi sesudahnya tidak terbaca.
+        masalah.append(f"Arsip rusak atau terpotong: {e}")
+    tutup(cur)
+
+    if akhir is None:
+        masalah.append("Penanda akhir arsip tidak ditemukan (arsip terpotong?).")
+    elif akhir.get("n_user") != n_user:
+        masalah.append(f"Jumlah user {n_user} ≠ {akhir.get('n_user')}")
+    return n_user, masalah
+
+def codec_dari_path(path):
+    """
+    Menebak codec arsip dari ekstensi file (.gz/.bz2/.xz), default gzip.
+    """
+    for kode, (ext, _, _) in CODEC_ARSIP.items():
+        if path.endswith(ext):
+            return kode
+    return "gzip"
 
+def arsip_database(path):
+    """
+    Mengarsipkan seluruh database (semua user) lalu memverifikasinya.
+    
+    Dipakai oleh opsi baris perintah --arsip (untuk admin), karena menu
+    backup hanya boleh mengarsipkan akun milik user yang login.
+    
+    Args:
+        path (str): Path file arsip; codec mengikuti ekstensinya.
+        
+    Returns:
+        tuple: (n_user, list_masalah) dari verifikasi_arsip().
+    """
+    codec = codec_dari_path(path)
+    arsip_backup(path, codec=codec)
+    n_user, masalah = verifikasi_arsip(path, codec)
+    if masalah:
+        print(red(f"❌ Arsip {path} gagal diverifikasi:"))
+        for m in masalah:
+            print(red(f"   - {m}"))
+    else:
+        print(green(f"✅ {n_user} user diarsipkan & diverifikasi: {path}"))
+    return n_user, masalah
 
 # =========================================================
-#  ANALISIS KEUANGAN
+#  BACKUP DATA
 # =========================================================
 
-def analisis_keuangan(user):
+def backup_data(user):
     """
-    Menu untuk melihat analisis keuangan dan status dompet pengguna.
+    Mengekspor data pengguna ke file untuk backup.
     
-    Menghitung:
-    - Total Nabung (dari saldo utama + semua target)
-    - Total Pengeluaran (dari saldo utama + semua target)
-    - Rasio Pengeluaran (total_keluar / total_nabung * 100)
+    Format yang tersedia mengikuti FORMAT_EKSPOR:
+    - CSV: Header Tanggal, Tipe, Jumlah, Catatan, Sumber (Tanggal ISO 8601)
+    - JSON Lines: satu objek transaksi per baris
+    - Kolom biner (.cfk): ringkas dan cepat dibaca ulang
+    - Arsip terkompresi akun ini, langsung diverifikasi
     
-    Status Dompet berdasarkan rasio pengeluaran:
-    - < 30%: Dompet Sehat 😎
-    - 30-60%: Keuangan Cukup Stabil 🙂
-    - > 60%: Boros Banget 😭
+    Baris berasal dari saldo utama (sumber='utama') dan setiap target
+    (sumber='target:nama_target').
+    
+    Hanya data milik user yang login yang ikut diekspor.
+    
+    Nama file: {username}_backup{ext} atau {username}_arsip.jsonl.gz
+    (disimpan di direktori current)
     
     Args:
         user (str): Username pengguna yang login (lowercase).
     """
     clear()
-    print(bold(yellow("📊 ANALISIS KEUANGAN")))
-
-    total_nabung = sum(j[2] for j in users[user]["riwayat"] if j[1] == "nabung")
-    total_keluar = sum(j[2] for j in users[user]["riwayat"] if j[1] == "keluar")
+    print(bold(cyan("💾 BACKUP DATA")))
+    kode = list(FORMAT_EKSPOR)
+    for i, k in enumerate(kode, 1):
+        label, ext, _, _ = FORMAT_EKSPOR[k]
+        print(f"{i}. {label} ({ext})")
+    print(f"{len(kode) + 1}. Arsip terkompresi (.jsonl.gz)")
+
+    sel = input("Pilih format (Enter = CSV): ").strip() or "1"
+    if not sel.isdigit() or not (1 <= int(sel) <= len(kode) + 1):
+        print(red("❌ Pilihan tidak valid."))
+        input("Enter...")
+        return
 
-    for t in users[user]["targets"].values():
-        total_nabung += sum(r[2] for r in t["riwayat"] if r[1] == "nabung")
-        total_keluar += sum(r[2] for r in t["riwayat"] if r[1] == "keluar")
+    sel = int(sel)
+    try:
+        if sel <= len(kode):
+            filename, n = ekspor_user(user, kode[sel - 1])
+            print(green(f"✅ {n} transaksi berhasil dibackup ke {filename}"))
+            input("Enter...")
+            return
 
-    if total_nabung == 0:
-        print("Belum ada data tabungan.")
+        filename = f"{users[user]['username']}_arsip.jsonl.gz"
+        arsip_backup(filename, [user])
+        _, masalah = verifikasi_arsip(filename)
+    except TimeoutError as e:
+        print(red(f"❌ {e}"))
         input("Enter...")
         return
 
-    rasio = (total_keluar / total_nabung) * 100
-
-    if rasio < 30:
-        status = green("Dompet Sehat 😎")
-    elif rasio <= 60:
-        status = yellow("Keuangan Cukup Stabil 🙂")
+    if masalah:
+        print(red(f"❌ Arsip {filename} gagal diverifikasi:"))
+        for m in masalah:
+            print(red(f"   - {m}"))
     else:
-        status = red("Boros Banget 😭")
-
-    print(f"Total Nabung      : Rp {format_rupiah(total_nabung)}")
-    print(f"Total Pengeluaran : Rp {format_rupiah(total_keluar)}")
-    print(f"Rasio Pengeluaran : {rasio:.2f}%")
-    print(f"Status            : {status}")
-
+        print(green(f"✅ Akun berhasil diarsipkan & diverifikasi: {filename}"))
     input("Enter...")
 
-
 # =========================================================
-#  BACKUP CSV
+#  FITUR LANJUTAN
 # =========================================================
 
-def backup_data(user):
+def menu_lanjutan(user):
     """
-    Mengekspor data pengguna ke file CSV untuk backup.
+    Submenu berisi fitur-fitur tambahan di luar menu utama.
     
-    File CSV berisi:
-    - Header: Tanggal, Tipe, Jumlah, Catatan, Sumber
-    - Baris data dari saldo utama (sumber='utama')
-    - Baris data dari setiap target (sumber='target:nama_target')
-    
-    Nama file: {username}_backup.csv (disimpan di direktori current)
+    Opsi:
+    1. Auto-Nabung Terjadwal - Kelola setoran rutin otomatis
+    2. Cek Batas Penarikan - Berapa yang bisa ditarik dari tiap target & kapan
+    3. Arsipkan Riwayat - Pindahkan riwayat ke file biner (hemat memori)
+    4. Saldo pada Tanggal - Lihat posisi saldo di tanggal tertentu
+    5. Cek Integritas Data - Cocokkan saldo dengan riwayat & perbaiki
+    6. Catat Banyak Transaksi - Input banyak nabung/pengeluaran sekaligus
+    7. Anggaran Bulanan - Batas pengeluaran per kategori & peringatannya
+    8. Papan Peringkat - Top penabung bulan ini (anonim) & peringkat kamu
+    9. Prakiraan Target - Peluang target tercapai sebelum tanggal tertentu
+    10. Token Stream Feed - Token untuk membaca event akun ini lewat --feed
+    11. Kembali - Kembali ke menu utama
     
     Args:
         user (str): Username pengguna yang login (lowercase).
     """
-    clear()
-    filename = f"{users[user]['username']}_backup.csv"
-
-    with open(filename, "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow(["Tanggal", "Tipe", "Jumlah", "Catatan", "Sumber"])
+    while True:
+        clear()
+        print(bold(cyan("🧰 FITUR LANJUTAN")))
+        print("1. Auto-Nabung Terjadwal")
+        print("2. Cek Batas Penarikan")
+        print("3. Arsipkan Riwayat")
+        print("4. Saldo pada Tanggal")
+        print("5. Cek Integritas Data")
+        print("6. Catat Banyak Transaksi")
+        print("7. Anggaran Bulanan")
+        print("8. Papan Peringkat")
+        print("9. Prakiraan Target")
+        print("10. Token Stream Feed")
+        print("11. Kembali")
 
-        for row in users[user]["riwayat"]:
-            writer.writerow([row[0], row[1], row[2], row[3], "utama"])
+        pilih = input(bold("Pilih: ")).strip()
 
-        for tname, tdata in users[user]["targets"].items():
-            for row in tdata["riwayat"]:
-                writer.writerow([row[0], row[1], row[2], row[3], f"target:{tname}"])
+        if pilih == "1":
+            menu_auto_nabung(user)
+        elif pilih == "2":
+            lihat_batas_penarikan(user)
+        elif pilih == "3":
+            if input("Pindahkan semua riwayat ke file biner? (Y/n): ").lower() in ("y", ""):
+                try:
+                    path, n = arsipkan_riwayat(user)
+                    print(green(f"✅ {n:,} transaksi tersimpan di {path}"))
+                except (TimeoutError, KonflikVersi) as e:
+                    print(red(f"❌ {e}"))
+                input("Enter...")
+        elif pilih == "4":
+            lihat_saldo_pada(user)
+        elif pilih == "5":
+            cek_integritas(user)
+        elif pilih == "6":
+            transaksi_batch(user)
+        elif pilih == "7":
+            menu_anggaran(user)
+        elif pilih == "8":
+            papan_peringkat(user)
+        elif pilih == "9":
+            lihat_prakiraan(user)
+        elif pilih == "10":
+            lihat_token_feed(user)
+        elif pilih == "11":
+            break
+        else:
+            print(red("❌ Pilihan tidak valid."))
+            input("Enter...")
 
-    print(green(f"✅ Data berhasil dibackup ke {filename}"))
+def lihat_token_feed(user):
+    """
+    Menampilkan token stream feed milik user dan opsi menggantinya.
+    
+    Args:
+        user (str): Username pengguna yang login (lowercase).
+    """
+    clear()
+    print(bold(cyan("🔑 TOKEN STREAM FEED")))
+    if _server_feed is None:
+        print(yellow("Stream feed tidak aktif (jalankan dengan --feed ALAMAT)."))
+        input("Enter...")
+        return
+    print(f"Token: {token_feed(user)}")
+    print("Kirim baris \"TOKEN [cursor]\" setelah terhubung ke stream.")
+    if input("Ganti token? (y/N): ").lower() == "y":
+        print(green(f"✅ Token baru: {token_feed(user, baru=True)}"))
     input("Enter...")
 
 # =========================================================
@@ -1109,18 +5600,38 @@ def menu_utama(user):
     4. Kelola Target - Buat, lihat, atau hapus target
     5. Lihat Riwayat - Lihat riwayat transaksi
     6. Analisis Keuangan - Analisis status keuangan
-    7. Backup Data - Backup data ke file CSV
-    8. Logout - Keluar akun
+    7. Backup Data - Backup data ke file CSV / JSONL / kolom biner
+    8. Fitur Lanjutan - Auto-nabung dan fitur tambahan lainnya
+    9. Logout - Keluar akun
+    
+    Auto-nabung yang jatuh tempo dijalankan setiap kali menu ini tampil.
+    Saat masuk, saldo dicocokkan dengan riwayat; jika ada selisih, user
+    diarahkan ke menu Cek Integritas Data. Riwayat lama yang menumpuk di
+    memori dipindah ke arsip biner (lihat kompaksi_riwayat()).
     
     Args:
         user (str): Username pengguna yang login (lowercase).
     """
+    ledger_ok = not periksa_ledger([user])
+    try:
+        n_kompaksi = kompaksi_riwayat(user, min_baris=KOMPAKSI_MIN_BARIS)
+    except (TimeoutError, KonflikVersi):
+        n_kompaksi = 0
     while True:
+        applied = jalankan_jadwal()
         clear()
         print(bold(cyan("=" * 50)))
         print(bold(yellow("💸 ChillFinance - Nabung Gen Z by Smartone")))
         print(bold(cyan("=" * 50)))
         print(f"👋 Halo, {bold(users[user]['username'])}")
+        if applied:
+            print(green(f"🔁 {applied} auto-nabung baru saja dijalankan."))
+        if n_kompaksi:
+            print(cyan(f"🗄️ {n_kompaksi:,} transaksi lama dipindah ke arsip biner."))
+            n_kompaksi = 0
+        if not ledger_ok:
+            print(red("⚠️ Saldo tidak cocok dengan riwayat. "
+                      "Cek di Fitur Lanjutan → Cek Integritas Data."))
         print()
         print("1️⃣  Lihat Saldo & Target")
         print("2️⃣  Nabung")
@@ -1129,7 +5640,8 @@ def menu_utama(user):
         print("5️⃣  Lihat Riwayat")
         print("6️⃣  Analisis Keuangan")
         print("7️⃣  Backup Data")
-        print("8️⃣  Logout")
+        print("8️⃣  Fitur Lanjutan")
+        print("9️⃣  Logout")
 
         pilih = input("\nPilih menu: ").strip()
 
@@ -1149,6 +5661,9 @@ def menu_utama(user):
             if input("Backup data sekarang? (Y/n): ").lower() in ("y", ""):
                 backup_data(user)
         elif pilih == "8":
+            menu_lanjutan(user)
+            ledger_ok = not periksa_ledger([user])
+        elif pilih == "9":
             if input("Yakin ingin logout? (Y/n): ").lower() in ("y", ""):
                 print("Logout berhasil. Sampai jumpa! 👋")
                 time.sleep(1)
@@ -1162,7 +5677,7 @@ def menu_utama(user):
 #  MAIN PROGRAM (AUTH MENU)
 # =========================================================
 
-def main():
+def main(tui=False):
     """
     Fungsi utama/entry point aplikasi ChillFinance.
     
@@ -1171,8 +5686,23 @@ def main():
     2. Register - Daftar akun baru
     3. Keluar - Keluar dari aplikasi
     
-    Loop akan terus berjalan sampai user memilih keluar.
+    Loop akan terus berjalan sampai user memilih keluar. Saat startup,
+    heap auto-nabung dibangun ulang, jadwal yang terlewat dijalankan, dan
+    seluruh saldo dicocokkan dengan riwayat.
+    
+    Args:
+        tui (bool): Setelah login, pakai tampilan layar penuh (tui_utama)
+                    alih-alih menu_utama.
     """
+    sesi = tui_utama if tui else menu_utama
+    muat_jadwal()
+    jalankan_jadwal()
+    bermasalah = periksa_ledger()
+    for uname, selisih in bermasalah.items():
+        print(yellow(f"⚠️ Saldo {users[uname]['username']} tidak cocok dengan riwayat "
+                     f"({len(selisih)} sumber)."))
+    if bermasalah:
+        input("Enter untuk lanjut...")
     while True:
         clear()
         print(bold(cyan("💸 ChillFinance - Nabung Gen Z")))
@@ -1185,11 +5715,11 @@ def main():
 
         if pilih == "1":
             user = login()
-            menu_utama(user)
+            sesi(user)
 
         elif pilih == "2":
             user = register()
-            menu_utama(user)
+            sesi(user)
 
         elif pilih == "3":
             konfirmasi = input("Yakin keluar dari aplikasi? (Y/n): ").lower()
@@ -1202,6 +5732,576 @@ def main():
             input("Enter untuk lanjut...")
 
 
+# =========================================================
+#  TUI LAYAR PENUH (CURSES)
+# =========================================================
+
+# Tampilan alternatif menu_utama dengan satu event loop curses:
+#   header  : nama aplikasi, user, jam
+#   saldo   : saldo utama & ringkasan target
+#   sumber  : saldo utama + daftar target (dipilih dengan panah)
+#   riwayat : riwayat sumber terpilih, diambil per layar lewat ambil_riwayat()
+#   status  : pesan terakhir / prompt input
+# Hanya pane yang berubah yang digambar ulang (noutrefresh + doupdate).
+# Setiap TUI_TICK_MS tanpa tombol, auto-nabung dijalankan dan change feed
+# user dibaca, jadi setoran terjadwal langsung tampil.
+
+try:
+    import curses
+except ImportError:
+    curses = None
+
+TUI_TICK_MS = 1000
+TUI_BANTUAN = "[↑↓] pilih  [Tab] fokus  [PgUp/PgDn] gulir  [n] nabung  [k] keluar  [q] logout"
+
+# Status hasil _tui_transaksi → warna baris status (kunci di st["warna"]).
+TUI_WARNA_STATUS = {"berhasil": "nabung", "peringatan": "info", "gagal": "keluar"}
+
+def _tui_tulis(win, y, x, teks, attr=0):
+    """
+    Menulis teks dipotong selebar window; error di pojok kanan bawah diabaikan.
+    """
+    h, w = win.getmaxyx()
+    if 0 <= y < h and 0 <= x < w:
+        try:
+            win.addnstr(y, x, teks, w - x, attr)
+        except curses.error:
+            pass
+
+def _tui_layout(stdscr):
+    """
+    Membuat window setiap pane sesuai ukuran terminal saat ini.
+    
+    Returns:
+        dict: {nama_pane: window}.
+    """
+    h, w = stdscr.getmaxyx()
+    kiri = max(min(w * 2 // 5, 48), 24)
+    return {
+        "header": stdscr.derwin(1, w, 0, 0),
+        "saldo": stdscr.derwin(5, kiri, 1, 0),
+        "sumber": stdscr.derwin(max(h - 7, 3), kiri, 6, 0),
+        "riwayat": stdscr.derwin(max(h - 2, 3), max(w - kiri, 10), 1, kiri),
+        "status": stdscr.derwin(1, w, h - 1, 0),
+    }
+
+def _tui_gambar(pane, win, user, st):
+    """
+    Menggambar ulang satu pane dari state TUI.
+    """
+    u = users[user]
+    win.erase()
+    h, w = win.getmaxyx()
+    warna = st["warna"]
+
+    if pane == "header":
+        _tui_tulis(win, 0, 0, f" ChillFinance | {u['username']}", curses.A_BOLD | warna["judul"])
+        jam = format_waktu(waktu_sekarang(), "%d %b %Y %H:%M")
+        _tui_tulis(win, 0, max(w - len(jam) - 1, 0), jam)
+    elif pane == "status":
+        _tui_tulis(win, 0, 0, st["pesan"] or TUI_BANTUAN, st["pesan_attr"])
+    else:
+        win.box()
+        fokus = pane == st["fokus"]
+        _tui_tulis(win, 0, 2, f" {pane.upper()} ", curses.A_BOLD | (warna["judul"] if fokus else 0))
+
+    if pane == "saldo":
+        targets = u["targets"]
+        _tui_tulis(win, 1, 2, f"Saldo utama : Rp {format_rupiah(u['saldo_utama'])}", curses.A_BOLD)
+        di_target = sum(t["saldo"] for t in targets.values())
+        _tui_tulis(win, 2, 2, f"Di target   : Rp {format_rupiah(di_target)}")
+        _tui_tulis(win, 3, 2, f"Target      : {len(u['target_aktif'])} aktif, "
+                              f"{len(u['target_selesai'])} selesai")
+    elif pane == "sumber":
+        sumber = st["sumber"]
+        tinggi = h - 2
+        awal = min(max(st["pilih"] - tinggi + 1, 0), max(len(sumber) - tinggi, 0))
+        for baris, nama in enumerate(sumber[awal:awal + tinggi], 1):
+            attr = curses.A_REVERSE if awal + baris - 1 == st["pilih"] else 0
+            if nama is None:
+                teks = f"Saldo Utama  Rp {format_rupiah(u['saldo_utama'])}"
+            else:
+                pct = progress_target(user, nama)
+                bar = "#" * (pct // 10) + "-" * (10 - pct // 10)
+                teks = f"{nama[:14]:<14} [{bar}] {pct:>3}%"
+                if nama in u["target_selesai"]:
+                    attr |= warna["nabung"]
+            _tui_tulis(win, baris, 1, f" {teks}".ljust(w - 2), attr)
+    elif pane == "riwayat":
+        nama = st["sumber"][st["pilih"]]
+        total = hitung_riwayat(user, nama)
+        tinggi = h - 2
+        st["gulir"] = min(st["gulir"], max(total - tinggi, 0))
+        akhir = total - st["gulir"]
+        rows = ambil_riwayat(user, nama, max(akhir - tinggi, 0), akhir)
+        _tui_tulis(win, 0, w - 22, f" {nama or 'Saldo Utama'} "[:20])
+        if not rows:
+            _tui_tulis(win, 1, 2, "Belum ada transaksi.")
+        for baris, (ts, tipe, jumlah, catatan) in enumerate(rows, 1):
+            tanda, attr = ("+", warna["nabung"]) if tipe == "nabung" else ("-", warna["keluar"])
+            teks = f"{format_waktu(ts, '%Y-%m-%d %H:%M')} {tanda}{jumlah:>14,}  {catatan}"
+            _tui_tulis(win, baris, 2, teks, attr)
+    win.noutrefresh()
+
+def _tui_tanya(stdscr, prompt):
+    """
+    Meminta input satu baris di baris status (blocking sampai Enter).
+    
+    Returns:
+        str: Teks yang diketik (sudah di-strip). Kosong berarti batal.
+    """
+    h, w = stdscr.getmaxyx()
+    stdscr.timeout(-1)
+    curses.echo()
+    try:
+        curses.curs_set(1)
+    except curses.error:
+        pass
+    try:
+        stdscr.move(h - 1, 0)
+        stdscr.clrtoeol()
+        _tui_tulis(stdscr, h - 1, 0, prompt, curses.A_BOLD)
+        teks = stdscr.getstr(h - 1, min(len(prompt), w - 2), 120).decode("utf-8", "replace")
+    finally:
+        curses.noecho()
+        try:
+            curses.curs_set(0)
+        except curses.error:
+            pass
+        stdscr.timeout(TUI_TICK_MS)
+    return teks.strip()
+
+def _tui_nominal(stdscr, prompt):
+    """
+    Meminta nominal di baris status.
+    
+    Returns:
+        tuple: (jumlah, pesan_error). jumlah None jika batal / tidak valid.
+    """
+    teks = _tui_tanya(stdscr, prompt)
+    if not any(ch.isdigit() for ch in teks):
+        return None, "Dibatalkan." if not teks else "Nominal harus berupa angka."
+    jumlah = parse_nominal_input(teks)
+    if jumlah <= 0:
+        return None, "Nominal harus lebih dari 0."
+    if jumlah > MAX_NOMINAL:
+        return None, f"Batas maksimum Rp {format_rupiah(MAX_NOMINAL)}"
+    return jumlah, ""
+
+def _tui_transaksi(stdscr, user, st, tipe):
+    """
+    Alur nabung / keluar untuk sumber terpilih.
+    
+    Returns:
+        tuple: (pesan, status) - status salah satu kunci TUI_WARNA_STATUS.
+               Pengeluaran yang tercatat tapi memicu peringatan anggaran
+               tetap berhasil, dengan status 'peringatan'.
+    """
+    nama = st["sumber"][st["pilih"]]
+    u = users[user]
+    if nama is not None and nama not in u["target_aktif"]:
+        return f"Target {nama} sudah selesai.", "gagal"
+
+    label = "nabung" if tipe == "nabung" else "pengeluaran"
+    jumlah, msg = _tui_nominal(stdscr, f"Jumlah {label} ({nama or 'Saldo Utama'}): Rp ")
+    if jumlah is None:
+        return msg, "gagal"
+    catatan = _tui_tanya(stdscr, "Catatan (opsional): ") or "-"
+    now = waktu_sekarang()
+
+    if tipe == "nabung":
+        pesan = f"Nabung Rp {format_rupiah(jumlah)} berhasil."
+        if catat_nabung(user, nama, jumlah, catatan, now):
+            pesan += f" Target {nama} tercapai!"
+        return pesan, "berhasil"
+
+    if nama is not None:
+        maks, bisa_pada = batas_penarikan(u["targets"][nama], now)
+        if bisa_pada > now:
+            sampai = format_waktu(bisa_pada, "%d %B %Y")
+            return f"Masih dalam masa jeda penarikan sampai {sampai}.", "gagal"
+        if maks <= 0:
+            return "Saldo tidak mencukupi untuk penarikan.", "gagal"
+        jumlah = min(jumlah, maks)
+        jawab = _tui_tanya(stdscr, f"Tarik Rp {format_rupiah(jumlah)}? (Y/n): ")
+        if jawab.lower() not in ("y", ""):
+            return "Dibatalkan.", "gagal"
+
+    sebelum = posisi_anggaran(user, now)
+    jumlah = catat_pengeluaran(user, nama, jumlah, catatan, now)
+    pesan = f"Pengeluaran Rp {format_rupiah(jumlah)} dicatat."
+    alert = peringatan_anggaran(user, sebelum, now)
+    if alert:
+        kunci, level, terpakai, batas = alert[0]
+        return f"{pesan} Anggaran {kunci}: {terpakai * 100 // batas}% terpakai!", "peringatan"
+    return pesan, "berhasil"
+
+def _tui_pesan_awal(user):
+    """
+    Pesan pembuka TUI: peringatan ledger dan hasil kompaksi saat login.
+    """
+    pesan = []
+    if periksa_ledger([user]):
+        pesan.append("Saldo tidak cocok dengan riwayat, "
+                     "cek lewat menu klasik → Cek Integritas Data.")
+    try:
+        n = kompaksi_riwayat(user, min_baris=KOMPAKSI_MIN_BARIS)
+    except (TimeoutError, KonflikVersi):
+        n = 0
+    if n:
+        pesan.append(f"{n:,} transaksi lama dipindah ke arsip biner.")
+    return " ".join(pesan)
+
+def _tui_loop(stdscr, user):
+    """
+    Event loop TUI: satu getch() per iterasi, tick berkala untuk update latar.
+    """
+    try:
+        curses.curs_set(0)
+    except curses.error:
+        pass
+    curses.start_color()
+    try:
+        curses.use_default_colors()
+        latar = -1
+    except curses.error:
+        latar = curses.COLOR_BLACK
+    warna_depan = (curses.COLOR_CYAN, curses.COLOR_GREEN, curses.COLOR_RED, curses.COLOR_YELLOW)
+    for i, fg in enumerate(warna_depan, 1):
+        curses.init_pair(i, fg, latar)
+    stdscr.keypad(True)
+    stdscr.timeout(TUI_TICK_MS)
+
+    st = {
+        "warna": {"judul": curses.color_pair(1), "nabung": curses.color_pair(2),
+                  "keluar": curses.color_pair(3), "info": curses.color_pair(4)},
+        "sumber": [None] + list(users[user]["targets"]),
+        "pilih": 0,
+        "fokus": "sumber",
+        "gulir": 0,
+        "pesan": _tui_pesan_awal(user),
+        "pesan_attr": 0,
+    }
+    st["pesan_attr"] = st["warna"]["info"] if st["pesan"] else 0
+    panes = _tui_layout(stdscr)
+    kotor = set(panes)
+    sub = langganan(user=user)
+
+    def ubah_data():
+        ambil_feed(sub, FEED_ANTRIAN)
+        st["sumber"] = [None] + list(users[user]["targets"])
+        st["pilih"] = min(st["pilih"], len(st["sumber"]) - 1)
+        kotor.update(("saldo", "sumber", "riwayat"))
+
+    try:
+        while True:
+            for pane in kotor:
+                _tui_gambar(pane, panes[pane], user, st)
+            kotor.clear()
+            curses.doupdate()
+
+            key = stdscr.getch()
+            if key == -1:
+                applied = jalankan_jadwal()
+                if applied or ambil_feed(sub, 1):
+                    ubah_data()
+                if applied:
+                    st["pesan"] = f"{applied} auto-nabung baru saja dijalankan."
+                    st["pesan_attr"] = st["warna"]["nabung"]
+                    kotor.add("status")
+                kotor.add("header")
+                continue
+
+            if st["pesan"]:
+                st["pesan"] = ""
+                kotor.add("status")
+
+            if key == curses.KEY_RESIZE:
+                stdscr.erase()
+                stdscr.noutrefresh()
+                panes = _tui_layout(stdscr)
+                kotor.update(panes)
+            elif key == ord("\t"):
+                st["fokus"] = "riwayat" if st["fokus"] == "sumber" else "sumber"
+                kotor.update(("sumber", "riwayat"))
+            elif key in (curses.KEY_UP, curses.KEY_DOWN):
+                arah = -1 if key == curses.KEY_UP else 1
+                if st["fokus"] == "sumber":
+                    baru = min(max(st["pilih"] + arah, 0), len(st["sumber"]) - 1)
+                    if baru != st["pilih"]:
+                        st["pilih"], st["gulir"] = baru, 0
+                        kotor.update(("sumber", "riwayat"))
+                else:
+                    st["gulir"] = max(st["gulir"] - arah, 0)
+                    kotor.add("riwayat")
+            elif key in (curses.KEY_PPAGE, curses.KEY_NPAGE):
+                langkah = panes["riwayat"].getmaxyx()[0] - 2
+                if key == curses.KEY_NPAGE:
+                    langkah = -langkah
+                st["gulir"] = max(st["gulir"] + langkah, 0)
+                kotor.add("riwayat")
+            elif key in (ord("n"), ord("k")):
+                jenis = "nabung" if key == ord("n") else "keluar"
+                st["pesan"], status = _tui_transaksi(stdscr, user, st, jenis)
+                st["pesan_attr"] = st["warna"][TUI_WARNA_STATUS[status]]
+                ubah_data()
+                kotor.add("status")
+            elif key == ord("q"):
+                if _tui_tanya(stdscr, "Yakin ingin logout? (Y/n): ").lower() in ("y", ""):
+                    return
+                kotor.add("status")
+            elif key == ord("?"):
+                st["pesan"], st["pesan_attr"] = TUI_BANTUAN, 0
+                kotor.add("status")
+    finally:
+        berhenti_langganan(sub)
+
+def tui_utama(user):
+    """
+    Menjalankan sesi user dalam TUI layar penuh. Jika curses tidak tersedia
+    (misal Windows tanpa paket windows-curses), kembali ke menu_utama.
+    
+    Args:
+        user (str): Username pengguna yang login (lowercase).
+    """
+    if curses is None:
+        print(yellow("⚠️ Modul curses tidak tersedia, memakai menu biasa."))
+        time.sleep(1)
+        menu_utama(user)
+        return
+    curses.wrapper(_tui_loop, user)
+
+# =========================================================
+#  BEBAN SINTETIS & REPLAY SESI
+# =========================================================
+
+def ringkas_latensi(judul, latensi, durasi):
+    """
+    Mencetak tabel throughput & latensi (p50/p95/maks) per operasi.
+    
+    Args:
+        judul (str): Judul laporan.
+        latensi (dict): {nama_operasi: [detik, ...]}.
+        durasi (float): Total waktu berjalan (detik) untuk throughput gabungan.
+    """
+    total = sum(len(v) for v in latensi.values())
+    print(bold(cyan(judul)))
+    print(f"{'Operasi':<28} | {'n':>9} | {'p50 (ms)':>9} | {'p95 (ms)':>9} | {'maks (ms)':>9}")
+    print("-" * 76)
+    for nama, xs in sorted(latensi.items(), key=lambda kv: -len(kv[1])):
+        xs = sorted(xs)
+        p50 = xs[len(xs) // 2] * 1000
+        p95 = xs[min(len(xs) - 1, len(xs) * 95 // 100)] * 1000
+        p_max = xs[-1] * 1000
+        print(f"{nama[:28]:<28} | {len(xs):>9,} | {p50:>9.3f} | {p95:>9.3f} | {p_max:>9.3f}")
+    print("-" * 76)
+    if durasi > 0:
+        print(f"Total {total:,} operasi dalam {durasi:.2f} s ({total / durasi:,.0f} operasi/s)")
+
+def generate_beban(n_user=100, m_target=3, hari=365, seed=42):
+    """
+    Membuat user sintetis beserta riwayat beberapa bulan ke belakang.
+    
+    Pola per user: gaji di awal bulan, 0-3 pengeluaran harian dari saldo
+    utama (catatan mengikuti kategori), setoran mingguan ke tiap target,
+    dan sesekali penarikan target yang selalu mengikuti kebijakan
+    penarikannya (bawaan 30% / 365 hari). Semua transaksi lewat fungsi
+    yang sama dengan menu, jadi indeks & agregat ikut diperbarui.
+    
+    Args:
+        n_user (int): Jumlah user yang dibuat.
+        m_target (int): Jumlah target per user.
+        hari (int): Panjang riwayat (hari sampai sekarang).
+        seed (int): Seed random agar hasil bisa diulang.
+        
+    Returns:
+        dict: {nama_operasi: [latensi_detik, ...]}.
+    """
+    import random
+
+    rnd = random.Random(seed)
+    catatan = [kw for kws in KATEGORI_KATA.values() for kw in kws[:4]] + ["-", "transfer teman"]
+    latensi = {}
+    clock = time.perf_counter
+
+    def ukur(nama, fn, *args):
+        t0 = clock()
+        hasil = fn(*args)
+        latensi.setdefault(nama, []).append(clock() - t0)
+        return hasil
+
+    now = waktu_sekarang()
+    mulai = _tengah_malam(*ke_datetime(now - hari * DETIK_PER_HARI).timetuple()[:3])
+    awal = len(users)
+    for i in range(awal, awal + n_user):
+        uname = f"beban_{i:05d}"
+        users[uname] = ukur("buat_user", buat_user, uname, "beban123")
+        gaji = rnd.randint(20, 80) * 100_000
+        targets = []
+        for j in range(m_target):
+            nama = f"Target {j + 1}"
+            ukur("tambah_target", tambah_target, uname, nama, rnd.randint(10, 500) * 100_000)
+            targets.append((nama, rnd.randrange(7), rnd.randint(5, 50) * 10_000))
+
+        for d in range(hari):
+            ts = mulai + d * DETIK_PER_HARI
+            tgl = ke_datetime(ts)
+            if tgl.day == 1 or d == 0:
+                ukur("nabung_utama", catat_nabung, uname, None, gaji, "gaji", ts + 8 * 3600)
+            for _ in range(rnd.choice((0, 1, 1, 2, 2, 3))):
+                jumlah = rnd.randint(1, 150) * 1_000
+                if jumlah <= users[uname]["saldo_utama"]:
+                    ukur("keluar_utama", catat_pengeluaran, uname, None, jumlah,
+                         rnd.choice(catatan), ts + rnd.randint(9, 22) * 3600)
+            for nama, hari_setor, nominal in targets:
+                if nama not in users[uname]["target_aktif"]:
+                    continue
+                if tgl.weekday() == hari_setor:
+                    ukur("nabung_target", catat_nabung, uname, nama, nominal,
+                         "setoran rutin", ts + 20 * 3600)
+                elif rnd.random() < 0.003:
+                    maks, bisa_pada = batas_penarikan(users[uname]["targets"][nama], ts)
+                    if bisa_pada <= ts and maks > 0:
+                        ukur("tarik_target", catat_pengeluaran, uname, nama,
+                             rnd.randint(1, maks), "butuh dana", ts + 12 * 3600)
+    return latensi
+
+def _strip_ansi(teks):
+    """
+    Menghapus escape code ANSI dari output terminal.
+    """
+    return re.sub(r"\x1b\[[0-9;?]*[A-Za-z]", "", teks)
+
+POLA_PROMPT_RAHASIA = re.compile(r"password|sandi|pin\b", re.IGNORECASE)
+
+def rekam_sesi(path):
+    """
+    Menjalankan aplikasi di pseudo-terminal dan merekam ketikan user.
+    
+    Setiap potong ketikan disimpan bersama ekor prompt (output terakhir
+    sebelum ketikan itu), sehingga replay bisa menunggu prompt yang sama.
+    Ketikan saat terminal dalam mode getpass (echo mati, mode baris) atau
+    setelah prompt password tidak pernah disimpan: langkahnya hanya ditandai
+    "rahasia" dan isinya diminta lagi saat replay. Mode raw input_nominal
+    juga mematikan echo, tapi ketikannya tetap disimpan apa adanya.
+    Hanya untuk sistem dengan modul pty (Linux/macOS).
+    
+    Args:
+        path (str): File JSON tujuan rekaman.
+        
+    Returns:
+        int: Jumlah langkah yang direkam.
+    """
+    import pty
+    import termios
+
+    langkah = []
+    output = []
+    master = []
+
+    def baca_output(fd):
+        if not master:
+            master.append(fd)
+        data = os.read(fd, 4096)
+        output.append(data)
+        return data
+
+    def mode_getpass():
+        # getpass mematikan ECHO tapi tetap mode baris (ICANON). Mode raw
+        # input_nominal mematikan keduanya dan bukan input rahasia.
+        try:
+            lflag = bool(master) and termios.tcgetattr(master[0])[3]
+        except termios.error:
+            return False
+        return bool(lflag) and not lflag & termios.ECHO and bool(lflag & termios.ICANON)
+
+    def baca_ketikan(fd):
+        data = os.read(fd, 1024)
+        ekor = _strip_ansi(b"".join(output).decode("utf-8", "replace"))[-24:]
+        output.clear()
+        if mode_getpass() or POLA_PROMPT_RAHASIA.search(ekor):
+            # Satu langkah per input rahasia; ketikan berikutnya (tanpa output
+            # di antaranya) bagian dari input yang sama dan tidak disimpan.
+            if ekor or not langkah or not langkah[-1].get("rahasia"):
+                langkah.append({"tunggu": ekor, "rahasia": True})
+        else:
+            langkah.append({"tunggu": ekor, "kirim": data.decode("utf-8", "replace")})
+        return data
+
+    pty.spawn([sys.executable, os.path.abspath(__file__)], baca_output, baca_ketikan)
+    with tulis_atomik(path) as tmp, open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"versi": 1, "langkah": langkah}, f, ensure_ascii=False, indent=1)
+    return len(langkah)
+
+def putar_sesi(path, ulang=1, timeout=5.0):
+    """
+    Memutar ulang rekaman sesi terhadap menu asli lewat pseudo-terminal.
+    
+    Untuk setiap langkah, replay menunggu ekor prompt yang direkam muncul
+    lalu mengirim ketikan. Langkah "rahasia" diisi dengan password yang
+    ditanyakan sekali di awal replay (tidak pernah dibaca dari file).
+    Latensi langkah = waktu dari ketikan dikirim
+    sampai prompt langkah berikutnya muncul, dikelompokkan per prompt.
+    
+    Args:
+        path (str): File rekaman dari rekam_sesi().
+        ulang (int): Berapa kali sesi diputar (proses baru setiap kali).
+        timeout (float): Batas menunggu prompt per langkah (detik).
+        
+    Returns:
+        tuple: (latensi {prompt: [detik, ...]}, jumlah_timeout, durasi_detik)
+    """
+    import pty
+    import select
+    import signal
+
+    with kunci_file(path), open(path, encoding="utf-8") as f:
+        langkah = json.load(f)["langkah"]
+    rahasia = ""
+    if any(step.get("rahasia") for step in langkah):
+        rahasia = getpass("Password untuk langkah rahasia di rekaman: ")
+
+    latensi = {}
+    n_timeout = 0
+    t_mulai = time.perf_counter()
+    for _ in range(ulang):
+        pid, fd = pty.fork()
+        if pid == 0:
+            os.execv(sys.executable, [sys.executable, os.path.abspath(__file__)])
+
+        buf = ""
+        sebelumnya = None
+        try:
+            for step in langkah:
+                batas = time.perf_counter() + timeout
+                while not _strip_ansi(buf).endswith(step["tunggu"]):
+                    sisa = batas - time.perf_counter()
+                    if sisa <= 0:
+                        n_timeout += 1
+                        break
+                    siap, _, _ = select.select([fd], [], [], sisa)
+                    if siap:
+                        try:
+                            buf += os.read(fd, 4096).decode("utf-8", "replace")
+                        except OSError:
+                            break
+                if sebelumnya is not None:
+                    label, t_kirim = sebelumnya
+                    latensi.setdefault(label, []).append(time.perf_counter() - t_kirim)
+                label = (step["tunggu"].strip().splitlines() or ["(awal)"])[-1]
+                sebelumnya = (label, time.perf_counter())
+                buf = ""
+                kirim = rahasia + "\r" if step.get("rahasia") else step["kirim"]
+                os.write(fd, kirim.encode("utf-8"))
+        finally:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+            os.waitpid(pid, 0)
+            os.close(fd)
+    return latensi, n_timeout, time.perf_counter() - t_mulai
+
 # =========================================================
 #  PATCH SMOOTH INPUT NOMINAL
 # =========================================================
@@ -1215,5 +6315,54 @@ input_nominal = patch_input_nominal(input_nominal, format_rupiah_input)
 # =========================================================
 
 if __name__ == "__main__":
-    main()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="ChillFinance - Nabung Gen Z")
+    parser.add_argument("--bench-ekspor", type=int, nargs="?", const=200_000, metavar="N",
+                        help="benchmark format ekspor dengan N baris sintetis")
+    parser.add_argument("--feed", metavar="ALAMAT",
+                        help="stream event transaksi ke Unix socket (path) atau port TCP lokal")
+    parser.add_argument("--generate", type=int, metavar="N",
+                        help="buat N user sintetis dan laporkan throughput per operasi")
+    parser.add_argument("--target", type=int, default=3, metavar="M",
+                        help="jumlah target per user sintetis (default 3)")
+    parser.add_argument("--hari", type=int, default=365, metavar="D",
+                        help="panjang riwayat user sintetis dalam hari (default 365)")
+    parser.add_argument("--rekam", metavar="FILE", help="rekam ketikan sesi ke FILE (pty)")
+    parser.add_argument("--putar", metavar="FILE", help="putar ulang rekaman sesi dari FILE (pty)")
+    parser.add_argument("--ulang", type=int, default=1, metavar="K",
+                        help="berapa kali rekaman diputar (default 1)")
+    parser.add_argument("--tui", action="store_true",
+                        help="pakai tampilan layar penuh (curses) setelah login")
+    parser.add_argument("--arsip", metavar="FILE",
+                        help="arsipkan seluruh database ke FILE (.gz/.bz2/.xz) "
+                             "saat program selesai")
+    args = parser.parse_args()
+
+    if args.bench_ekspor:
+        bench_ekspor(args.bench_ekspor)
+    elif args.generate:
+        t0 = time.perf_counter()
+        latensi = generate_beban(args.generate, args.target, args.hari)
+        ringkas_latensi(f"Beban sintetis: {args.generate} user x {args.target} target "
+                        f"x {args.hari} hari",
+                        latensi, time.perf_counter() - t0)
+        if args.arsip:
+            arsip_database(args.arsip)
+    elif args.rekam:
+        n = rekam_sesi(args.rekam)
+        print(f"{n} langkah direkam ke {args.rekam}")
+    elif args.putar:
+        latensi, n_timeout, durasi = putar_sesi(args.putar, args.ulang)
+        ringkas_latensi(f"Replay {args.putar} x {args.ulang}", latensi, durasi)
+        if n_timeout:
+            print(yellow(f"⚠️ {n_timeout} langkah tidak menemukan prompt yang direkam (timeout)."))
+    else:
+        if args.feed:
+            mulai_stream_feed(args.feed)
+        try:
+            main(tui=args.tui)
+        finally:
+            if args.arsip:
+                arsip_database(args.arsip)
 
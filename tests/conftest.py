@@ -0,0 +1,33 @@
+import importlib
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import chillfinance  # noqa: E402
+
+
+@pytest.fixture
+def cf(tmp_path, monkeypatch):
+    """Modul chillfinance dengan state global bersih, berjalan di tmp_path."""
+    monkeypatch.chdir(tmp_path)
+    for path in list(chillfinance._biner_cache):
+        chillfinance.tutup_riwayat_biner(path)
+    modul = importlib.reload(chillfinance)
+    yield modul
+    for path in list(modul._biner_cache):
+        modul.tutup_riwayat_biner(path)
+
+
+@pytest.fixture
+def user(cf):
+    """User 'budi' tanpa transaksi dan tanpa target."""
+    cf.users["budi"] = cf.buat_user("budi", "rahasia1")
+    return "budi"
+
+
+@pytest.fixture
+def now(cf):
+    return cf.waktu_sekarang()
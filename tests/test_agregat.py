@@ -0,0 +1,75 @@
+import builtins
+import random
+
+
+def papan_brute(cf, bulan):
+    nilai = {}
+    for uname, u in cf.users.items():
+        for t in [None] + list(u["targets"]):
+            for ts, tipe, jumlah, catatan in cf._iter_riwayat_record(u, t):
+                if tipe == "nabung" and cf.awal_bulan(ts) == bulan:
+                    nilai[uname] = nilai.get(uname, 0) + jumlah
+    return sorted(((u, n) for u, n in nilai.items()), key=lambda x: (-x[1], x[0]))
+
+
+def test_papan_sama_dengan_brute_force(cf, now, monkeypatch):
+    monkeypatch.setattr(cf, "PERINGKAT_BUCKET", 2)
+    rng = random.Random(5)
+    bulan = cf.awal_bulan(now)
+    for i in range(40):
+        cf.users[f"u{i}"] = cf.buat_user(f"u{i}", "rahasia1")
+    for _ in range(400):
+        uname = f"u{rng.randrange(40)}"
+        ts = bulan + rng.randrange(max(now - bulan, 1))
+        if rng.random() < 0.8:
+            cf.catat_nabung(uname, None, rng.choice([1_000, 5_000, 20_000]), "-", ts)
+        else:
+            cf.catat_pengeluaran(uname, None, 3_000, "-", ts)
+
+    brute = papan_brute(cf, bulan)
+    assert cf.top_penabung(len(brute) + 5) == brute
+    assert cf.top_penabung(3) == brute[:3]
+    for rank, (uname, n) in enumerate(brute, 1):
+        assert cf.peringkat_user(uname) == (rank, n, len(brute))
+    assert max(len(b) for b in cf._peringkat_bulan[bulan]["bucket"]) <= 4
+
+
+def test_agregat_langsung_terkini_dari_jurnal(cf, user, now):
+    cf.catat_nabung(user, None, 10_000, "-", now)
+    # Tanpa query apa pun sebelumnya, agregat sudah diperbarui oleh jurnal.
+    assert cf._agregat_user[user]["nabung"] == 10_000
+    assert cf._peringkat_bulan[cf.awal_bulan(now)]["nilai"] == {user: 10_000}
+    cf.catat_pengeluaran(user, None, 8_000, "-", now)
+    g = cf.agregat_global()
+    assert (g["nabung"], g["keluar"], g["n_user"]) == (10_000, 8_000, 1)
+    assert g["status"]["boros"] == 1
+
+
+def test_hapus_target_menghitung_ulang_user(cf, user, now):
+    cf.users["sari"] = cf.buat_user("sari", "rahasia1")
+    cf.catat_nabung("sari", None, 15_000, "-", now)
+    cf.tambah_target(user, "Motor", 10**9)
+    cf.catat_nabung(user, None, 5_000, "-", now)
+    cf.catat_nabung(user, "Motor", 20_000, "-", now)
+    assert cf.top_penabung() == [(user, 25_000), ("sari", 15_000)]
+    cf.hapus_target(user, "Motor")
+    assert cf.top_penabung() == [("sari", 15_000), (user, 5_000)]
+    assert cf.peringkat_user(user) == (2, 5_000, 2)
+
+
+def test_papan_kosong_dan_user_belum_menabung(cf, user):
+    assert cf.top_penabung() == []
+    assert cf.peringkat_user(user) == (None, 0, 0)
+    assert cf.agregat_global()["status"][None] == 1
+
+
+def test_layar_papan_tanpa_username_lain(cf, user, now, monkeypatch, capsys):
+    cf.users["sari"] = cf.buat_user("sari", "rahasia1")
+    cf.catat_nabung("sari", None, 15_000, "-", now)
+    cf.catat_nabung(user, None, 5_000, "-", now)
+    monkeypatch.setattr(builtins, "input", lambda prompt="": "")
+    cf.papan_peringkat(user)
+    out = capsys.readouterr().out
+    assert "sari" not in out
+    assert "Penabung anonim" in out and "15.000" in out
+    assert "Kamu" in out and "#2 dari 2" in out
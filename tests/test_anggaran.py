@@ -0,0 +1,54 @@
+import pytest
+
+
+@pytest.mark.parametrize("kunci,nominal,ok", [
+    ("total", 100, True), ("makan", 0, True), ("lainnya", 5, True),
+    ("jajan", 100, False), ("makan", -1, False),
+])
+def test_valid_anggaran(cf, kunci, nominal, ok):
+    assert cf.valid_anggaran(kunci, nominal)[0] is ok
+
+
+def test_atur_dan_hapus_anggaran(cf, user):
+    assert cf.atur_anggaran(user, "makan", 100_000) == (True, "")
+    assert cf.users[user]["anggaran"] == {"makan": 100_000}
+    assert cf.atur_anggaran(user, "makan", 0) == (True, "")
+    assert cf.users[user]["anggaran"] == {}
+    assert cf.atur_anggaran(user, "jajan", 10)[0] is False
+
+
+def test_peringatan_80_dan_100_persen(cf, user, now):
+    cf.catat_nabung(user, None, 10**6, "gaji", now - 10)
+    cf.atur_anggaran(user, "makan", 100_000)
+    cf.atur_anggaran(user, cf.ANGGARAN_TOTAL, 500_000)
+
+    def keluar(n, catatan):
+        sebelum = cf.posisi_anggaran(user, now)
+        cf.catat_pengeluaran(user, None, n, catatan, now)
+        return [(k, lv) for k, lv, _, _ in cf.peringatan_anggaran(user, sebelum, now)]
+
+    assert keluar(50_000, "kopi") == []
+    assert keluar(30_000, "nasi") == [("makan", 80)]
+    assert keluar(10_000, "roti") == []
+    assert keluar(20_000, "bakso") == [("makan", 100)]
+    # Sudah habis: setiap pengeluaran tambahan diperingatkan lagi.
+    assert keluar(1_000, "kopi") == [("makan", 100)]
+    assert keluar(1_000, "bensin") == []
+    assert cf.posisi_anggaran(user, now) == {"makan": (111_000, 100_000), "total": (112_000, 500_000)}
+
+
+def test_counter_hanya_bulan_berjalan(cf, user, now):
+    cf.catat_nabung(user, None, 10**6, "gaji", now - 90 * cf.DETIK_PER_HARI)
+    cf.atur_anggaran(user, "makan", 100_000)
+    bulan_lalu = cf.awal_bulan(now) - 1
+    cf.catat_pengeluaran(user, None, 70_000, "kopi", bulan_lalu)
+    assert cf.posisi_anggaran(user, now) == {"makan": (0, 100_000)}
+    cf.catat_pengeluaran(user, None, 5_000, "kopi", cf.awal_bulan(now))
+    assert cf.pengeluaran_bulan_ini(user, now) == {"bulan": cf.awal_bulan(now), "total": 5_000,
+                                                  "kategori": {"makan": 5_000}}
+    assert cf.posisi_anggaran(user, bulan_lalu) == {"makan": (70_000, 100_000)}
+
+
+def test_anggaran_user_kosong(cf, user, now):
+    assert cf.posisi_anggaran(user, now) == {}
+    assert cf.peringatan_anggaran(user, {}, now) == []
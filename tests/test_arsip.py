@@ -0,0 +1,125 @@
+import json
+
+import pytest
+
+
+def isi(cf, now):
+    for nama, n in (("budi", 3), ("sari", 0), ("kosong", None)):
+        cf.users[nama] = cf.buat_user(nama, "rahasia1")
+        if n is None:
+            continue
+        cf.tambah_target(nama, "Liburan", 1_000_000)
+        for i in range(n):
+            cf.catat_nabung(nama, None, 10_000 * (i + 1), f"setor {i} ✨", now - i * 3600)
+            cf.catat_nabung(nama, "Liburan", 5_000, "-", now - i * 3600)
+
+
+def baca_arsip(cf, path, codec="gzip"):
+    with cf.CODEC_ARSIP[codec][2](path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.mark.parametrize("codec", ["gzip", "bz2", "xz"])
+def test_arsip_round_trip(cf, now, codec):
+    isi(cf, now)
+    path = "semua.jsonl" + cf.CODEC_ARSIP[codec][0]
+    assert cf.arsip_backup(path, codec=codec, workers=1) == 3
+    assert cf.verifikasi_arsip(path, codec) == (3, [])
+
+    rec = baca_arsip(cf, path, codec)
+    trx = {}
+    for r in rec:
+        if r["jenis"] == "user":
+            key = r["key"]
+            trx[key] = []
+        elif r["jenis"] == "trx":
+            trx[key].append((r["ts"], r["tipe"], r["jumlah"], r["catatan"], r["sumber"]))
+    assert rec[-1] == {"jenis": "akhir", "n_user": 3}
+    for nama in cf.users:
+        assert trx[nama] == list(cf.iter_transaksi(nama))
+
+
+def test_arsip_satu_user_saja(cf, now):
+    isi(cf, now)
+    cf.arsip_backup("budi.jsonl.gz", ["budi"])
+    keys = [r["key"] for r in baca_arsip(cf, "budi.jsonl.gz") if r["jenis"] == "user"]
+    assert keys == ["budi"]
+    assert "password" not in json.dumps(baca_arsip(cf, "budi.jsonl.gz"))
+
+
+def test_arsip_terpotong_terdeteksi(cf, now):
+    isi(cf, now)
+    cf.arsip_backup("a.jsonl.gz", workers=1)
+    lines = [json.dumps(r) for r in baca_arsip(cf, "a.jsonl.gz")[:-1]]
+    with cf.gzip.open("potong.jsonl.gz", "wt", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    _, masalah = cf.verifikasi_arsip("potong.jsonl.gz")
+    assert any("akhir" in m for m in masalah)
+
+
+def test_arsip_transaksi_diubah_terdeteksi(cf, now):
+    isi(cf, now)
+    cf.arsip_backup("a.jsonl.gz", workers=1)
+    with cf.gzip.open("a.jsonl.gz", "rt", encoding="utf-8") as f:
+        teks = f.read()
+    with cf.gzip.open("ubah.jsonl.gz", "wt", encoding="utf-8") as f:
+        f.write(teks.replace('"jumlah":10000', '"jumlah":99999', 1))
+    _, masalah = cf.verifikasi_arsip("ubah.jsonl.gz")
+    assert any("checksum transaksi" in m for m in masalah)
+
+
+def tulis_gz(cf, path, baris):
+    with cf.gzip.open(path, "wt", encoding="utf-8") as f:
+        f.write("".join(b + "\n" for b in baris))
+
+
+def test_record_sebelum_header_user(cf):
+    tulis_gz(cf, "yatim.jsonl.gz", [
+        '{"jenis":"trx","ts":1,"tipe":"nabung","jumlah":5,"catatan":"x","sumber":"utama"}',
+        '{"jenis":"target","nama":"A","saldo":5}',
+        '{"jenis": "akhir", "n_user": 0}',
+    ])
+    n_user, masalah = cf.verifikasi_arsip("yatim.jsonl.gz")
+    assert n_user == 0
+    assert len(masalah) == 2 and all("sebelum header user" in m for m in masalah)
+
+
+def test_baris_json_terpotong(cf, now):
+    isi(cf, now)
+    cf.arsip_backup("a.jsonl.gz", ["budi"], workers=1)
+    with cf.gzip.open("a.jsonl.gz", "rt", encoding="utf-8") as f:
+        baris = f.read().splitlines()
+    baris[1] = baris[1][:15]
+    tulis_gz(cf, "b.jsonl.gz", baris)
+    _, masalah = cf.verifikasi_arsip("b.jsonl.gz")
+    assert "Baris 2: bukan record arsip yang valid." in masalah
+    assert any(m.startswith("budi: jumlah target") for m in masalah)
+
+
+@pytest.mark.parametrize("codec", ["gzip", "bz2", "xz"])
+def test_stream_terkompresi_terpotong(cf, now, codec):
+    isi(cf, now)
+    path = "a.jsonl" + cf.CODEC_ARSIP[codec][0]
+    cf.arsip_backup(path, codec=codec, workers=1)
+    with open(path, "rb") as f:
+        data = f.read()
+    with open(path, "wb") as f:
+        f.write(data[:len(data) // 2])
+    _, masalah = cf.verifikasi_arsip(path, codec)
+    assert any("Arsip rusak" in m for m in masalah)
+    assert any("Penanda akhir" in m for m in masalah)
+
+
+def test_bukan_file_arsip(cf):
+    with open("acak.jsonl.gz", "wb") as f:
+        f.write(b"bukan gzip sama sekali")
+    assert cf.verifikasi_arsip("acak.jsonl.gz")[1][0].startswith("Arsip rusak")
+
+
+def test_arsip_database_semua_user(cf, now, capsys):
+    isi(cf, now)
+    assert cf.codec_dari_path("db.jsonl.bz2") == "bz2"
+    assert cf.arsip_database("db.jsonl.bz2") == (3, [])
+    keys = [r["key"] for r in baca_arsip(cf, "db.jsonl.bz2", "bz2") if r["jenis"] == "user"]
+    assert keys == ["budi", "sari", "kosong"]
+    capsys.readouterr()
@@ -0,0 +1,54 @@
+def test_baris_target_dari_cache_sampai_saldo_berubah(cf, user, now):
+    cf.tambah_target(user, "Liburan", 1_000_000)
+    cf.catat_nabung(user, "Liburan", 250_000, "-", now)
+
+    teks = cf.baris_target(user, "Liburan")
+    assert teks.startswith("Liburan → Rp 250,000 / Rp 1.000.000,00  (25%) Aktif\n    [")
+    assert cf._strip_ansi(teks).endswith("[" + "#" * 5 + "-" * 15 + "]")
+    assert cf.baris_target(user, "Liburan") is teks
+
+    cf.catat_nabung(user, "Liburan", 250_000, "-", now)
+    assert (user, "Liburan") not in cf._baris_target_cache
+    assert "(50%)" in cf.baris_target(user, "Liburan")
+
+
+def test_baris_target_tanda_mencegah_teks_basi(cf, user):
+    cf.tambah_target(user, "HP", 200_000)
+    lama = cf.baris_target(user, "HP")
+    # Perubahan tanpa lewat invalidasi_progress tetap terdeteksi dari tanda.
+    cf.users[user]["targets"]["HP"]["target"] = 400_000
+    baru = cf.baris_target(user, "HP")
+    assert baru is not lama and "Rp 400.000,00" in baru
+
+
+def test_baris_target_status_selesai(cf, user, now):
+    cf.tambah_target(user, "HP", 100_000)
+    cf.catat_nabung(user, "HP", 100_000, "-", now)
+    assert "(100%) 🎉 Selesai" in cf.baris_target(user, "HP")
+
+
+def test_ganti_nama_membuang_baris_lama(cf, user):
+    cf.tambah_target(user, "A", 100_000)
+    cf.baris_target(user, "A")
+    cf.ganti_nama_target(user, "A", "B")
+    assert (user, "A") not in cf._baris_target_cache
+    assert cf.baris_target(user, "B").startswith("B → ")
+
+
+def test_render_daftar_target(cf, user):
+    assert cf.render_daftar_target(user) == "(Belum ada target)"
+    cf.tambah_target(user, "A", 100)
+    cf.tambah_target(user, "B", 100)
+    baris = [cf.baris_target(user, n) for n in ("A", "B")]
+    assert cf.render_daftar_target(user) == "\n".join(baris)
+    bernomor = cf.render_daftar_target(user, nomor=True).split("\n")
+    assert bernomor[0].startswith("1. A → ") and bernomor[2].startswith("2. B → ")
+
+
+def test_lihat_saldo_memakai_baris_yang_sama(cf, user, monkeypatch, capsys):
+    cf.tambah_target(user, "A", 100_000)
+    monkeypatch.setattr(cf, "clear", lambda: None)
+    monkeypatch.setattr("builtins.input", lambda prompt="": "")
+    cf.lihat_saldo(user)
+    assert cf.baris_target(user, "A") in capsys.readouterr().out
+    assert (user, "A") in cf._baris_target_cache
@@ -0,0 +1,79 @@
+from test_checkpoint import saldo_brute
+
+
+def test_saldo_minimum_sejak(cf, user, now):
+    hari = cf.DETIK_PER_HARI
+    cf.catat_nabung(user, None, 100_000, "-", now - 10 * hari)
+    cf.catat_pengeluaran(user, None, 80_000, "-", now - 5 * hari)
+    cf.catat_nabung(user, None, 50_000, "-", now - 1 * hari)
+    assert cf.saldo_minimum_sejak(user, None, now - 10 * hari) == 20_000
+    assert cf.saldo_minimum_sejak(user, None, now - 3 * hari) == 20_000
+    assert cf.saldo_minimum_sejak(user, None, now) == 70_000
+    assert cf.saldo_minimum_sejak(user, None, now - 20 * hari) == 0
+
+
+def test_batch_tolak_keluar_mundur_yang_membuat_saldo_negatif(cf, user, now):
+    hari = cf.DETIK_PER_HARI
+    cf.catat_nabung(user, None, 100_000, "-", now - 10 * hari)
+    cf.catat_pengeluaran(user, None, 80_000, "-", now - 5 * hari)
+    cf.catat_nabung(user, None, 50_000, "-", now - 1 * hari)
+    riwayat = list(cf.users[user]["riwayat"])
+
+    # Saldo sekarang 70.000, tapi di antara hari -5 dan -1 hanya 20.000.
+    errors, n = cf.catat_batch(user, "keluar", [
+        (now - 8 * hari, 10_000, "ok", None),
+        (now - 7 * hari, 30_000, "terlalu banyak", None),
+    ])
+    assert n == 0 and [no for no, _ in errors] == [2]
+    assert cf.users[user]["saldo_utama"] == 70_000
+    assert cf.users[user]["riwayat"] == riwayat
+
+    errors, n = cf.catat_batch(user, "keluar", [
+        (now - 8 * hari, 10_000, "a", None),
+        (now - 7 * hari, 10_000, "b", None),
+    ])
+    assert (errors, n) == ([], 2)
+    assert cf.users[user]["saldo_utama"] == 50_000
+    for d in range(12):
+        utama, _ = cf.saldo_pada(user, now - d * hari)
+        assert utama >= 0
+        assert cf.saldo_pada(user, now - d * hari) == saldo_brute(cf, user, now - d * hari)
+    assert cf.periksa_ledger() == {}
+
+
+def test_batch_nabung_ke_target_penuh_pindah_ke_utama(cf, user, now):
+    cf.tambah_target(user, "Motor", 30_000)
+    errors, n = cf.catat_batch(user, "nabung", [(now - 60, 50_000, "-", "Motor")])
+    assert errors == [] and n == 2
+    assert cf.users[user]["targets"]["Motor"]["saldo"] == 30_000
+    assert cf.users[user]["saldo_utama"] == 20_000
+    assert cf.users[user]["targets"]["Motor"]["status"] == "selesai"
+
+
+def test_batch_target_selesai_ditolak(cf, user, now):
+    cf.tambah_target(user, "Motor", 30_000)
+    cf.tambah_target(user, "Laptop", 10**9)
+    cf.catat_nabung(user, "Motor", 30_000, "-", now - 100)
+    cf.catat_nabung(user, "Laptop", 10_000, "-", now - 100)
+    assert cf.users[user]["targets"]["Motor"]["status"] == "selesai"
+    cf.atur_kebijakan(user, "Motor", 0, "persen", 100)
+
+    for tipe in ("keluar", "nabung"):
+        errors, n = cf.catat_batch(user, tipe, [
+            (now - 50, 1_000, "-", "Laptop"),
+            (now - 40, 1_000, "-", "Motor"),
+        ])
+        assert (errors, n) == ([(2, "Target 'Motor' sudah selesai.")], 0)
+    assert cf.users[user]["targets"]["Motor"]["saldo"] == 30_000
+    assert cf.users[user]["targets"]["Laptop"]["saldo"] == 10_000
+
+
+def test_batch_lewat_ubah_saldo_target(cf, user, now, monkeypatch):
+    cf.tambah_target(user, "Laptop", 10**9)
+    dipanggil = []
+    asli = cf.ubah_saldo_target
+    monkeypatch.setattr(cf, "ubah_saldo_target", lambda u, n, d: (dipanggil.append((n, d)), asli(u, n, d)))
+    assert cf.progress_target(user, "Laptop") == 0
+    assert cf.catat_batch(user, "nabung", [(now - 5, 10**8, "-", "Laptop")]) == ([], 1)
+    assert dipanggil == [("Laptop", 10**8)]
+    assert cf.progress_target(user, "Laptop") == 10
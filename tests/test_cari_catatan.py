@@ -0,0 +1,57 @@
+def isi(cf, user, now):
+    cf.tambah_target(user, "Liburan", 10**9)
+    cf.catat_nabung(user, None, 500_000, "gaji bulanan", now - 400)
+    cf.catat_pengeluaran(user, None, 20_000, "Kopi susu", now - 300)
+    cf.catat_pengeluaran(user, None, 35_000, "GoFood kopi + roti", now - 200)
+    cf.catat_pengeluaran(user, None, 15_000, "gojek ke kampus", now - 100)
+    cf.catat_nabung(user, "Liburan", 50_000, "kopi tabungan", now - 50)
+
+
+def test_token_catatan(cf):
+    assert cf.token_catatan("Kopi + GoJek kopi") == ["kopi", "gojek"]
+    assert cf.token_catatan("  ") == []
+
+
+def test_cari_prefix_dan_total_per_kata(cf, user, now):
+    isi(cf, user, now)
+    hasil, total = cf.cari_catatan(user, "kopi")
+    assert [h[2] for h in hasil] == [20_000, 35_000, 50_000]
+    assert total == {"kopi": (3, 50_000, 55_000)}
+
+    hasil, total = cf.cari_catatan(user, "go")
+    assert [h[3] for h in hasil] == ["GoFood kopi + roti", "gojek ke kampus"]
+
+    hasil, total = cf.cari_catatan(user, "kopi gof")
+    assert [h[3] for h in hasil] == ["GoFood kopi + roti"]
+    assert total["gof"] == (1, 0, 35_000)
+
+
+def test_cari_dengan_filter(cf, user, now):
+    isi(cf, user, now)
+    assert [h[2] for h in cf.cari_catatan(user, "kopi", tipe="keluar")[0]] == [20_000, 35_000]
+    assert [h[4] for h in cf.cari_catatan(user, "kopi", sumber="target:Liburan")[0]] == ["target:Liburan"]
+    assert [h[0] for h in cf.cari_catatan(user, "kopi", mulai=now - 300, akhir=now - 200)[0]] == [now - 300]
+
+
+def test_indeks_ikut_transaksi_baru_dan_mundur(cf, user, now):
+    isi(cf, user, now)
+    cf.cari_catatan(user, "kopi")
+    cf.catat_pengeluaran(user, None, 1_000, "kopi mundur", now - 1_000)
+    hasil, total = cf.cari_catatan(user, "kopi")
+    assert hasil[0][3] == "kopi mundur" and total["kopi"][0] == 4
+
+
+def test_indeks_ikut_hapus_dan_ganti_nama_target(cf, user, now):
+    isi(cf, user, now)
+    cf.cari_catatan(user, "tabungan")
+    cf.ganti_nama_target(user, "Liburan", "Bali")
+    assert cf.cari_catatan(user, "tabungan")[0][0][4] == "target:Bali"
+    cf.hapus_target(user, "Bali")
+    assert cf.cari_catatan(user, "tabungan") == ([], {"tabungan": (0, 0, 0)})
+
+
+def test_cari_user_kosong_dan_kueri_kosong(cf, user, now):
+    assert cf.cari_catatan(user, "kopi") == ([], {"kopi": (0, 0, 0)})
+    isi(cf, user, now)
+    assert cf.cari_catatan(user, "") == ([], {})
+    assert cf.cari_catatan(user, "teh") == ([], {"teh": (0, 0, 0)})
@@ -0,0 +1,47 @@
+import random
+
+
+def saldo_brute(cf, user, ts):
+    u = cf.users[user]
+    utama = sum(j if t == "nabung" else -j for w, t, j, _ in u["riwayat"] if w < ts)
+    hasil = {
+        nama: sum(j if t == "nabung" else -j for w, t, j, _ in tgt["riwayat"] if w < ts)
+        for nama, tgt in u["targets"].items()
+    }
+    return utama, hasil
+
+
+def titik_uji(now, hari):
+    return [now - d * 86400 for d in range(hari, -1, -7)] + [now + 1]
+
+
+def test_saldo_pada_dengan_transaksi_mundur(cf, user, now):
+    cf.tambah_target(user, "Motor", 10**12)
+    rng = random.Random(7)
+    for _ in range(300):
+        ts = now - rng.randrange(400 * cf.DETIK_PER_HARI)
+        cf.catat_nabung(user, rng.choice([None, "Motor"]), rng.randrange(1, 100_000), "-", ts)
+    # Pengeluaran bertanggal mundur sesudah checkpoint bulan-bulan berikutnya terbentuk.
+    cf.catat_pengeluaran(user, None, 1_000, "mundur", now - 200 * cf.DETIK_PER_HARI)
+
+    for ts in titik_uji(now, 420):
+        assert cf.saldo_pada(user, ts) == saldo_brute(cf, user, ts)
+    assert cf.periksa_ledger() == {}
+
+
+def test_bangun_ulang_checkpoint_sama_dengan_inkremental(cf, user, now):
+    cf.tambah_target(user, "Motor", 10**12)
+    rng = random.Random(3)
+    for _ in range(200):
+        ts = now - rng.randrange(300 * cf.DETIK_PER_HARI)
+        cf.catat_nabung(user, rng.choice([None, "Motor"]), rng.randrange(1, 50_000), "-", ts)
+    sebelum = [cf.saldo_pada(user, ts) for ts in titik_uji(now, 320)]
+    cf.bangun_ulang_checkpoint(user)
+    assert [cf.saldo_pada(user, ts) for ts in titik_uji(now, 320)] == sebelum
+
+
+def test_saldo_pada_user_tanpa_target(cf, user, now):
+    assert cf.saldo_pada(user, now) == (0, {})
+    cf.catat_nabung(user, None, 5_000, "-", now - 10)
+    assert cf.saldo_pada(user, now) == (5_000, {})
+    assert cf.saldo_pada(user, now - 20) == (0, {})
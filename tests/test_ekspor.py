@@ -0,0 +1,64 @@
+import pytest
+
+
+def isi_user(cf, user, now):
+    cf.tambah_target(user, "Liburan Bali", 5_000_000)
+    cf.catat_nabung(user, None, 1_000_000, "gaji ✨", now - 40 * cf.DETIK_PER_HARI)
+    cf.catat_pengeluaran(user, None, 25_000, "kopi | susu, \"gula\"", now - 39 * cf.DETIK_PER_HARI)
+    cf.catat_nabung(user, "Liburan Bali", 300_000, "-", now - 10 * cf.DETIK_PER_HARI)
+    cf.catat_nabung(user, None, 1, "", now)
+
+
+@pytest.mark.parametrize("fmt", ["csv", "jsonl", "kolom"])
+def test_ekspor_round_trip(cf, user, now, fmt):
+    isi_user(cf, user, now)
+    filename, n = cf.ekspor_user(user, fmt)
+    baca = cf.FORMAT_EKSPOR[fmt][3]
+    assert n == 4
+    assert list(baca(filename)) == list(cf.iter_transaksi(user))
+
+
+@pytest.mark.parametrize("fmt", ["csv", "jsonl", "kolom"])
+def test_ekspor_user_kosong(cf, user, fmt):
+    filename, n = cf.ekspor_user(user, fmt)
+    assert n == 0
+    assert list(cf.FORMAT_EKSPOR[fmt][3](filename)) == []
+
+
+@pytest.mark.parametrize("n", [0, 1, 127, 128, 16383, 16384, 2**35, 2**63 - 1])
+def test_varint_batas_byte(cf, n):
+    buf = bytearray()
+    cf._tulis_varint(buf, n)
+    assert cf._baca_varints(buf, 0, 1) == ([n], len(buf))
+
+
+@pytest.mark.parametrize("n", [0, 1, -1, 63, -64, 2**40, -(2**40)])
+def test_zigzag_round_trip(cf, n):
+    assert cf._unzigzag(cf._zigzag(n)) == n
+
+
+def test_kolom_beberapa_row_group(cf, monkeypatch):
+    monkeypatch.setattr(cf, "BARIS_PER_GROUP", 3)
+    rows = [(1_700_000_000 + i * 7 - (i % 2) * 5, "nabung" if i % 3 else "keluar", i * 1000,
+             f"catatan {i % 4}", "utama" if i % 2 else "target:X") for i in range(10)]
+    assert cf.tulis_kolom("x.cfk", rows) == 10
+    assert list(cf.baca_kolom("x.cfk")) == rows
+
+
+def test_kolom_tolak_file_asing(cf):
+    with open("asing.cfk", "wb") as f:
+        f.write(b"BUKAN")
+    with pytest.raises(ValueError):
+        list(cf.baca_kolom("asing.cfk"))
+    open("kosong.cfk", "wb").close()
+    with pytest.raises(ValueError):
+        list(cf.baca_kolom("kosong.cfk"))
+
+
+def test_kolom_dibaca_bertahap(cf, monkeypatch):
+    monkeypatch.setattr(cf, "BARIS_PER_GROUP", 2)
+    rows = [(1_700_000_000 + i, "nabung", i, "-", "utama") for i in range(6)]
+    cf.tulis_kolom("x.cfk", rows)
+    it = cf.baca_kolom("x.cfk")
+    assert [next(it) for _ in range(3)] == rows[:3]
+    it.close()
@@ -0,0 +1,108 @@
+import json
+import os
+import socket
+import stat
+from collections import deque
+
+import pytest
+
+
+@pytest.fixture
+def dua_user(cf):
+    for nama in ("budi", "sari"):
+        cf.users[nama] = cf.buat_user(nama, "rahasia1")
+    return "budi", "sari"
+
+
+def test_transaksi_diterbitkan_berurutan(cf, dua_user, now):
+    awal = cf._feed_seq
+    cf.catat_nabung("budi", None, 1_000, "kopi", now - 5)
+    cf.tambah_target("budi", "Motor", 10_000)
+    evs = cf.event_sejak(awal)
+    assert [(e["seq"], e["jenis"]) for e in evs] == [(awal + 1, "nabung"), (awal + 2, "target_baru")]
+    assert evs[0]["jumlah"] == 1_000 and evs[0]["sumber"] == "utama" and evs[0]["ts_transaksi"] == now - 5
+
+
+def test_langganan_per_user_dan_cursor(cf, dua_user, now):
+    sub = cf.langganan("budi")
+    cf.catat_nabung("sari", None, 1, "-", now)
+    cf.catat_nabung("budi", None, 2, "-", now)
+    evs = cf.ambil_feed(sub)
+    assert [(e["user"], e["jumlah"]) for e in evs] == [("budi", 2)]
+    assert cf.ambil_feed(sub) == []
+
+    cursor = cf.berhenti_langganan(sub)
+    assert cursor == evs[-1]["seq"]
+    cf.catat_nabung("budi", None, 3, "-", now)
+    cf.catat_nabung("budi", None, 4, "-", now)
+    lanjut = cf.langganan("budi", dari=cursor)
+    assert [e["jumlah"] for e in cf.ambil_feed(lanjut)] == [3, 4]
+
+
+def test_antrian_penuh_tidak_menahan_penerbit(cf, dua_user, now):
+    sub = cf.langganan("budi", maks_antrian=3)
+    for i in range(10):
+        cf.catat_nabung("budi", None, i + 1, "-", now)
+    assert cf._pelanggan[sub]["tertinggal"]
+    assert len(cf._pelanggan[sub]["antrian"]) == 3
+
+    diterima = []
+    while True:
+        evs = cf.ambil_feed(sub, maks=4)
+        if not evs:
+            break
+        diterima += [e["jumlah"] for e in evs]
+    assert diterima == list(range(1, 11))
+    assert not cf._pelanggan[sub]["tertinggal"]
+
+
+def test_cursor_terlalu_tua_dapat_gap(cf, dua_user, now, monkeypatch):
+    monkeypatch.setattr(cf, "_feed", deque(maxlen=3))
+    awal = cf._feed_seq
+    for i in range(6):
+        cf.catat_nabung("budi", None, i + 1, "-", now)
+    evs = cf.event_sejak(awal)
+    assert evs[0] == {"seq": awal + 3, "jenis": "gap", "dari": awal + 1, "sampai": awal + 3}
+    assert [e["jumlah"] for e in evs[1:]] == [4, 5, 6]
+
+
+def test_token_feed(cf, dua_user):
+    t = cf.token_feed("budi")
+    assert cf.token_feed("budi") == t
+    baru = cf.token_feed("budi", baru=True)
+    assert baru != t and t not in cf._token_feed
+    assert cf._token_feed[baru] == "budi"
+    assert cf.token_feed("sari") != baru
+
+
+def baca_baris(sock, n):
+    f = sock.makefile("rb")
+    return [json.loads(f.readline()) for _ in range(n)]
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="butuh Unix socket")
+def test_stream_socket_wajib_token_dan_hanya_event_pemilik(cf, dua_user, now, tmp_path):
+    path = str(tmp_path / "feed.sock")
+    server = cf.mulai_stream_feed(path)
+    try:
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+        awal = cf._feed_seq
+        cf.catat_nabung("sari", None, 1, "-", now)
+        cf.catat_nabung("budi", None, 2, "-", now)
+
+        with socket.socket(socket.AF_UNIX) as c:
+            c.settimeout(5)
+            c.connect(path)
+            c.sendall(b"salah\n")
+            assert baca_baris(c, 1) == [{"jenis": "error", "pesan": "token tidak valid"}]
+
+        with socket.socket(socket.AF_UNIX) as c:
+            c.settimeout(5)
+            c.connect(path)
+            c.sendall(f"{cf.token_feed('budi')} {awal}\n".encode())
+            cf.catat_nabung("sari", None, 3, "-", now)
+            cf.catat_nabung("budi", None, 4, "-", now)
+            evs = baca_baris(c, 2)
+        assert [(e["user"], e["jumlah"]) for e in evs] == [("budi", 2), ("budi", 4)]
+    finally:
+        server.close()
@@ -0,0 +1,41 @@
+import pytest
+
+
+@pytest.mark.parametrize("interval,anchor", [("harian", 0), ("mingguan", 3), ("bulanan", 31)])
+def test_jadwal_baru_tidak_langsung_jalan(cf, user, now, interval, anchor):
+    rule = cf.tambah_jadwal(user, None, 10_000, interval, anchor)
+    assert rule["next_run"] > now
+    assert cf.jalankan_jadwal(now) == 0
+    assert cf.users[user]["riwayat"] == []
+
+
+def test_jadwal_pertama_tepat_tengah_malam_dilewati(cf):
+    tengah_malam = cf._tengah_malam(2025, 3, 1)
+    assert cf.jadwal_pertama("harian", 0, tengah_malam) == cf._tengah_malam(2025, 3, 2)
+    assert cf.jadwal_pertama("bulanan", 1, tengah_malam) == cf._tengah_malam(2025, 4, 1)
+    assert cf.jadwal_pertama("bulanan", 31, tengah_malam - 1) == cf._tengah_malam(2025, 3, 31)
+
+
+def test_id_jadwal_tidak_dipakai_ulang(cf, user, now):
+    a = cf.tambah_jadwal(user, None, 1_000, "harian")
+    b = cf.tambah_jadwal(user, None, 2_000, "harian")
+    cf.hapus_jadwal(user, b["id"])
+    c = cf.tambah_jadwal(user, None, 3_000, "harian")
+    assert c["id"] not in (a["id"], b["id"])
+
+    # Entri heap jadwal b yang dihapus tidak boleh menjalankan jadwal c.
+    besok = a["next_run"]
+    assert cf.jalankan_jadwal(besok) == 2
+    assert sorted(j for _, _, j, _ in cf.users[user]["riwayat"]) == [1_000, 3_000]
+
+
+def test_jadwal_catch_up_dan_target_dihapus(cf, user):
+    cf.tambah_target(user, "Motor", 10**9)
+    rule = cf.tambah_jadwal(user, "Motor", 5_000, "harian")
+    mulai = rule["next_run"]
+    assert cf.jalankan_jadwal(mulai + 2 * cf.DETIK_PER_HARI) == 3
+    assert cf.users[user]["targets"]["Motor"]["saldo"] == 15_000
+
+    cf.hapus_target(user, "Motor")
+    assert cf.jalankan_jadwal(mulai + 10 * cf.DETIK_PER_HARI) == 0
+    assert rule["aktif"] is False
@@ -0,0 +1,42 @@
+import pytest
+
+
+@pytest.mark.parametrize("catatan,kat", [
+    ("Kopi susu", "makan"),
+    ("gojek ke kampus", "transport"),
+    ("Bayar LISTRIK bulan ini", "tagihan"),
+    ("gofood martabak", "makan"),
+    ("bensinnya habis", "transport"),     # awalan kata kunci >= 4 huruf
+    ("tolong", "lainnya"),                # "tol" terlalu pendek untuk awalan
+    ("", "lainnya"),
+])
+def test_kategori_catatan(cf, catatan, kat):
+    assert cf.kategori_catatan(catatan) == kat
+    assert cf._kategori_cache[catatan] == kat
+
+
+def test_total_kategori_hanya_pengeluaran(cf, user, now):
+    cf.tambah_target(user, "Motor", 10**9)
+    cf.catat_nabung(user, None, 500_000, "gaji", now - 500)
+    cf.catat_nabung(user, "Motor", 100_000, "kopi", now - 450)
+    cf.catat_pengeluaran(user, None, 20_000, "kopi", now - 400)
+    cf.catat_pengeluaran(user, None, 15_000, "ojol", now - 300)
+    cf.catat_pengeluaran(user, "Motor", 10_000, "servis bengkel", now - 200)
+    assert cf.total_kategori(user) == {"makan": 20_000, "transport": 25_000}
+
+    cf.catat_pengeluaran(user, None, 5_000, "entah", now - 100)
+    assert cf.total_kategori(user)["lainnya"] == 5_000
+    assert cf.total_kategori(user) == cf.kategorikan_ulang(user)
+
+
+def test_total_kategori_setelah_target_dihapus(cf, user, now):
+    cf.tambah_target(user, "Motor", 10**9)
+    cf.catat_nabung(user, "Motor", 100_000, "-", now - 450)
+    cf.catat_pengeluaran(user, "Motor", 10_000, "bensin", now - 200)
+    assert cf.total_kategori(user) == {"transport": 10_000}
+    cf.hapus_target(user, "Motor")
+    assert cf.total_kategori(user) == {}
+
+
+def test_total_kategori_user_kosong(cf, user):
+    assert cf.total_kategori(user) == {}
@@ -0,0 +1,48 @@
+import pytest
+
+
+def target(saldo, last_withdraw=None, **kb):
+    kebijakan = {"cooldown_hari": 365, "batas": "persen", "nilai": 30}
+    kebijakan.update(kb)
+    return {"saldo": saldo, "last_withdraw": last_withdraw, "kebijakan": kebijakan}
+
+
+@pytest.mark.parametrize("args,pesan", [
+    ((-1, "persen", 30), "Jeda penarikan tidak boleh negatif."),
+    ((0, "bebas", 30), "Jenis batas harus 'persen' atau 'tetap'."),
+    ((0, "persen", 0), "Persentase harus 1–100."),
+    ((0, "persen", 101), "Persentase harus 1–100."),
+    ((0, "tetap", 0), "Nominal batas harus lebih dari 0."),
+])
+def test_valid_kebijakan_tolak(cf, args, pesan):
+    assert cf.valid_kebijakan(*args) == (False, pesan)
+
+
+def test_batas_persen_integer_tepat_untuk_saldo_besar(cf, now):
+    saldo = 10**15 + 7
+    assert cf.batas_penarikan(target(saldo), now) == (saldo * 30 // 100, now)
+
+
+def test_batas_tetap_tidak_melebihi_saldo(cf, now):
+    assert cf.batas_penarikan(target(50_000, batas="tetap", nilai=80_000), now) == (50_000, now)
+    assert cf.batas_penarikan(target(500_000, batas="tetap", nilai=80_000), now) == (80_000, now)
+
+
+def test_jeda_penarikan(cf, now):
+    hari = cf.DETIK_PER_HARI
+    tdata = target(100_000, last_withdraw=now - 10 * hari, cooldown_hari=30)
+    assert cf.batas_penarikan(tdata, now) == (0, now + 20 * hari)
+    assert cf.batas_penarikan(tdata, now + 20 * hari) == (30_000, now + 20 * hari)
+    assert cf.batas_penarikan(target(100_000, last_withdraw=now, cooldown_hari=0), now)[0] == 30_000
+
+
+def test_catat_pengeluaran_target_mengikuti_kebijakan(cf, user, now):
+    cf.tambah_target(user, "Motor", 10**9)
+    assert cf.atur_kebijakan(user, "motor", 7, "persen", 50) == (True, "")
+    cf.catat_nabung(user, "Motor", 100_000, "-", now - 100)
+    assert cf.catat_pengeluaran(user, "Motor", 90_000, "-", now - 50) == 50_000
+    assert cf.catat_pengeluaran(user, "Motor", 10_000, "-", now) == 0
+    t = cf.users[user]["targets"]["Motor"]
+    assert t["saldo"] == 50_000 and t["last_withdraw"] == now - 50
+    assert cf.cek_penarikan_semua(user, now)["Motor"] == (0, now - 50 + 7 * cf.DETIK_PER_HARI)
+    assert cf.atur_kebijakan(user, "tidak ada", 0, "persen", 10) == (False, "Target tidak ditemukan.")
@@ -0,0 +1,47 @@
+from test_riwayat_biner import buat_riwayat
+
+
+def saldo_brute(cf, user, target_name, ts):
+    saldo = 0
+    for t, tipe, jumlah, _ in cf._iter_riwayat_record(cf.users[user], target_name):
+        if t < ts:
+            saldo += jumlah if tipe == "nabung" else -jumlah
+    return saldo
+
+
+def test_kompaksi_menjaga_total_dan_saldo_pada(cf, user, now):
+    buat_riwayat(cf, user, now)
+    totals = {t: cf.total_rentang(user, t) for t in (None, "Motor", "Laptop")}
+    titik = [now - h * cf.DETIK_PER_HARI for h in (790, 500, 366, 365, 200, 1)] + [now + 1]
+    saldo = [cf.saldo_pada(user, ts) for ts in titik]
+    n_memori = len(cf.users[user]["riwayat"])
+
+    n = cf.kompaksi_riwayat(user, umur_hari=365, now=now)
+
+    assert n > 0
+    assert 0 < len(cf.users[user]["riwayat"]) < n_memori
+    assert {t: cf.total_rentang(user, t) for t in totals} == totals
+    assert [cf.saldo_pada(user, ts) for ts in titik] == saldo
+    for ts in titik:
+        assert cf.saldo_pada(user, ts)[0] == saldo_brute(cf, user, None, ts)
+    # Rentang yang memotong batas bulan memakai ringkasan + record sisi tepi.
+    mulai, akhir = now - 700 * cf.DETIK_PER_HARI + 12345, now - 100 * cf.DETIK_PER_HARI
+    manual = [0, 0]
+    for ts, tipe, jumlah, _ in cf._iter_riwayat_record(cf.users[user], "Motor"):
+        if mulai <= ts < akhir:
+            manual[tipe == "keluar"] += jumlah
+    assert cf.total_rentang(user, "Motor", mulai, akhir) == tuple(manual)
+    assert cf.periksa_ledger() == {}
+
+
+def test_kompaksi_di_bawah_min_baris_tidak_jalan(cf, user, now):
+    buat_riwayat(cf, user, now, hari=400, tiap=30)
+    assert cf.kompaksi_riwayat(user, umur_hari=365, min_baris=10_000, now=now) == 0
+    assert cf.users[user]["riwayat_biner"] is None
+
+
+def test_kompaksi_user_tanpa_target_dan_tanpa_riwayat(cf, user, now):
+    assert cf.kompaksi_riwayat(user, now=now) == 0
+    cf.catat_nabung(user, None, 1000, "lama", now - 400 * cf.DETIK_PER_HARI)
+    assert cf.kompaksi_riwayat(user, now=now) == 1
+    assert cf.saldo_pada(user, now + 1) == (1000, {})
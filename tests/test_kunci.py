@@ -0,0 +1,73 @@
+import os
+
+import pytest
+
+
+def test_tulis_atomik_tanpa_file_lock_di_samping(cf):
+    with cf.tulis_atomik("data.txt") as tmp:
+        with open(tmp, "w") as f:
+            f.write("isi")
+    assert sorted(os.listdir(".")) == [cf.DIR_KUNCI, "data.txt"]
+    assert os.listdir(cf.DIR_KUNCI) == ["data.txt.lock"]
+
+
+def test_tulis_atomik_gagal_tidak_mengubah_file(cf):
+    with open("data.txt", "w") as f:
+        f.write("lama")
+    with pytest.raises(RuntimeError):
+        with cf.tulis_atomik("data.txt") as tmp:
+            with open(tmp, "w") as f:
+                f.write("setengah")
+            raise RuntimeError("gagal")
+    assert open("data.txt").read() == "lama"
+    assert sorted(os.listdir(".")) == [cf.DIR_KUNCI, "data.txt"]
+
+
+@pytest.mark.skipif(os.name == "nt", reason="msvcrt hanya punya lock eksklusif")
+def test_pembaca_bersamaan_penulis_menunggu(cf):
+    with cf.kunci_file("data.txt"), cf.kunci_file("data.txt"):
+        with pytest.raises(TimeoutError):
+            with cf.kunci_file("data.txt", eksklusif=True, timeout=0.1):
+                pass
+    with cf.kunci_file("data.txt", eksklusif=True):
+        with pytest.raises(TimeoutError):
+            with cf.kunci_file("data.txt", timeout=0.1):
+                pass
+
+
+def test_versi_file_berubah_setelah_ditulis(cf):
+    assert cf.versi_file("data.txt") == ()
+    versi = {}
+    with cf.tulis_atomik("data.txt", versi) as tmp:
+        with open(tmp, "w") as f:
+            f.write("a")
+    assert versi == {"data.txt": cf.versi_file("data.txt")}
+    with cf.tulis_atomik("data.txt", versi) as tmp:
+        with open(tmp, "w") as f:
+            f.write("bb")
+    assert versi["data.txt"] == cf.versi_file("data.txt")
+
+
+def test_riwayat_biner_tidak_menimpa_tulisan_sesi_lain(cf, user, now):
+    cf.catat_nabung(user, None, 1_000, "a", now - 100)
+    path, _ = cf.arsipkan_riwayat(user)
+    cf.catat_nabung(user, None, 2_000, "b", now - 50)
+    cf.arsipkan_riwayat(user)
+
+    # Sesi lain mengganti file yang sama.
+    cf.tutup_riwayat_biner(path)
+    cf.tulis_riwayat_biner(path, [("utama", [[now, "nabung", 9, "sesi lain"]])])
+    cf.catat_nabung(user, None, 3_000, "c", now - 10)
+    with pytest.raises(cf.KonflikVersi):
+        cf.arsipkan_riwayat(user)
+    h = cf.buka_riwayat_biner(path)
+    assert cf.baris_biner(h, 0) == [now, "nabung", 9, "sesi lain"]
+    assert cf.users[user]["riwayat"] == [[now - 10, "nabung", 3_000, "c"]]
+
+
+def test_file_riwayat_lama_tidak_ditimpa_user_baru(cf, user, now):
+    cf.tulis_riwayat_biner("budi_riwayat.cft", [("utama", [])])
+    cf.catat_nabung(user, None, 1_000, "a", now)
+    with pytest.raises(cf.KonflikVersi):
+        cf.arsipkan_riwayat(user)
+    assert cf.arsipkan_riwayat(user, "budi_lain.cft") == ("budi_lain.cft", 1)
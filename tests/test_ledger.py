@@ -0,0 +1,58 @@
+def isi(cf, user, now):
+    cf.tambah_target(user, "Motor", 10**9)
+    cf.catat_nabung(user, None, 100_000, "gaji", now - 3600)
+    cf.catat_nabung(user, "Motor", 40_000, "setor", now - 3000)
+    cf.catat_pengeluaran(user, None, 25_000, "kopi", now - 2000)
+
+
+def test_ledger_konsisten(cf, user, now):
+    isi(cf, user, now)
+    assert cf.periksa_ledger() == {}
+    assert cf.periksa_ledger([user], workers=None) == {}
+
+
+def test_selisih_terdeteksi_dan_diperbaiki(cf, user, now):
+    isi(cf, user, now)
+    cf.users[user]["saldo_utama"] -= 7_000
+    cf.users[user]["targets"]["Motor"]["saldo"] += 1_000
+    assert cf.periksa_ledger() == {user: [(None, 68_000, 75_000), ("Motor", 41_000, 40_000)]}
+
+    assert cf.perbaiki_ledger(user, cf.periksa_ledger()[user], now - 10) == 2
+    assert cf.periksa_ledger() == {}
+    assert cf.users[user]["riwayat"][-1] == [now - 10, "keluar", 7_000, cf.CATATAN_KOREKSI]
+    assert cf.saldo_pada(user, now) == (68_000, {"Motor": 41_000})
+    assert cf.saldo_pada(user, now - 10) == (75_000, {"Motor": 40_000})
+
+
+def ringkasan_turunan(cf, user, now):
+    cf.siapkan_agregat()
+    return (dict(cf.total_kategori(user)),
+            cf.pengeluaran_bulan_ini(user, now)["total"],
+            dict(cf._agregat_user[user], bulan=dict(cf._agregat_user[user]["bulan"])),
+            cf.agregat_global()["keluar"],
+            cf.cari_catatan(user, "koreksi")[0])
+
+
+def test_koreksi_bukan_pengeluaran_atau_tabungan(cf, user, now):
+    isi(cf, user, now)
+    sebelum = ringkasan_turunan(cf, user, now)
+    assert sebelum[4] == []
+
+    cf.users[user]["saldo_utama"] -= 7_000
+    cf.users[user]["targets"]["Motor"]["saldo"] += 1_000
+    cf.perbaiki_ledger(user, cf.periksa_ledger()[user], now)
+
+    # Lewat pendengar jurnal (cache sudah ada) ...
+    assert ringkasan_turunan(cf, user, now) == sebelum
+    # ... maupun saat dihitung ulang dari riwayat.
+    for invalidasi in (cf.invalidasi_kategori, cf.invalidasi_anggaran,
+                       cf.invalidasi_agregat, cf.invalidasi_indeks_catatan):
+        invalidasi(user)
+    assert ringkasan_turunan(cf, user, now) == sebelum
+
+
+def test_koreksi_user_tanpa_target(cf, user, now):
+    cf.users[user]["saldo_utama"] = 5_000
+    assert cf.periksa_ledger() == {user: [(None, 5_000, 0)]}
+    assert cf.perbaiki_ledger(user, cf.periksa_ledger()[user], now) == 1
+    assert cf.saldo_pada(user, now + 1) == (5_000, {})
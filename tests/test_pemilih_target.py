@@ -0,0 +1,84 @@
+import builtins
+
+NAMA = ["Motor Baru", "Laptop Kerja", "Liburan Bali", "Dana Darurat", "Kamera", "Tabungan Motor"]
+
+
+def isi_target(cf, user, nama=NAMA):
+    for n in nama:
+        assert cf.tambah_target(user, n, 1_000_000) == (True, "")
+
+
+def test_cocok_utuh_urut_dari_nama_terpendek(cf, user):
+    isi_target(cf, user)
+    teratas, cocok = cf.saring_target(user, "motor")
+    assert teratas == ["Motor Baru", "Tabungan Motor"]
+    assert cocok == {"Motor Baru", "Tabungan Motor"}
+
+
+def test_salah_ketik_pakai_fuzzy(cf, user):
+    isi_target(cf, user)
+    teratas, _ = cf.saring_target(user, "liburann bali")
+    assert teratas[0] == "Liburan Bali"
+    assert cf.saring_target(user, "zzzzqq") == ([], set())
+
+
+def test_kueri_pendek_hanya_awal_kata(cf, user):
+    isi_target(cf, user)
+    assert cf.saring_target(user, "m")[1] == {"Motor Baru"}
+    # "mo" di awal kata "Motor", tapi tidak di tengah kata.
+    assert cf.saring_target(user, "mo")[1] == {"Motor Baru", "Tabungan Motor"}
+    assert cf.saring_target(user, "ot")[1] == set()
+    assert cf.saring_target(user, "oto")[1] == {"Motor Baru", "Tabungan Motor"}
+
+
+def test_filter_hanya_dan_batas(cf, user):
+    isi_target(cf, user)
+    assert cf.saring_target(user, "motor", hanya={"Tabungan Motor"})[0] == ["Tabungan Motor"]
+    teratas, cocok = cf.saring_target(user, "", batas=2)
+    assert len(teratas) == 2 and cocok == set(NAMA)
+
+
+def test_indeks_ikut_ganti_nama_dan_hapus(cf, user):
+    isi_target(cf, user)
+    assert cf.ganti_nama_target(user, "Kamera", "Drone")[0]
+    assert cf.saring_target(user, "kamera")[1] == set()
+    assert cf.saring_target(user, "drone")[0] == ["Drone"]
+    cf.hapus_target(user, "Drone")
+    assert cf.saring_target(user, "drone")[1] == set()
+    cf.tambah_target(user, "Drone", 500_000)
+    assert cf.saring_target(user, "dro")[0] == ["Drone"]
+
+
+def test_user_tanpa_target(cf, user):
+    assert cf.saring_target(user, "") == ([], set())
+    assert cf.saring_target(user, "a") == ([], set())
+    assert cf.saring_target(user, "motor") == ([], set())
+
+
+def masukan(monkeypatch, *baris):
+    it = iter(baris)
+    monkeypatch.setattr(builtins, "input", lambda prompt="": next(it))
+
+
+def test_pilih_target_nomor_dan_batal(cf, user, monkeypatch, capsys):
+    isi_target(cf, user)
+    masukan(monkeypatch, "motor", "2")
+    assert cf.pilih_target(user) == "Tabungan Motor"
+    masukan(monkeypatch, "")
+    assert cf.pilih_target(user) is None
+    capsys.readouterr()
+
+
+def test_pilih_target_kueri_pendek_lalu_panjang_tidak_menyempit(cf, user, monkeypatch, capsys):
+    isi_target(cf, user, ["Abcd", "Xabc Satu"])
+    # "ab" hanya cocok awal kata ("Abcd"); "abc" harus menemukan "Xabc Satu" juga.
+    masukan(monkeypatch, "ab", "abc", "2")
+    assert cf.pilih_target(user) == "Xabc Satu"
+    capsys.readouterr()
+
+
+def test_pilih_target_kueri_lanjutan_menyaring_hasil(cf, user, monkeypatch, capsys):
+    isi_target(cf, user)
+    masukan(monkeypatch, "mot", "motor b", "1")
+    assert cf.pilih_target(user) == "Motor Baru"
+    capsys.readouterr()
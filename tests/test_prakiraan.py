@@ -0,0 +1,67 @@
+def siapkan(cf, user, now, target=1_000_000, hari=30):
+    """Target 'Motor' dengan setoran 20-80rb tiap 1-5 hari selama 'hari' hari."""
+    cf.tambah_target(user, "Motor", target)
+    h = hari
+    for i in range(hari):
+        cf.catat_nabung(user, "Motor", 20_000 + i % 4 * 20_000, "setor", now - h * cf.DETIK_PER_HARI)
+        h -= 1 + i % 5
+        if h <= 0:
+            break
+    return now + 40 * cf.DETIK_PER_HARI
+
+
+def test_prakiraan_seed_sama_hasil_sama_berapa_pun_worker(cf, user, now, monkeypatch):
+    # Jam dibekukan: lintasan yang tepat jatuh di deadline bergantung detik.
+    monkeypatch.setattr(cf, "waktu_sekarang", lambda: now)
+    deadline = siapkan(cf, user, now)
+    n = cf.PRAKIRAAN_MIN_PARALEL
+    satu = cf.prakiraan_target(user, "Motor", deadline, n=n, workers=1, seed=7)
+    cf._prakiraan_cache.clear()
+    banyak = cf.prakiraan_target(user, "Motor", deadline, n=n, workers=2, seed=7)
+    try:
+        assert banyak == satu
+        assert 0.0 < satu["peluang"] < 1.0
+        # Pool dipakai ulang oleh panggilan berikutnya, tidak dibuat baru.
+        pool = cf._pool_prakiraan
+        assert pool is not None and pool[0] == 2
+        cf._prakiraan_cache.clear()
+        cf.prakiraan_target(user, "Motor", deadline, n=n, workers=2, seed=8)
+        assert cf._pool_prakiraan is pool
+    finally:
+        if cf._pool_prakiraan is not None:
+            cf._pool_prakiraan[1].shutdown()
+
+
+def test_prakiraan_kecil_tanpa_pool(cf, user, now):
+    deadline = siapkan(cf, user, now)
+    cf.prakiraan_target(user, "Motor", deadline, n=500, workers=4, seed=1)
+    assert cf._pool_prakiraan is None
+
+
+def test_prakiraan_cache_dan_invalidasi(cf, user, now, monkeypatch):
+    deadline = siapkan(cf, user, now)
+    hasil = cf.prakiraan_target(user, "Motor", deadline, n=300, workers=1)
+    # Seed acak, tapi hasil di-cache selama riwayat & sisa hari sama.
+    assert cf.prakiraan_target(user, "Motor", deadline, n=300, workers=1) is hasil
+
+    cf.catat_nabung(user, "Motor", 50_000, "setor", now)
+    baru = cf.prakiraan_target(user, "Motor", deadline, n=300, workers=1)
+    assert baru is not hasil and baru["setoran"] == hasil["setoran"] + 1
+
+    monkeypatch.setattr(cf, "waktu_sekarang", lambda: now + cf.DETIK_PER_HARI)
+    assert cf.prakiraan_target(user, "Motor", deadline, n=300, workers=1) is not baru
+
+
+def test_prakiraan_kasus_tepi(cf, user, now):
+    cf.tambah_target(user, "Baru", 100_000)
+    cf.catat_nabung(user, "Baru", 10_000, "-", now - 10)
+    cf.catat_nabung(user, "Baru", 10_000, "-", now - 5)
+    assert cf.prakiraan_target(user, "Baru", now + 10**6, n=100) is None
+
+    cf.tambah_target(user, "Lunas", 10_000)
+    cf.catat_nabung(user, "Lunas", 10_000, "-", now - 5)
+    assert cf.prakiraan_target(user, "Lunas", now + 10**6, n=100)["peluang"] == 1.0
+
+    siapkan(cf, user, now)
+    lewat = now - cf.DETIK_PER_HARI
+    assert cf.prakiraan_target(user, "Motor", lewat, n=100, workers=1)["peluang"] == 0
@@ -0,0 +1,83 @@
+import json
+import os
+import select
+import signal
+import sys
+import time
+
+import pytest
+
+if os.name == "nt":
+    pytest.skip("butuh pty (Linux/macOS)", allow_module_level=True)
+
+import pty  # noqa: E402
+
+PASSWORD = "kopisusu"
+
+# (ekor prompt yang ditunggu, ketikan). Nominal diketik per digit seperti
+# user sungguhan; input_nominal membacanya dalam mode raw.
+SESI = [
+    ("Pilih menu: ", "2\r"),
+    ("Masukkan Username: ", "budi\r"),
+    ("Masukkan Password: ", PASSWORD + "\r"),
+    ("Konfirmasi Password: ", PASSWORD + "\r"),
+    ("Tekan Enter untuk login...", "\r"),
+    ("Username: ", "budi\r"),
+    ("Password: ", PASSWORD + "\r"),
+    ("Pilih menu: ", "2\r"),
+    ("Pilih (1/2): ", "1\r"),
+    ("Masukkan jumlah uang: Rp ", "5"),
+    ("5,00", "0"),
+    ("50,00", "0"),
+    ("500,00", "0"),
+    ("5.000,00", "0"),
+    ("50.000,00", "\r"),
+    ("Catatan (opsional): ", "gaji\r"),
+    ("Enter...", "\r"),
+    ("Pilih menu: ", "9\r"),
+    ("(Y/n): ", "y\r"),
+    ("Pilih menu: ", "3\r"),
+    ("(Y/n): ", "y\r"),
+]
+
+
+def tunggu(fd, teks, cf, timeout=10.0):
+    buf = ""
+    batas = time.monotonic() + timeout
+    while not cf._strip_ansi(buf).rstrip("\r\n").endswith(teks):
+        sisa = batas - time.monotonic()
+        assert sisa > 0, f"prompt {teks!r} tidak muncul; output terakhir: {buf[-200:]!r}"
+        if select.select([fd], [], [], sisa)[0]:
+            buf += os.read(fd, 4096).decode("utf-8", "replace")
+
+
+def test_rekam_dan_putar_sesi_nabung(cf, tmp_path, monkeypatch):
+    rekaman = str(tmp_path / "sesi.json")
+    pid, fd = pty.fork()
+    if pid == 0:
+        os.execv(sys.executable, [sys.executable, cf.__file__, "--rekam", rekaman])
+    try:
+        for prompt, ketikan in SESI:
+            tunggu(fd, prompt, cf)
+            os.write(fd, ketikan.encode())
+        tunggu(fd, "langkah direkam ke " + rekaman, cf)
+    except BaseException:
+        os.kill(pid, signal.SIGKILL)
+        raise
+    finally:
+        _, status = os.waitpid(pid, 0)
+        os.close(fd)
+    assert status == 0
+
+    with open(rekaman, encoding="utf-8") as f:
+        langkah = json.load(f)["langkah"]
+    # Hanya tiga input getpass yang rahasia; password tidak pernah tersimpan.
+    assert sum(1 for s in langkah if s.get("rahasia")) == 3
+    assert PASSWORD not in json.dumps(langkah)
+    dikirim = "".join(s.get("kirim", "") for s in langkah)
+    assert "50000\r" in dikirim and "gaji\r" in dikirim
+
+    monkeypatch.setattr(cf, "getpass", lambda prompt="": PASSWORD)
+    latensi, n_timeout, _ = cf.putar_sesi(rekaman, timeout=2)
+    assert n_timeout == 0
+    assert latensi
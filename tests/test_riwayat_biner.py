@@ -0,0 +1,62 @@
+import pytest
+
+
+def buat_riwayat(cf, user, now, hari=800, tiap=3):
+    """Nabung tiap 'tiap' hari, sesekali keluar, ke saldo utama & 2 target."""
+    cf.tambah_target(user, "Motor", 10**12)
+    cf.tambah_target(user, "Laptop", 10**12)
+    for i, h in enumerate(range(hari, 0, -tiap)):
+        ts = now - h * cf.DETIK_PER_HARI
+        cf.catat_nabung(user, None, 50_000 + i, f"gaji {i % 5}", ts)
+        cf.catat_nabung(user, "Motor" if i % 2 else "Laptop", 20_000, "setor", ts + 60)
+        if i % 4 == 0:
+            cf.catat_pengeluaran(user, None, 30_000, "makan", ts + 120)
+
+
+def test_tulis_baca_biner_round_trip(cf):
+    segmen = [
+        ("utama", [[100, "nabung", 5, "gaji"], [200, "keluar", 3, "kopi ☕"], [300, "nabung", 2**40, "gaji"]]),
+        ("target:Kosong", []),
+        ("target:X", [[150, "keluar", 1, ""]]),
+    ]
+    ringkasan = {}
+    assert cf.tulis_riwayat_biner("r.cft", segmen, ringkasan) == 4
+
+    h = cf.buka_riwayat_biner("r.cft")
+    assert h["n"] == 4
+    assert h["segmen"]["utama"] == (0, 3, 5 + 2**40, 3)
+    assert h["segmen"]["target:Kosong"] == (3, 0, 0, 0)
+    assert [cf.baris_biner(h, i) for i in range(4)] == segmen[0][1] + segmen[2][1]
+    assert cf.cari_ts_biner(h, 0, 3, 200) == 1
+    assert cf.cari_ts_biner(h, 0, 3, 301) == 3
+    assert cf.total_biner(h, 0, 2) == (5, 3)
+    assert ringkasan["target:Kosong"] == []
+
+
+def test_biner_tolak_file_asing(cf):
+    with open("asing.cft", "wb") as f:
+        f.write(bytes(64))
+    with pytest.raises(ValueError):
+        cf.buka_riwayat_biner("asing.cft")
+
+
+def test_arsipkan_riwayat_tidak_mengubah_isi(cf, user, now):
+    buat_riwayat(cf, user, now, hari=120)
+    sebelum = list(cf.iter_transaksi(user))
+    jumlah = {t: cf.hitung_riwayat(user, t) for t in (None, "Motor", "Laptop")}
+
+    path, n = cf.arsipkan_riwayat(user)
+
+    assert n == len(sebelum)
+    assert cf.users[user]["riwayat"] == []
+    assert list(cf.iter_transaksi(user)) == sebelum
+    assert {t: cf.hitung_riwayat(user, t) for t in jumlah} == jumlah
+    assert cf.ambil_riwayat(user, None, 2, 5) == [list(r[:4]) for r in sebelum if r[4] == "utama"][2:5]
+    assert cf.periksa_ledger() == {}
+
+
+def test_arsipkan_user_kosong(cf, user):
+    path, n = cf.arsipkan_riwayat(user)
+    assert n == 0
+    assert list(cf.iter_transaksi(user)) == []
+    assert cf.total_rentang(user, None) == (0, 0)
@@ -0,0 +1,40 @@
+def test_indeks_nama_case_insensitive(cf, user):
+    assert cf.tambah_target(user, "Liburan", 1_000_000) == (True, "")
+    assert cf.tambah_target(user, "  liburan ", 5) == (False, "Target dengan nama tersebut sudah ada.")
+    assert cf.cari_target(user, "LIBURAN") == "Liburan"
+    assert cf.ganti_nama_target(user, "liburan", "liburan") == (True, "")
+    assert cf.cari_target(user, "Liburan") == "liburan"
+    assert cf.hapus_target(user, "LIBURAN")["target"] == 1_000_000
+    assert cf.cari_target(user, "liburan") is None
+
+
+def test_ganti_nama_menjaga_urutan(cf, user):
+    for n in ("A", "B", "C"):
+        cf.tambah_target(user, n, 100)
+    cf.ganti_nama_target(user, "B", "Bb")
+    assert list(cf.users[user]["targets"]) == ["A", "Bb", "C"]
+
+
+def test_gabung_target_menjumlah_saldo_dan_riwayat(cf, user, now):
+    cf.tambah_target(user, "A", 1_000_000)
+    cf.tambah_target(user, "B", 1_000_000)
+    cf.catat_nabung(user, "A", 30_000, "-", now - 20)
+    cf.catat_nabung(user, "B", 20_000, "-", now - 30)
+    assert cf.gabung_target(user, "a", "b") == (True, "")
+    b = cf.users[user]["targets"]["B"]
+    assert b["saldo"] == 50_000
+    assert [r[0] for r in b["riwayat"]] == [now - 30, now - 20]
+    assert cf.cari_target(user, "A") is None
+    assert cf.gabung_target(user, "B", "b") == (False, "Target asal dan tujuan tidak boleh sama.")
+    assert cf.periksa_ledger() == {}
+
+
+def test_gabung_target_jadwal_tetap_aktif(cf, user):
+    cf.tambah_target(user, "A", 10**9)
+    cf.tambah_target(user, "B", 10**9)
+    rule = cf.tambah_jadwal(user, "A", 5_000, "harian")
+    cf.gabung_target(user, "A", "B")
+    assert [(r["id"], r["target"], r["aktif"]) for r in cf.users[user]["jadwal"].values()] == \
+        [(rule["id"], "B", True)]
+    assert cf.jalankan_jadwal(rule["next_run"]) == 1
+    assert cf.users[user]["targets"]["B"]["saldo"] == 5_000
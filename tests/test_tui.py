@@ -0,0 +1,94 @@
+import pytest
+
+curses = pytest.importorskip("curses")
+
+
+class LayarPalsu:
+    """Pengganti window curses: menyimpan teks per baris."""
+
+    def __init__(self, h=8, w=60):
+        self.h, self.w = h, w
+        self.baris = {}
+
+    def getmaxyx(self):
+        return self.h, self.w
+
+    def erase(self):
+        self.baris.clear()
+
+    def box(self):
+        pass
+
+    def noutrefresh(self):
+        pass
+
+    def addnstr(self, y, x, teks, n, attr=0):
+        self.baris[y] = (teks[:n], attr)
+
+
+def st_awal(cf, user):
+    return {
+        "warna": {"judul": 1, "nabung": 2, "keluar": 3, "info": 4},
+        "sumber": [None] + list(cf.users[user]["targets"]),
+        "pilih": 0,
+        "fokus": "sumber",
+        "gulir": 0,
+        "pesan": "",
+        "pesan_attr": 0,
+    }
+
+
+def jawab(cf, monkeypatch, *isian):
+    antrian = list(isian)
+    monkeypatch.setattr(cf, "_tui_tanya", lambda stdscr, prompt: antrian.pop(0))
+
+
+def test_tui_transaksi_status(cf, user, monkeypatch):
+    st = st_awal(cf, user)
+    jawab(cf, monkeypatch, "100.000", "gaji")
+    assert cf._tui_transaksi(None, user, st, "nabung") == ("Nabung Rp 100.000,00 berhasil.", "berhasil")
+
+    jawab(cf, monkeypatch, "")
+    assert cf._tui_transaksi(None, user, st, "keluar") == ("Dibatalkan.", "gagal")
+
+    jawab(cf, monkeypatch, "10.000", "kopi")
+    pesan, status = cf._tui_transaksi(None, user, st, "keluar")
+    assert (pesan, status) == ("Pengeluaran Rp 10.000,00 dicatat.", "berhasil")
+    assert cf.users[user]["saldo_utama"] == 90_000
+
+
+def test_tui_peringatan_anggaran_tetap_berhasil(cf, user, monkeypatch):
+    cf.catat_nabung(user, None, 10**6, "gaji")
+    cf.atur_anggaran(user, "makan", 100_000)
+    st = st_awal(cf, user)
+
+    jawab(cf, monkeypatch, "90.000", "nasi")
+    pesan, status = cf._tui_transaksi(None, user, st, "keluar")
+    assert status == "peringatan"
+    assert pesan == "Pengeluaran Rp 90.000,00 dicatat. Anggaran makan: 90% terpakai!"
+    assert cf.users[user]["saldo_utama"] == 10**6 - 90_000
+    assert set(cf.TUI_WARNA_STATUS[s] for s in ("berhasil", "peringatan", "gagal")) <= set(st["warna"])
+
+
+def test_tui_target_selesai_ditolak(cf, user, monkeypatch):
+    cf.tambah_target(user, "HP", 50_000)
+    cf.catat_nabung(user, "HP", 50_000, "-")
+    st = st_awal(cf, user)
+    st["pilih"] = 1
+    assert cf._tui_transaksi(None, user, st, "nabung") == ("Target HP sudah selesai.", "gagal")
+
+
+def test_tui_gambar_riwayat_menampilkan_transaksi_terbaru(cf, user, now):
+    for i in range(10):
+        cf.catat_nabung(user, None, 1_000 + i, f"setor {i}", now - 100 + i)
+    st = st_awal(cf, user)
+    win = LayarPalsu(h=5)
+
+    cf._tui_gambar("riwayat", win, user, st)
+    isi = [win.baris[y][0] for y in (1, 2, 3)]
+    assert [t.split()[-1] for t in isi] == ["7", "8", "9"]
+
+    st["gulir"] = 100
+    cf._tui_gambar("riwayat", win, user, st)
+    assert st["gulir"] == 7
+    assert win.baris[1][0].endswith("setor 0")